@@ -0,0 +1,229 @@
+"""Measures the throughput of the battle engine. Run from small_version/main with
+
+    python -m benchmarks.engine_benchmarks --save benchmarks/baseline.json
+    python -m benchmarks.engine_benchmarks --compare benchmarks/baseline.json --threshold 0.1
+
+benchmarks/baseline.json holds the reference rates, measured with --repeat 3. Save a new one when the machine changes
+"""
+from main import example_decks
+from pokemon.pokemon_battle import Battle, Deck, DeckSetup, Rules, battle_factory, standard_actions, standard_effects, standard_damage_effects
+from pokemon.pokemon_card import CardType
+from pokemon.pokemon_control import GreedyBattleController
+from pokemon.pokemon_damage import state_damage
+from pokemon.pokemon_features import StateEncoder
+from pokemon.pokemon_mcts import MCTSSearch, SearchNode
+from pokemon.pokemon_collections import generate_pokemon_cards, generate_trainers, generate_card_registry
+from pokemon.pokemon_validation import DeckValidator, encode_decks
+from pokemon.pokemon_simulation import play_game, random_policy
+from pokemon.pokemon_types import EnergyContainer, EnergyType
+import pokemon.utils as utils
+
+from itertools import count
+from typing import Callable
+import argparse
+import json
+import random
+import sys
+import timeit
+
+def get_decks() -> tuple[Deck,Deck]:
+    return example_decks(generate_pokemon_cards(), generate_trainers())
+
+def midgame_battle(deck1:Deck, deck2:Deck, rules:Rules, moves:int=30, cache_actions:bool=False) -> Battle:
+    rng = random.Random(0)
+    battle = battle_factory(deck1, deck2, rules, headless=True, seed=0, cache_actions=cache_actions)
+    for _ in range(moves):
+        legal_moves = battle.legal_moves()
+        if len(legal_moves) == 0 or battle.state.queued_actions() > 0:
+            break
+        battle.action(*rng.choice(legal_moves))
+    return battle
+
+def energy_container_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    small = EnergyContainer({EnergyType.FIRE:1, EnergyType.COLORLESS:1})
+    def run():
+        energies = EnergyContainer()
+        energies = energies.add_energy(EnergyType.FIRE).add_energy(EnergyType.GRASS).add_energy(EnergyType.FIRE)
+        energies.at_least_as_big(small)
+        energies.remove_energy(EnergyType.GRASS)
+    return run
+
+def collection_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    def run():
+        collection = utils.Collection[int]()
+        for i in range(4):
+            collection = collection.add_item(i)
+        for i in range(4):
+            collection = collection.remove_item(i)
+    return run
+
+def deck_setup_fork_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    setup = DeckSetup(deck1, rules.INITIAL_HAND_SIZE, rules.FUTURE_ENERGIES, rng=random.Random(0))
+    return setup.fork
+
+def get_cards_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    setup = DeckSetup(deck1, rules.INITIAL_HAND_SIZE, rules.FUTURE_ENERGIES, rng=random.Random(0))
+    def run():
+        setup.fork().get_cards(2, CardType.POKEMON, None, True)
+    return run
+
+def draw_basic_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    setup = DeckSetup(deck1, rules.INITIAL_HAND_SIZE, rules.FUTURE_ENERGIES, rng=random.Random(0))
+    def run():
+        setup.fork().draw_basic()
+    return run
+
+def is_valid_deck_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    def run():
+        rules.is_valid_deck(deck1)
+    return run
+
+def validate_decks_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    registry = generate_card_registry()
+    validator = DeckValidator(rules, registry)
+    card_ids = encode_decks(registry, [deck1, deck2] * 500)
+    def run():
+        validator.validate(card_ids)
+    return run
+
+def available_actions_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    return midgame_battle(deck1, deck2, rules).available_actions
+
+def cached_available_actions_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    return midgame_battle(deck1, deck2, rules, cache_actions=True).available_actions
+
+def legal_moves_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    return midgame_battle(deck1, deck2, rules).legal_moves
+
+def state_damage_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    states = [midgame_battle(deck1, deck2, rules, moves).state for moves in range(20, 84)]
+    def run():
+        state_damage(states)
+    return run
+
+def encode_states_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    states = [midgame_battle(deck1, deck2, rules, moves).state for moves in range(20, 84)] * 16
+    encoder = StateEncoder(rules, generate_card_registry())
+    out = encoder.new_array(len(states))
+    def run():
+        encoder.encode_batch(states, out=out)
+    return run
+
+def random_game_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    seeds = count()
+    def run():
+        play_game(deck1, deck2, random_policy, random_policy, rules, next(seeds), 100, 200)
+    return run
+
+def greedy_game_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    seeds = count()
+    greedy = GreedyBattleController()
+    def run():
+        play_game(deck1, deck2, greedy, random_policy, rules, next(seeds), 100, 200)
+    return run
+
+def mcts_playout_benchmark(deck1:Deck, deck2:Deck, rules:Rules) -> Callable[[],None]:
+    battle = battle_factory(deck1, deck2, rules, headless=True, seed=0)
+    while len(battle.legal_moves()) == 1:
+        battle.action(*battle.legal_moves()[0])
+    search = MCTSSearch(playout_policy=GreedyBattleController())
+    root = SearchNode(None, True)
+    rng = random.Random(0)
+    def run():
+        search.iterate(root, battle, rng)
+    return run
+
+# name: (builds the function to time, how many times to call it per measurement)
+BENCHMARKS = {
+    'energy_container':         (energy_container_benchmark,         20000),
+    'collection':               (collection_benchmark,               10000),
+    'deck_setup_fork':          (deck_setup_fork_benchmark,          10000),
+    'get_cards':                (get_cards_benchmark,                5000),
+    'draw_basic':               (draw_basic_benchmark,               5000),
+    'is_valid_deck':            (is_valid_deck_benchmark,            10000),
+    'validate_decks':           (validate_decks_benchmark,           500),
+    'available_actions':        (available_actions_benchmark,        2000),
+    'cached_available_actions': (cached_available_actions_benchmark, 2000),
+    'legal_moves':              (legal_moves_benchmark,              500),
+    'state_damage':             (state_damage_benchmark,             500),
+    'encode_states':            (encode_states_benchmark,            50),
+    'random_game':              (random_game_benchmark,              20),
+    'greedy_game':              (greedy_game_benchmark,              20),
+    'mcts_playout':             (mcts_playout_benchmark,             50),
+}
+
+def run_benchmarks(names:list[str]|None=None, repeat:int=5, scale:float=1) -> dict[str,float]:
+    """Times each benchmark and keeps the best of several measurements
+
+    :param names: The benchmarks to run, defaults to all of them
+    :type names: list[str]|None
+    :param repeat: How many measurements to take of each benchmark
+    :type repeat: int
+    :param scale: Multiplies how many calls are made per measurement
+    :type scale: float
+    :return: The calls per second of each benchmark
+    :rtype: dict[str,float]
+    """
+    deck1, deck2 = get_decks()
+    rules = Rules(standard_actions(), standard_effects(), standard_damage_effects())
+    results = dict[str,float]()
+    for name in names if names is not None else BENCHMARKS.keys():
+        build, number = BENCHMARKS[name]
+        number = max(1, int(number * scale))
+        timer = timeit.Timer(build(deck1, deck2, rules))
+        results[name] = number / min(timer.repeat(repeat, number))
+    return results
+
+def save_baseline(results:dict[str,float], path:str) -> None:
+    with open(path, 'w') as file:
+        json.dump({'python': sys.version.split()[0], 'results': results}, file, indent=4)
+
+def load_baseline(path:str) -> dict[str,float]:
+    with open(path) as file:
+        return json.load(file)['results']
+
+def compare(results:dict[str,float], baseline:dict[str,float], threshold:float) -> list[str]:
+    """Finds the benchmarks that got slower than the baseline by more than a threshold
+
+    :param results: The new calls per second of each benchmark
+    :type results: dict[str,float]
+    :param baseline: The calls per second to compare against
+    :type baseline: dict[str,float]
+    :param threshold: The fraction of throughput that can be lost before it counts as a regression
+    :type threshold: float
+    :return: The names of the benchmarks that regressed
+    :rtype: list[str]
+    """
+    return [name for name, rate in results.items() if name in baseline and rate < baseline[name] * (1 - threshold)]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Measures the throughput of the battle engine')
+    parser.add_argument('names', nargs='*', help=f'the benchmarks to run, defaults to all of them: {", ".join(BENCHMARKS.keys())}')
+    parser.add_argument('--save', metavar='PATH', help='write the results to a baseline file')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results to a baseline file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='fraction of throughput that can be lost before failing the comparison')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements per benchmark, the best is kept')
+    parser.add_argument('--scale', type=float, default=1, help='multiplies the calls per measurement')
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if len(unknown) > 0:
+        parser.error(f'unknown benchmarks: {", ".join(unknown)}')
+
+    results = run_benchmarks(args.names if len(args.names) > 0 else None, args.repeat, args.scale)
+    baseline = load_baseline(args.compare) if args.compare is not None else dict[str,float]()
+    for name, rate in results.items():
+        line = f'{name:<26}{rate:>14.1f}/s'
+        if name in baseline:
+            line += f'{(rate / baseline[name] - 1) * 100:>+9.1f}%'
+        print(line)
+    if args.save is not None:
+        save_baseline(results, args.save)
+    if args.compare is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if len(regressions) > 0:
+            print(f'Slower than the baseline by more than {args.threshold:.0%}: {", ".join(regressions)}')
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,21 @@
 from pokemon.user import User
-from pokemon.pokemon_collections import generate_attacks, generate_pokemon, generate_pokemon_cards, generate_trainers, generate_abilities
+from pokemon.pokemon_collections import generate_pokemon_cards, generate_trainers
 from pokemon.pokemon_battle import Deck, battle_factory
 from pokemon.pokemon_types import EnergyType
+from pokemon.pokemon_card import PokemonCard, Trainer
 from pokemon.pokemon_control import battle_control, CommandLineBattleController
 import pokemon.utils as utils
 
-def main():
-    # generate pokemon/cards/data
-    abilities = generate_abilities()
-    attacks = generate_attacks()
-    pokemon = generate_pokemon()
-    all_pokemon = generate_pokemon_cards(pokemon, attacks, abilities)
-    all_trainers = generate_trainers()
+def example_decks(all_pokemon:dict[str,PokemonCard], all_trainers:dict[str,Trainer]) -> tuple[Deck,Deck]:
+    """Builds the two example decks used in the example battle
 
+    :param all_pokemon: The pokemon cards to choose from, see generate_pokemon_cards
+    :type all_pokemon: dict[str,PokemonCard]
+    :param all_trainers: The trainer cards to choose from, see generate_trainers
+    :type all_trainers: dict[str,Trainer]
+    :return: A fire and grass deck and a water and grass deck
+    :rtype: tuple[Deck,Deck]
+    """
     # choose the cards for the decks
     cards1 = [
         all_pokemon['Bulbasaur 0'],
@@ -60,9 +63,17 @@ def main():
         all_trainers["Professor's Research"],
     ]
 
-    # make a deck both users can use
     deck1 = Deck('deck1', tuple(cards1), (EnergyType.FIRE,EnergyType.GRASS))
     deck2 = Deck('deck2', tuple(cards2), (EnergyType.WATER,EnergyType.GRASS))
+    return deck1, deck2
+
+def main():
+    # load pokemon/cards/data from the catalog
+    all_pokemon = generate_pokemon_cards()
+    all_trainers = generate_trainers()
+
+    # make a deck both users can use
+    deck1, deck2 = example_decks(all_pokemon, all_trainers)
 
     # create users and give them cards/decks to battle with
     cards = list(all_pokemon.values())
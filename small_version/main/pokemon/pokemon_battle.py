@@ -1,13 +1,24 @@
 from pokemon.pokemon_card import PokemonCard, PlayingCard, CardType, Attack, PokemonType
-from pokemon.pokemon_types import EnergyType, Condition, EnergyContainer
+from pokemon.pokemon_types import EnergyType, Condition, EnergyContainer, MutableEnergyContainer, WEAKNESS_MODIFIER, RESISTANCE_MODIFIER
+from pokemon.pokemon_registry import CardRegistry
+from pokemon.pokemon_zobrist import MASK, HAND, DECK, DISCARD, zobrist_key, card_keys, zone_hash, stack_key, energy_hash, mix, queue_push, queue_pop, queue_hash
+import pokemon.pokemon_zobrist as zobrist
 import pokemon.utils as utils
 
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import deque
 from enum import Enum
+from itertools import combinations
 from frozendict import frozendict
-from typing import Any
+from typing import Any, Callable, Iterable
+
+class StateChange(Enum):
+    HAND     = 0
+    DECK     = 1
+    ACTIVE   = 2
+    ENERGIES = 3
+    TURN     = 4
 
 class ActivePokemon:
 
@@ -18,31 +29,82 @@ class ActivePokemon:
         self.conditions = conditions if conditions is not None else list[Condition]()
         self.energies = energies if energies is not None else EnergyContainer()
         self.abilities_used = utils.Collection[int]()
+        self.listener:Callable[[StateChange],None]|None = None
+        self.hash = self.full_hash()
+
+    def notify(self, change:StateChange) -> None:
+        if self.listener is not None:
+            self.listener(change)
+
+    def full_hash(self) -> int:
+        """Hashes the pokemon from scratch. The hash is kept up to date in self.hash by every change, see pokemon_zobrist
+
+        :return: The hash of the cards, damage, turns in play, conditions, energies and abilities used
+        :rtype: int
+        """
+        depth = len(self.pokemon_cards)
+        value = sum(stack_key(card, depth - 1 - i) for i, card in enumerate(self.pokemon_cards))
+        value += zobrist_key('turns', self.turns_in_active) + zobrist_key('damage', self.damage)
+        value += sum(zobrist_key('condition', condition) for condition in self.conditions)
+        value += energy_hash('energy', self.energies.counts)
+        value += sum(zobrist_key('ability', index, count) for index, count in self.abilities_used.collectibles.items())
+        return value & MASK
+
+    def __rehash(self, removed:int, added:int) -> None:
+        self.hash = (self.hash - removed + added) & MASK
+
+    def __set_damage(self, damage:int) -> None:
+        self.__rehash(zobrist_key('damage', self.damage), zobrist_key('damage', damage))
+        self.damage = damage
+
+    def __set_turns(self, turns:int) -> None:
+        self.__rehash(zobrist_key('turns', self.turns_in_active), zobrist_key('turns', turns))
+        self.turns_in_active = turns
+
+    def __set_energies(self, energies:EnergyContainer) -> None:
+        self.__rehash(energy_hash('energy', self.energies.counts), energy_hash('energy', energies.counts))
+        self.energies = energies
 
     def copy(self) -> 'ActivePokemon':
-        return ActivePokemon(list(self.pokemon_cards), self.turns_in_active, self.damage, list(self.conditions), self.energies)
+        active = ActivePokemon.__new__(ActivePokemon)
+        active.pokemon_cards = list(self.pokemon_cards)
+        active.turns_in_active = self.turns_in_active
+        active.damage = self.damage
+        active.conditions = list(self.conditions)
+        active.energies = self.energies
+        active.abilities_used = self.abilities_used
+        active.listener = None
+        active.hash = self.hash
+        return active
 
     def active_card(self) -> PokemonCard:
         return self.pokemon_cards[0]
 
     def evolve(self, card:PokemonCard) -> None:
+        self.__rehash(sum(zobrist_key('condition', condition) for condition in self.conditions), stack_key(card, len(self.pokemon_cards)))
         self.pokemon_cards.insert(0, card)
         self.conditions.clear()
-        self.turns_in_active = 0
+        self.__set_turns(0)
+        self.notify(StateChange.ACTIVE)
 
     def hp(self) -> int:
         return max(self.active_card().hit_points - self.damage, 0)
     
     def heal(self, amount:int) -> None:
-        self.damage -= amount
-        self.damage = max(self.damage, 0)
+        self.__set_damage(max(self.damage - amount, 0))
+        self.notify(StateChange.ACTIVE)
 
     def end_turn(self) -> None:
-        self.turns_in_active += 1
+        self.__set_turns(self.turns_in_active + 1)
+        self.__rehash(sum(zobrist_key('ability', index, count) for index, count in self.abilities_used.collectibles.items()), 0)
         self.abilities_used = utils.Collection[int]()
+        self.notify(StateChange.ACTIVE)
 
     def use_ability(self, ability_index:int) -> None:
+        count = self.abilities_used.size_of(ability_index)
+        self.__rehash(zobrist_key('ability', ability_index, count) if count > 0 else 0, zobrist_key('ability', ability_index, count + 1))
         self.abilities_used = self.abilities_used.add_item(ability_index)
+        self.notify(StateChange.ACTIVE)
 
     def total_abilities_used(self) -> int:
         return self.abilities_used.size()
@@ -54,16 +116,19 @@ class ActivePokemon:
         pass
 
     def attach_energy(self, energy:EnergyType) -> None:
-        self.energies = self.energies.add_energy(energy)
+        self.__set_energies(self.energies.add_energy(energy))
+        self.notify(StateChange.ENERGIES)
 
     def retreat(self, energies:EnergyContainer) -> None:
-        self.energies = self.energies.remove_energies(energies)
+        self.__set_energies(self.energies.remove_energies(energies))
+        self.notify(StateChange.ENERGIES)
 
     def discard_energy(self, energy_type:EnergyContainer, number:int) -> EnergyContainer:
         if self.energies.size_of(energy_type) > 0:
             remove = min(number, self.energies.size_of(energy_type))
             removed = EnergyContainer(frozendict({energy_type:remove}))
-            self.energies = self.energies.remove_energies(removed)
+            self.__set_energies(self.energies.remove_energies(removed))
+            self.notify(StateChange.ENERGIES)
             return removed
         return EnergyContainer()
 
@@ -71,10 +136,11 @@ class ActivePokemon:
         total = amount
         if apply_weakness_resistance:
             if damage_type == self.active_card().get_resistance():
-                total -= 20
+                total += RESISTANCE_MODIFIER
             if damage_type == self.active_card().get_weakness():
-                total += 20
-        self.damage += total
+                total += WEAKNESS_MODIFIER
+        self.__set_damage(self.damage + total)
+        self.notify(StateChange.ACTIVE)
     
     def is_knocked_out(self):
         return self.hp() <= 0
@@ -99,30 +165,168 @@ class Deck:
         """
         return self.cards
 
+def copy_rng(rng:random.Random) -> random.Random:
+    """Creates a random generator that continues with the same numbers as another
+
+    :param rng: The generator to copy
+    :type rng: random.Random
+    :return: The copy
+    :rtype: random.Random
+    """
+    copy = random.Random()
+    copy.setstate(rng.getstate())
+    return copy
+
+def draw_pile_key(card:PlayingCard) -> tuple[int,int|None,bool]:
+    """The key of a card in the index of a draw pile, matching the searches done by DeckSetup.get_cards. Enum values
+    are used instead of the enums since they hash much faster
+
+    :param card: The card to find the key of
+    :type card: PlayingCard
+    :return: The card type value, the energy type value if the card is a pokemon and whether the card is basic
+    :rtype: tuple[int,int|None,bool]
+    """
+    card_type = card.get_card_type()
+    return card_type.value, card.get_energy_type().value if card_type == CardType.POKEMON else None, card.is_basic()
+
 class DeckSetup:
 
-    def __init__(self, deck:Deck, initial_hand_size:int, initial_energies:int, shuffle:bool=True,*, active:list[ActivePokemon]|None=None, discard:list[PlayingCard]|None=None, energy_discard:EnergyContainer|None=None):
+    def __init__(self, deck:Deck, initial_hand_size:int, initial_energies:int, shuffle:bool=True,*, active:list[ActivePokemon]|None=None, discard:list[PlayingCard]|None=None, energy_discard:EnergyContainer|None=None, rng:random.Random|None=None):
+        self.rng = rng if rng is not None else random.Random()
         self.energies = list(deck.energies)
         cards = list(deck.cards)
         if shuffle:
             cards = self.__shuffle_deck_to_start(cards)
-        self.deck = deque(cards[initial_hand_size:])
+        self.deck = utils.IndexedPile[PlayingCard](cards[initial_hand_size:], draw_pile_key, shuffle and initial_hand_size > 0)
         self.hand = cards[0:initial_hand_size]
         self.active = active if active is not None else list[ActivePokemon]()
         self.discard = discard if discard is not None else list[PlayingCard]()
         self.energy_discard = energy_discard if discard is not None else EnergyContainer()
         self.next_energies = deque([self.__decide_next_energy() for _ in range(initial_energies)])
+        self.zones_shared = False
+        self.listener:Callable[[StateChange],None]|None = None
+        self.zone_hash = self.full_zone_hash()
+
+    def fork(self, copy_on_write:bool=False, rng:random.Random|None=None) -> 'DeckSetup':
+        """Copies the mutable parts of the DeckSetup. Cards and energies are immutable and are shared with the copy
+
+        :param copy_on_write: Share the deck and discard pile with the copy until either DeckSetup changes them
+        :type copy_on_write: bool
+        :param rng: The random generator of the copy, defaults to a copy of this DeckSetup's generator
+        :type rng: random.Random|None
+        :return: The copy
+        :rtype: DeckSetup
+        """
+        deck = DeckSetup.__new__(DeckSetup)
+        deck.rng = rng if rng is not None else copy_rng(self.rng)
+        deck.energies = self.energies
+        deck.hand = list(self.hand)
+        deck.active = [active.copy() if active is not None else None for active in self.active]
+        deck.energy_discard = self.energy_discard
+        deck.next_energies = deque(self.next_energies)
+        deck.listener = None
+        deck.zone_hash = self.zone_hash
+        if copy_on_write:
+            deck.deck = self.deck
+            deck.discard = self.discard
+            deck.zones_shared = True
+            self.zones_shared = True
+        else:
+            deck.deck = self.deck.copy()
+            deck.discard = list(self.discard)
+            deck.zones_shared = False
+        return deck
+
+    def __own_zones(self) -> None:
+        if self.zones_shared:
+            self.deck = self.deck.copy()
+            self.discard = list(self.discard)
+            self.zones_shared = False
+
+    def full_zone_hash(self) -> int:
+        return (zone_hash(self.hand, HAND) + zone_hash(self.deck, DECK) + zone_hash(self.discard, DISCARD)) & MASK
+
+    def rehash_zones(self) -> None:
+        """Hashes the hand, draw pile and discard pile from scratch. Only needed after they are replaced directly
+        instead of through the methods of the DeckSetup
+        """
+        self.zone_hash = self.full_zone_hash()
+
+    def __move_cards(self, cards:Iterable[PlayingCard], source:int|None, target:int|None) -> None:
+        # source and target are HAND, DECK, DISCARD or None for a zone that isn't hashed here
+        value = self.zone_hash
+        for card in cards:
+            keys = card_keys(card)
+            if source is not None:
+                value -= keys[source]
+            if target is not None:
+                value += keys[target]
+        self.zone_hash = value & MASK
+
+    def zobrist_hash(self) -> int:
+        """Hashes the deck. The hand, draw pile and discard pile are hashed as multisets, so the order of the cards
+        within a zone is ignored and equal hashes don't mean equal draw pile order. The active pokemon, the discarded
+        energies and the queue of next energies are hashed in full. The zones and each active pokemon keep their hash
+        up to date as they change, so this only combines them with the few small parts that are hashed each time
+
+        :return: The 64 bit hash of the deck
+        :rtype: int
+        """
+        return self.__combine_hash(self.zone_hash, [active.hash if active is not None else None for active in self.active])
+
+    def full_zobrist_hash(self) -> int:
+        """Hashes the deck from scratch, which always equals zobrist_hash. Zones are hashed as multisets here as well
+
+        :return: The 64 bit hash of the deck
+        :rtype: int
+        """
+        return self.__combine_hash(self.full_zone_hash(), [active.full_hash() if active is not None else None for active in self.active])
+
+    def __combine_hash(self, zones:int, active:list[int|None]) -> int:
+        value = zones + energy_hash('energy_discard', self.energy_discard.counts)
+        for i, active_hash in enumerate(active):
+            value += mix(active_hash ^ zobrist_key('slot', i)) if active_hash is not None else zobrist_key('empty slot', i)
+        for i, energy in enumerate(self.next_energies):
+            value += zobrist_key('next energy', i, energy)
+        return value & MASK
+
+    def encode(self, registry:CardRegistry) -> tuple[tuple[int,...],tuple[int,...],tuple[int,...],tuple[tuple[int,...],...]]:
+        """Gives the cards in each zone as registry ids, which are cheap to hash, compare and store. The zones
+        themselves keep holding card objects, the ids are only made here on request
+
+        :param registry: The registry of the cards in the deck
+        :type registry: CardRegistry
+        :return: The ids of the hand, draw pile from the top, discard pile and the cards of each active pokemon. An empty active spot is empty
+        :rtype: tuple[tuple[int,...],tuple[int,...],tuple[int,...],tuple[tuple[int,...],...]]
+        """
+        return registry.encode(self.hand), registry.encode(self.deck), registry.encode(self.discard), \
+               tuple(registry.encode(active.pokemon_cards) if active is not None else tuple() for active in self.active)
+
+    def set_listener(self, listener:Callable[[StateChange],None]|None) -> None:
+        """Sets the function told about each change to the hand, deck, active pokemon and energies
+
+        :param listener: The function to call with each change, None to stop calling it
+        :type listener: Callable[[StateChange],None]|None
+        """
+        self.listener = listener
+        for active in self.active:
+            if active is not None:
+                active.listener = listener
+
+    def notify(self, change:StateChange) -> None:
+        if self.listener is not None:
+            self.listener(change)
 
     def __shuffle_deck_to_start(self, cards:list[PlayingCard]) -> list[PlayingCard]:
         basics = [card for card in cards if card.is_basic()]
-        starter = random.choice(basics)
+        starter = self.rng.choice(basics)
         cards.remove(starter)
-        random.shuffle(cards)
+        self.rng.shuffle(cards)
         cards.insert(0,starter)
         return cards
 
     def __decide_next_energy(self) -> EnergyType:
-        return random.choice(self.energies)
+        return self.rng.choice(self.energies)
 
     def bench(self) -> list[PlayingCard]:
         return self.active[1:]
@@ -133,39 +337,41 @@ class DeckSetup:
     def start_turn(self, get_energy:bool=True, draw_card:bool=True) -> None:
         if get_energy:
             self.next_energies.append(self.__decide_next_energy())
+            self.notify(StateChange.ENERGIES)
         if draw_card:
             self.draw_card()
 
     def draw_card(self) -> None: 
-        card = self.deck.popleft()
+        self.__own_zones()
+        card = self.deck.draw()
         self.hand.append(card)
+        self.__move_cards((card,), DECK, HAND)
+        self.notify(StateChange.HAND)
+        self.notify(StateChange.DECK)
 
     def draw_basic(self) -> None:
-        basics = [card for card in self.deck if card.is_basic()]
+        self.__own_zones()
+        basics = self.deck.find(lambda key: key[2])
         if len(basics) > 0:
-            basic = random.choice(basics)
-            self.deck.remove(basic)
-            self.hand.append(basic)
-        deck = list(self.deck)
-        random.shuffle(deck)
-        self.deck = deque(deck)
+            cards = self.deck.take([self.rng.choice(basics)])
+            self.hand.extend(cards)
+            self.__move_cards(cards, DECK, HAND)
+        self.deck.randomize(self.rng)
+        self.notify(StateChange.HAND)
+        self.notify(StateChange.DECK)
 
     def get_cards(self, how_many:int, card_type:CardType, energy_type:EnergyType, is_basic:bool) -> None:
-        matches = [card for card in self.deck if (card.get_card_type()==card_type and (not card_type==CardType.POKEMON or energy_type is None or card.get_energy_type()==energy_type) and (not is_basic or card.is_basic()))]
+        self.__own_zones()
+        energy_value = energy_type.value if energy_type is not None else None
+        matches = self.deck.find(lambda key: key[0] == card_type.value and (energy_value is None or key[1] is None or key[1] == energy_value) and (not is_basic or key[2]))
         how_many = min(how_many, len(matches))
         if how_many > 0:
-            random.shuffle(matches)
-            to_hand = matches[:how_many]
-            deck = list(self.deck)
-            for card in to_hand:
-                deck.remove(card)
-            self.hand.extend(to_hand)
-            random.shuffle(deck)
-            self.deck = deque(deck)
-        else:
-            deck = list(self.deck)
-            random.shuffle(deck)
-            self.deck = deque(deck)
+            cards = self.deck.take(self.rng.sample(matches, how_many))
+            self.hand.extend(cards)
+            self.__move_cards(cards, DECK, HAND)
+        self.deck.randomize(self.rng)
+        self.notify(StateChange.HAND)
+        self.notify(StateChange.DECK)
 
     def between_turns(self) -> None:
         for active in self.active:
@@ -176,11 +382,17 @@ class DeckSetup:
             active.end_turn()
 
     def play_card_from_hand(self, hand_index:int) -> None:
+        self.__own_zones()
         card = self.hand.pop(hand_index)
         self.discard.append(card)
+        self.__move_cards((card,), HAND, DISCARD)
+        self.notify(StateChange.HAND)
+        self.notify(StateChange.DECK)
 
     def evolve(self, hand_index:int, active_index:int) -> None:
         card = self.hand.pop(hand_index)
+        self.__move_cards((card,), HAND, None)
+        self.notify(StateChange.HAND)
         self.active[active_index].evolve(card)
 
     def retreat(self, active_index:int, energies:EnergyContainer) -> None:
@@ -191,6 +403,7 @@ class DeckSetup:
         self.energy_discard = self.energy_discard.add_energies(energies)
         self.active[0] = self.active[active_index]
         self.active[active_index] = to_bench
+        self.notify(StateChange.ACTIVE)
 
     def take_damage(self, amount:int, damage_type:EnergyType, *, active_index:int=0, apply_weakness_resistance:bool=True) -> None:
         self.active[active_index].take_damage(amount, damage_type, apply_weakness_resistance)
@@ -198,32 +411,44 @@ class DeckSetup:
             self.discard_from_active(active_index)
 
     def shuffle_hand_into_deck(self) -> None:
-        cards = list(self.hand)
+        self.__own_zones()
+        self.deck.extend(self.hand)
+        self.__move_cards(self.hand, HAND, DECK)
         self.hand.clear()
-        while len(self.deck) > 0:
-            cards.append(self.deck.popleft())
-        random.shuffle(cards)
-        self.deck = deque(cards)
+        self.deck.shuffle(self.rng)
+        self.notify(StateChange.HAND)
+        self.notify(StateChange.DECK)
 
     def discard_from_active(self, active_index:int) -> None:
+        self.__own_zones()
         self.discard.extend(self.active[active_index].get_cards())
+        self.__move_cards(self.active[active_index].get_cards(), None, DISCARD)
         energies = self.active[active_index].get_energies()
         self.energy_discard = self.energy_discard.add_energies(energies)
         if active_index == 0:
             self.active[active_index] = None
         else:
             self.active.pop(active_index)
+        self.notify(StateChange.ACTIVE)
+        self.notify(StateChange.DECK)
 
     def attach_energy(self, active_index:int) -> None:
         energy_type = self.next_energies.popleft()
         self.active[active_index].attach_energy(energy_type)
+        self.notify(StateChange.ENERGIES)
 
     def delete_energy(self) -> None:
         self.next_energies.popleft()
+        self.notify(StateChange.ENERGIES)
 
     def play_basic(self, hand_index:int) -> None:
         card = self.hand.pop(hand_index)
-        self.active.append(ActivePokemon([card]))
+        self.__move_cards((card,), HAND, None)
+        active = ActivePokemon([card])
+        active.listener = self.listener
+        self.active.append(active)
+        self.notify(StateChange.HAND)
+        self.notify(StateChange.ACTIVE)
 
     def set_starter(self, active_index:int) -> None:
         if active_index > 0:
@@ -233,6 +458,7 @@ class DeckSetup:
                 self.active[active_index] = card
             else:
                 self.active.pop(active_index)
+            self.notify(StateChange.ACTIVE)
 
 @dataclass
 class OpponentDeckView:
@@ -287,13 +513,46 @@ def get_own_deck_view(deck:DeckSetup) -> OpponentDeckView:
 class Turn:
 
     def __init__(self):
+        self.listener:Callable[[StateChange],None]|None = None
         self.reset()
 
+    def notify(self) -> None:
+        if self.listener is not None:
+            self.listener(StateChange.TURN)
+
     def reset(self) -> None:
         self.used_supporters = 0
         self.retreats        = 0
         self.energy_used     = False
         self.attacks_used    = 0
+        self.notify()
+
+    def use_supporter(self) -> None:
+        self.used_supporters += 1
+        self.notify()
+
+    def use_retreat(self) -> None:
+        self.retreats += 1
+        self.notify()
+
+    def use_energy(self) -> None:
+        self.set_energy_used(True)
+
+    def set_energy_used(self, energy_used:bool) -> None:
+        self.energy_used = energy_used
+        self.notify()
+
+    def use_attack(self) -> None:
+        self.attacks_used += 1
+        self.notify()
+
+    def copy(self) -> 'Turn':
+        turn = Turn()
+        turn.used_supporters = self.used_supporters
+        turn.retreats        = self.retreats
+        turn.energy_used     = self.energy_used
+        turn.attacks_used    = self.attacks_used
+        return turn
 
 @dataclass(frozen=True)
 class Rules:
@@ -314,15 +573,46 @@ class Rules:
     ATTACKS_PER_TURN  :int  = 1
     ABILITIES_PER_CARD:int  = 1
     RETREATS_PER_TURN :int  = 1
+    action_registry   :frozendict[str,'Action']       = field(init=False, repr=False, compare=False)
+    effect_registry   :frozendict[str,'Effect']       = field(init=False, repr=False, compare=False)
+    damage_registry   :frozendict[str,'DamageEffect'] = field(init=False, repr=False, compare=False)
+    effect_handlers   :frozendict[str,Callable[['BattleState',tuple],bool]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        effects = frozendict({effect.effect_name():effect for effect in self.effects})
+        # actions are kept in name order, sets of actions iterate in a different order in every process
+        object.__setattr__(self, 'action_registry', frozendict({action.action_name():action for action in sorted(self.actions, key=lambda action: action.action_name())}))
+        object.__setattr__(self, 'effect_registry', effects)
+        object.__setattr__(self, 'damage_registry', frozendict({effect.effect_name():effect for effect in self.damage_effects}))
+        object.__setattr__(self, 'effect_handlers', frozendict({name:effect.effect for name, effect in effects.items() if isinstance(effect, Effect)}))
+
+    def get_actions(self) -> frozendict[str,'Action']:
+        return self.action_registry
+
+    def get_effects(self) -> frozendict[str,'Effect']:
+        return self.effect_registry
+    
+    def get_damage_effects(self) -> frozendict[str, 'DamageEffect']:
+        return self.damage_registry
 
-    def get_actions(self) -> dict[str,'Action']:
-        return {action.action_name():action for action in self.actions}
+    def get_action(self, name:str) -> 'Action|None':
+        return self.action_registry.get(name)
 
-    def get_effects(self) -> dict[str,'Effect']:
-        return {effect.effect_name():effect for effect in self.effects}
-    
-    def get_damage_effects(self) -> dict[str, 'DamageEffect']:
-        return {effect.effect_name():effect for effect in self.damage_effects}
+    def get_effect(self, name:str) -> 'Effect|None':
+        return self.effect_registry.get(name)
+
+    def get_damage_effect(self, name:str) -> 'DamageEffect|None':
+        return self.damage_registry.get(name)
+
+    def effect_handler(self, name:str) -> Callable[['BattleState',tuple],bool]|None:
+        """Gets the bound effect method of the effect with the given name
+
+        :param name: The name of the effect
+        :type name: str
+        :return: The method that applies the effect to a battle, None if the rules have no such effect
+        :rtype: Callable[[BattleState,tuple],bool]|None
+        """
+        return self.effect_handlers.get(name)
 
     def is_valid_deck(self, deck:Deck) -> bool:
         """Checks whether a deck is valid for use in a battle
@@ -339,12 +629,13 @@ class Rules:
         for card in deck.cards:
             if card.is_basic():
                 has_basic = True
-            if card.get_name() in card_names:
-                card_names[card.get_name()] += 1
-                if card_names[card.get_name()] > self.DUPLICATE_LIMIT:
+            name = card.get_name()
+            if name in card_names:
+                card_names[name] += 1
+                if card_names[name] > self.DUPLICATE_LIMIT:
                     return False
             else:
-                card_names[card.get_name()] = 1
+                card_names[name] = 1
         return has_basic or not self.BASIC_REQUIRED
 
 class UserInput:
@@ -367,6 +658,80 @@ class UserInput:
         self.has_value = False
         return val
 
+    def copy(self) -> 'UserInput':
+        user_input = UserInput(self.prompt, self.current_user)
+        user_input.value = self.value
+        user_input.has_value = self.has_value
+        return user_input
+
+def fork_action(action:tuple[str,tuple], user_inputs:dict[int,UserInput]) -> tuple[str,tuple]:
+    """Copies a queued action, giving it copies of any UserInput in its inputs. The same UserInput is always replaced by the same copy
+
+    :param action: The queued action
+    :type action: tuple[str,tuple]
+    :param user_inputs: The copies made so far, keyed by the id of the original UserInput
+    :type user_inputs: dict[int,UserInput]
+    :return: The copied action
+    :rtype: tuple[str,tuple]
+    """
+    name, inputs = action
+    if not any(isinstance(value, UserInput) for value in inputs):
+        return action
+    new_inputs = []
+    for value in inputs:
+        if isinstance(value, UserInput):
+            if id(value) not in user_inputs:
+                user_inputs[id(value)] = value.copy()
+            value = user_inputs[id(value)]
+        new_inputs.append(value)
+    return name, tuple(new_inputs)
+
+class BattleEventType(Enum):
+    """The kinds of event a battle reports to its log
+    """
+    ACTION        = 0
+    SUB_ACTION    = 1
+    ERROR         = 2
+    UNIMPLEMENTED = 3
+
+@dataclass(frozen=True)
+class BattleEvent:
+    event_type:BattleEventType
+    name:str
+    inputs:tuple
+
+class BattleLog:
+    """Receives the events of a battle. The base log drops every event, which is what headless battles use
+    """
+    def record(self, event_type:BattleEventType, name:str, inputs:tuple) -> None:
+        pass
+
+class PrintBattleLog(BattleLog):
+    """Prints every event of a battle to the console
+    """
+    def record(self, event_type:BattleEventType, name:str, inputs:tuple) -> None:
+        match event_type:
+            case BattleEventType.ACTION:
+                print(f"{name} {inputs}")
+            case BattleEventType.SUB_ACTION:
+                print(f"sub: {name} {inputs}")
+            case BattleEventType.ERROR:
+                print(f"error: {name}: {inputs}")
+            case BattleEventType.UNIMPLEMENTED:
+                print(f"not implemented: {name} {inputs}")
+
+class EventBattleLog(BattleLog):
+    """Keeps every event of a battle in a list so it can be inspected later
+    """
+    def __init__(self):
+        self.events = list[BattleEvent]()
+
+    def record(self, event_type:BattleEventType, name:str, inputs:tuple) -> None:
+        self.events.append(BattleEvent(event_type, name, inputs))
+
+    def clear(self) -> None:
+        self.events.clear()
+
 class ActionPriority(Enum):
     NOW            = -1
     ATTACK_EFFECT  = 0
@@ -376,14 +741,24 @@ class ActionPriority(Enum):
     RETALIATION    = 4
     END_TURN       = 5
 
+def new_action_queue() -> utils.BucketQueue[tuple[str,tuple]]:
+    """Creates an empty queue with a bucket for each ActionPriority
+
+    :return: The empty action queue
+    :rtype: utils.BucketQueue[tuple[str,tuple]]
+    """
+    priorities = [priority.value for priority in ActionPriority]
+    return utils.BucketQueue[tuple[str,tuple]](min(priorities), max(priorities))
+
 class BattleState:
 
-    def __init__(self, deck1:Deck, deck2:Deck, rules:Rules|None, *, turn_number:int=0, next_move_team1:bool=True, team1_points:int=0, team2_points:int=0, team1_ready:bool=False, team2_ready:bool=False, current_turn:Turn|None=None, action_queue:utils.PriorityQueue[tuple[str,tuple]]|None=None):
+    def __init__(self, deck1:Deck, deck2:Deck, rules:Rules|None, *, turn_number:int=0, next_move_team1:bool=True, team1_points:int=0, team2_points:int=0, team1_ready:bool=False, team2_ready:bool=False, current_turn:Turn|None=None, action_queue:utils.BucketQueue[tuple[str,tuple]]|utils.PriorityQueue[tuple[str,tuple]]|None=None, log:BattleLog|None=None, rng:random.Random|None=None):
         self.rules = rules if rules is not None else Rules()
         assert rules.is_valid_deck(deck1)
         assert rules.is_valid_deck(deck2)
-        self.deck1 = DeckSetup(deck1, rules.INITIAL_HAND_SIZE, rules.FUTURE_ENERGIES, rules.SHUFFLE)
-        self.deck2 = DeckSetup(deck2, rules.INITIAL_HAND_SIZE, rules.FUTURE_ENERGIES, rules.SHUFFLE)
+        self.rng = rng if rng is not None else random.Random()
+        self.deck1 = DeckSetup(deck1, rules.INITIAL_HAND_SIZE, rules.FUTURE_ENERGIES, rules.SHUFFLE, rng=self.rng)
+        self.deck2 = DeckSetup(deck2, rules.INITIAL_HAND_SIZE, rules.FUTURE_ENERGIES, rules.SHUFFLE, rng=self.rng)
         self.turn_number = turn_number
         self.next_move_team1 = next_move_team1
         self.team1_points = team1_points
@@ -391,7 +766,40 @@ class BattleState:
         self.team1_ready = team1_ready
         self.team2_ready = team2_ready
         self.current_turn = current_turn if current_turn is not None else Turn()
-        self.action_queue = action_queue if action_queue is not None else utils.PriorityQueue[tuple[str,tuple]]()
+        self.action_queue = action_queue if action_queue is not None else new_action_queue()
+        self.log = log if log is not None else PrintBattleLog()
+        self.rehash_queue()
+
+    def fork(self, copy_on_write:bool=False, log:BattleLog|None=None) -> 'BattleState':
+        """Copies the state so the copy can be played without changing this state. The rules and the cards are shared,
+        the decks, turn, action queue and any UserInput waiting in the queue are copied. The copy gets its own random
+        generator that continues with the same numbers as this state's generator
+
+        :param copy_on_write: Share each deck and discard pile until one of the states changes them
+        :type copy_on_write: bool
+        :param log: Where the copy sends its events, defaults to dropping them
+        :type log: BattleLog|None
+        :return: The copy
+        :rtype: BattleState
+        """
+        state = BattleState.__new__(BattleState)
+        state.rules = self.rules
+        state.rng = copy_rng(self.rng)
+        state.deck1 = self.deck1.fork(copy_on_write, state.rng)
+        state.deck2 = self.deck2.fork(copy_on_write, state.rng)
+        state.turn_number = self.turn_number
+        state.next_move_team1 = self.next_move_team1
+        state.team1_points = self.team1_points
+        state.team2_points = self.team2_points
+        state.team1_ready = self.team1_ready
+        state.team2_ready = self.team2_ready
+        state.current_turn = self.current_turn.copy()
+        user_inputs = dict[int,UserInput]()
+        state.action_queue = self.action_queue.map(lambda action: fork_action(action, user_inputs))
+        state.queue_buckets = dict(self.queue_buckets)
+        state.queue_hash = self.queue_hash
+        state.log = log if log is not None else BattleLog()
+        return state
 
     def next_action(self) -> str:
         if self.action_queue.size() > 0:
@@ -401,6 +809,16 @@ class BattleState:
     def push_action(self, action:tuple[str,tuple], priority:int) -> None:
         if self.battle_going():
             self.action_queue.push(priority, action)
+            self.__queue_pushed(priority, (action,))
+
+    def push_actions(self, actions:tuple[tuple[str,tuple]], priority:int) -> None:
+        if self.battle_going():
+            if isinstance(self.action_queue, utils.BucketQueue):
+                self.action_queue.push_all(priority, actions)
+            else:
+                for action in actions:
+                    self.action_queue.push(priority, action)
+            self.__queue_pushed(priority, actions)
 
     def get_partial_inputs(self) -> tuple:
         if self.action_queue.size() > 0:
@@ -413,7 +831,8 @@ class BattleState:
     
     def end_current_action(self) -> None:
         if self.action_queue.size() > 0:
-            self.action_queue.pop()
+            priority = self.action_queue.top_priority()
+            self.__queue_popped(priority, self.action_queue.pop())
     
     def queued_actions(self) -> int:
         return self.action_queue.size()
@@ -421,6 +840,8 @@ class BattleState:
     def end(self) -> None:
         if self.is_over():
             self.action_queue.clear()
+            self.queue_buckets.clear()
+            self.queue_hash = 0
 
     def team1_move(self) -> bool:
         return self.next_move_team1
@@ -449,6 +870,106 @@ class BattleState:
     
     def battle_going(self) -> bool:
         return self.team1_ready and self.team2_ready and not self.is_over()
+
+    def set_listener(self, listener:Callable[[StateChange],None]|None) -> None:
+        """Sets the function told about each change to either deck or the current turn
+
+        :param listener: The function to call with each change, None to stop calling it
+        :type listener: Callable[[StateChange],None]|None
+        """
+        self.deck1.set_listener(listener)
+        self.deck2.set_listener(listener)
+        self.current_turn.listener = listener
+
+    def zobrist_hash(self) -> int:
+        """Gives a 64 bit fingerprint of the position, made from hashes the decks keep up to date as they change. With
+        pokemon_zobrist.set_debug(True) it is checked against full_zobrist_hash. The order of the cards in a hand or
+        pile is not part of it, see DeckSetup.zobrist_hash
+
+        :raises AssertionError: In debug mode, if a change to the state wasn't tracked
+        :return: The hash of the position
+        :rtype: int
+        """
+        value = self.__combine_hash(self.deck1.zobrist_hash(), self.deck2.zobrist_hash(), self.queue_hash)
+        if zobrist.DEBUG:
+            full = self.full_zobrist_hash()
+            assert value == full, f'incremental hash {value:#x} does not match the full hash {full:#x}'
+        return value
+
+    def full_zobrist_hash(self) -> int:
+        """Hashes the position from scratch, see zobrist_hash
+
+        :return: The hash of the position
+        :rtype: int
+        """
+        return self.__combine_hash(self.deck1.full_zobrist_hash(), self.deck2.full_zobrist_hash(), self.full_queue_hash()[1])
+
+    def __combine_hash(self, deck1:int, deck2:int, queue:int) -> int:
+        turn = self.current_turn
+        value = mix(deck1 ^ zobrist_key('team', 1)) + mix(deck2 ^ zobrist_key('team', 2)) + queue
+        value += zobrist_key('turn', self.turn_number, self.next_move_team1)
+        value += zobrist_key('points', self.team1_points, self.team2_points)
+        value += zobrist_key('ready', self.team1_ready, self.team2_ready)
+        value += zobrist_key('current turn', turn.used_supporters, turn.retreats, turn.energy_used, turn.attacks_used)
+        return value & MASK
+
+    def full_queue_hash(self) -> tuple[dict[int,tuple[int,int]],int]:
+        """Hashes the action queue from scratch, see pokemon_zobrist.queue_push
+
+        :return: The number and hash of the actions of each priority, and the hash of the whole queue
+        :rtype: tuple[dict[int,tuple[int,int]],int]
+        """
+        buckets = dict[int,tuple[int,int]]()
+        for priority, action in self.action_queue.prioritized():
+            count, value = buckets.get(priority, (0, 0))
+            buckets[priority] = count + 1, queue_push(count, value, self.__queued_key(action))
+        return buckets, sum(queue_hash(priority, count, value) for priority, (count, value) in buckets.items()) & MASK
+
+    def rehash_queue(self) -> None:
+        """Hashes the action queue from scratch. Only needed after it is changed directly instead of through the methods
+        of the BattleState
+        """
+        self.queue_buckets, self.queue_hash = self.full_queue_hash()
+
+    def __queued_key(self, action:tuple[str,tuple]) -> int:
+        name, inputs = action
+        # each copy of the state has its own UserInputs, and a UserInput only holds a value while its effect runs, so
+        # any UserInput is hashed the same
+        if any(isinstance(item, UserInput) for item in inputs):
+            inputs = tuple('input' if isinstance(item, UserInput) else item for item in inputs)
+        return zobrist_key('queued', name, inputs)
+
+    def __queue_pushed(self, priority:int, actions:Iterable[tuple[str,tuple]]) -> None:
+        count, value = self.queue_buckets.get(priority, (0, 0))
+        old = queue_hash(priority, count, value)
+        for action in actions:
+            value = queue_push(count, value, self.__queued_key(action))
+            count += 1
+        self.queue_buckets[priority] = count, value
+        self.queue_hash = (self.queue_hash - old + queue_hash(priority, count, value)) & MASK
+
+    def __queue_popped(self, priority:int, action:tuple[str,tuple]) -> None:
+        count, value = self.queue_buckets[priority]
+        old = queue_hash(priority, count, value)
+        count, value = count - 1, queue_pop(value, self.__queued_key(action))
+        self.queue_buckets[priority] = count, value
+        self.queue_hash = (self.queue_hash - old + queue_hash(priority, count, value)) & MASK
+
+    def winner(self) -> int|None:
+        """Finds which team won the battle
+
+        :return: 1 or 2 for the winning team, None if the battle isn't over or neither team won
+        :rtype: int|None
+        """
+        team1_out = len(self.deck1.active) > 0 and self.deck1.active[0] is None and self.deck1.bench_size() == 0
+        team2_out = len(self.deck2.active) > 0 and self.deck2.active[0] is None and self.deck2.bench_size() == 0
+        team1_won = self.team1_points >= self.rules.POINTS_TO or team2_out
+        team2_won = self.team2_points >= self.rules.POINTS_TO or team1_out
+        if team1_won and not team2_won:
+            return 1
+        if team2_won and not team1_won:
+            return 2
+        return None
     
     def is_valid_basic_index(self, index:int, deck:DeckSetup) -> bool:
         return index >= 0 and index < len(deck.hand) and deck.hand[index].is_basic()
@@ -469,7 +990,7 @@ class BattleState:
         deck = self.current_deck()
         draw_card = len(deck.deck) > 0 and len(deck.hand) < self.rules.MAX_HAND_SIZE
         deck.start_turn(generate_energy, draw_card)
-        self.current_turn.energy_used = not generate_energy
+        self.current_turn.set_energy_used(not generate_energy)
 
     def end_turn(self) -> bool:
         if self.battle_going():
@@ -508,6 +1029,24 @@ class Effect:
     def effect(self, battle:BattleState, inputs:tuple) -> bool:
         pass
 
+    def select_values(self, battle:BattleState, inputs:tuple, index:int, deck:DeckSetup, defending:DeckSetup) -> list|None:
+        """Lists the values that can be selected for a UserInput in the inputs of the effect
+
+        :param battle: The battle the effect is waiting in
+        :type battle: BattleState
+        :param inputs: The inputs of the effect
+        :type inputs: tuple
+        :param index: The position of the UserInput in the inputs
+        :type index: int
+        :param deck: The deck of the team the effect runs for
+        :type deck: DeckSetup
+        :param defending: The deck of the other team
+        :type defending: DeckSetup
+        :return: The values that let the effect happen, None if the effect can't tell
+        :rtype: list|None
+        """
+        return None
+
 class DrawCardsEffect(Effect):
     def effect_name(self) -> str:
         return "draw"
@@ -645,6 +1184,11 @@ class HealEffect(Effect):
                             return battle.current_deck().active[active_index].damage > 0
         return False
     
+    def select_values(self, battle:BattleState, inputs:tuple[str|int,int], index:int, deck:DeckSetup, defending:DeckSetup) -> list|None:
+        if index == 0 and len(inputs) == 2 and inputs[1] > 0:
+            return [i for i, active in enumerate(deck.active) if active is not None and active.damage > 0]
+        return None
+
     def could_be_valid(self, battle:BattleState, inputs:tuple[str|int,int]):
         if len(inputs) == 2 and inputs[1] > 0:
             if inputs[0] in {'all'} or isinstance(inputs[0], UserInput):
@@ -714,11 +1258,11 @@ class DiscardEnergyEffect(Effect):
             which_deck, who, how_many, what_type = inputs
             deck = battle.current_deck() if which_deck else battle.defending_deck()
             if who == 'random':
-                print("do this")
+                battle.log.record(BattleEventType.UNIMPLEMENTED, self.effect_name(), inputs)
             else:
                 who = int(who)
                 removed = deck.active[who].discard_energy(what_type, how_many)
-                deck.energy_discard.add_energy(removed)
+                deck.energy_discard = deck.energy_discard.add_energies(removed)
             return True
         return False
 
@@ -782,6 +1326,12 @@ class SwitchActiveEffect(Effect):
                 return battle.is_valid_bench_index(bench_index, deck)
         return False
 
+    def select_values(self, battle:BattleState, inputs:tuple[int,bool], index:int, deck:DeckSetup, defending:DeckSetup) -> list|None:
+        if index == 0 and len(inputs) == 2:
+            switched = deck if inputs[1] else defending
+            return [i for i in range(len(switched.active)) if battle.is_valid_bench_index(i, switched)]
+        return None
+
     def effect(self, battle:BattleState, inputs:tuple) -> bool:
         if self.is_valid(battle, inputs):
             bench_index, is_current_deck = inputs
@@ -833,6 +1383,32 @@ class EnergyBoostDamageEffect(DamageEffect):
             return base
 
 
+def energy_payments(energies:EnergyContainer, cost:int) -> list[EnergyContainer]:
+    """Lists every distinct way to choose a number of energies from a container
+
+    :param energies: The energies to choose from
+    :type energies: EnergyContainer
+    :param cost: How many energies to choose
+    :type cost: int
+    :return: Each choice of energies
+    :rtype: list[EnergyContainer]
+    """
+    payments = list[EnergyContainer]()
+    counts = [0] * len(energies.counts)
+    def choose(index:int, remaining:int) -> None:
+        if remaining == 0:
+            payments.append(EnergyContainer.from_counts(tuple(counts), cost))
+            return
+        if index == len(counts):
+            return
+        for count in range(min(remaining, energies.counts[index]), -1, -1):
+            counts[index] = count
+            choose(index + 1, remaining - count)
+        counts[index] = 0
+    if energies.size() >= cost:
+        choose(0, cost)
+    return payments
+
 class Action:
 
     def action(self, battle:BattleState, inputs:tuple) -> bool:
@@ -847,6 +1423,29 @@ class Action:
     def could_act(self, battle:BattleState) -> bool:
         pass
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        """Lists every fully specified input the action can be taken with. Assumes the battle is ready for the action
+        when uses_action_queue is True, legal_moves checks that once for all actions
+
+        :param battle: The battle to consider
+        :type battle: BattleState
+        :return: The inputs that make a valid action
+        :rtype: list[tuple]
+        """
+        return []
+
+    def uses_action_queue(self) -> bool:
+        return True
+
+    def depends_on(self) -> frozenset[StateChange]:
+        """The changes that can change could_act while the battle is going, the action queue is empty and the same team
+        is moving
+
+        :return: The changes that could_act depends on
+        :rtype: frozenset[StateChange]
+        """
+        return frozenset(StateChange)
+
     def action_name(self) -> str:
         pass
 
@@ -863,10 +1462,11 @@ class PlayTrainerAction(Action):
             deck = battle.current_deck()
             trainer = deck.hand[hand_index]
             deck.play_card_from_hand(hand_index)
-            for effect in trainer.get_actions():
-                battle.push_action(effect, ActionPriority.ATTACK_EFFECT.value)
+            # cards are shared between battles, so each play gets its own copies of the trainer's UserInputs
+            user_inputs = dict[int,UserInput]()
+            battle.push_actions([fork_action(action, user_inputs) for action in trainer.get_actions()], ActionPriority.ATTACK_EFFECT.value)
             if trainer.get_card_type() == CardType.SUPPORTER:
-                battle.current_turn.used_supporters += 1
+                battle.current_turn.use_supporter()
             return True
         return False
 
@@ -875,13 +1475,17 @@ class PlayTrainerAction(Action):
             hand_index = inputs[0]
             deck = battle.current_deck()
             if battle.is_valid_trainer_index(hand_index, deck):
-                if not deck.hand[hand_index].get_card_type() == CardType.SUPPORTER or battle.current_turn.used_supporters < battle.rules.SUPPORTERS_PER_TURN:
-                    effects = deck.hand[hand_index].get_actions()
-                    for effect, effect_inputs in effects:
-                        if effect in battle.rules.get_effects():
-                            if not battle.rules.get_effects()[effect].could_be_valid(battle, effect_inputs):
-                                return False
-                            return True
+                return self.is_playable(battle, deck.hand[hand_index])
+        return False
+
+    def is_playable(self, battle:BattleState, trainer:PlayingCard) -> bool:
+        if not trainer.get_card_type() == CardType.SUPPORTER or battle.current_turn.used_supporters < battle.rules.SUPPORTERS_PER_TURN:
+            for effect, effect_inputs in trainer.get_actions():
+                rule_effect = battle.rules.get_effect(effect)
+                if rule_effect is not None:
+                    if not rule_effect.could_be_valid(battle, effect_inputs):
+                        return False
+                    return True
         return False
 
     def is_valid_raw(self, inputs:tuple[str]) -> tuple[bool, tuple]:
@@ -900,6 +1504,17 @@ class PlayTrainerAction(Action):
                 return True
         return False
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        playable = dict[int,bool]()
+        inputs = list[tuple]()
+        for i, card in enumerate(battle.current_deck().hand):
+            if card.is_trainer():
+                if id(card) not in playable:
+                    playable[id(card)] = self.is_playable(battle, card)
+                if playable[id(card)]:
+                    inputs.append((i,))
+        return inputs
+
     def action_name(self) -> str:
         return "trainer"
 
@@ -957,6 +1572,32 @@ class SetupAction(Action):
     
     def could_act(self, battle:BattleState) -> bool:
         return not battle.team1_ready or not battle.team2_ready
+
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        """Lists the setups of the first team that isn't ready. Each setup is a starter followed by the bench in hand order
+
+        :param battle: The battle to consider
+        :type battle: BattleState
+        :return: The inputs that make a valid setup
+        :rtype: list[tuple]
+        """
+        if not battle.team1_ready:
+            is_team1, deck = True, battle.deck1
+        elif not battle.team2_ready:
+            is_team1, deck = False, battle.deck2
+        else:
+            return []
+        basics = [i for i, card in enumerate(deck.hand) if card.is_basic()]
+        inputs = list[tuple]()
+        for starter in basics:
+            others = [i for i in basics if i != starter]
+            for bench_size in range(min(len(others), battle.rules.BENCH_SIZE - 1) + 1):
+                for bench in combinations(others, bench_size):
+                    inputs.append((is_team1, starter, *bench))
+        return inputs
+
+    def uses_action_queue(self) -> bool:
+        return False
     
     def action_name(self) -> str:
         return "setup"
@@ -1000,6 +1641,15 @@ class PlayBasicAction(Action):
                 return True
         return False
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        deck = battle.current_deck()
+        if deck.bench_size() < battle.rules.BENCH_SIZE:
+            return [(i,) for i, card in enumerate(deck.hand) if card.is_basic()]
+        return []
+
+    def depends_on(self) -> frozenset[StateChange]:
+        return frozenset([StateChange.HAND, StateChange.ACTIVE])
+
     def action_name(self) -> str:
         return "play_basic"
 
@@ -1048,6 +1698,23 @@ class EvolveAction(Action):
                     return True
         return False
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        deck = battle.current_deck()
+        can_evolve = [(active_index, active.active_card().pokemon) for active_index, active in enumerate(deck.active) 
+                      if active is not None and active.turns_in_active >= battle.rules.TURNS_TO_EVOLVE]
+        inputs = list[tuple]()
+        if len(can_evolve) > 0:
+            for hand_index, card in enumerate(deck.hand):
+                if card.is_pokemon() and not card.is_basic():
+                    evolves_from = card.evolves_from()
+                    for active_index, pokemon in can_evolve:
+                        if evolves_from == pokemon:
+                            inputs.append((hand_index, active_index))
+        return inputs
+
+    def depends_on(self) -> frozenset[StateChange]:
+        return frozenset([StateChange.HAND, StateChange.ACTIVE])
+
     def action_name(self) -> str:
         return "evolve"
 
@@ -1064,7 +1731,7 @@ class AbilityAction(Action):
             deck = battle.current_deck()
             ability = deck.active[active_index].active_card().abilities[ability_index]
             for effect, effect_inputs in ability.get_effects():
-                battle.rules.get_effects()[effect].effect(battle, effect_inputs)
+                battle.rules.effect_handler(effect)(battle, effect_inputs)
                 deck.active[active_index].use_ability(ability_index)
             return True
         return False
@@ -1076,14 +1743,19 @@ class AbilityAction(Action):
             if battle.is_valid_active_index(active_index, deck):
                 abilities = deck.active[active_index].active_card().abilities
                 if len(abilities) > 0 and ability_index >= 0 and ability_index < len(abilities):
-                    if deck.active[active_index].used_ability(ability_index) < battle.rules.ABILITIES_PER_CARD:
-                        ability = abilities[ability_index]
-                        if ability.trigger == 'user':
-                            for effect, effect_inputs in ability.get_effects():
-                                if effect in battle.rules.get_effects():
-                                    if not battle.rules.get_effects()[effect].could_be_valid(battle, effect_inputs):
-                                        return False
-                                return True
+                    return self.is_usable(battle, deck.active[active_index], ability_index)
+        return False
+
+    def is_usable(self, battle:BattleState, active:ActivePokemon, ability_index:int) -> bool:
+        if active.used_ability(ability_index) < battle.rules.ABILITIES_PER_CARD:
+            ability = active.active_card().abilities[ability_index]
+            if ability.trigger == 'user':
+                for effect, effect_inputs in ability.get_effects():
+                    rule_effect = battle.rules.get_effect(effect)
+                    if rule_effect is not None:
+                        if not rule_effect.could_be_valid(battle, effect_inputs):
+                            return False
+                    return True
         return False
 
     def is_valid_raw(self, inputs:tuple[str]) -> tuple[bool, tuple]:
@@ -1105,6 +1777,15 @@ class AbilityAction(Action):
                         return True
         return False
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        inputs = list[tuple]()
+        for i, active in enumerate(battle.current_deck().active):
+            if active is not None:
+                for j in range(len(active.active_card().abilities)):
+                    if self.is_usable(battle, active, j):
+                        inputs.append((i,j))
+        return inputs
+
     def action_name(self) -> str:
         return 'ability'
 
@@ -1124,17 +1805,19 @@ class AttackAction(Action):
             attack = attacker.active_card().attacks[attack_index]
             attacked = defending_deck.active[0].active_card()
             damage_effect, damage_inputs = attack.get_damage_effect()
-            if damage_effect in battle.rules.get_damage_effects():
-                damage = battle.rules.get_damage_effects()[damage_effect].damage(battle, attacker, attack, damage_inputs)
+            rule_damage_effect = battle.rules.get_damage_effect(damage_effect)
+            if rule_damage_effect is not None:
+                damage = rule_damage_effect.damage(battle, attacker, attack, damage_inputs)
             else:
-                damage = battle.rules.get_damage_effects()['base'].damage(battle, damage_inputs)
+                damage = battle.rules.get_damage_effect('base').damage(battle, attacker, attack, damage_inputs)
             defending_deck.take_damage(damage, deck.active[0].active_card().get_energy_type())
             if attack.get_effects() is not None:
                 for attack_effect, attack_inputs in attack.get_effects():
-                    if attack_effect in battle.rules.get_effects():
-                        if battle.rules.get_effects()[attack_effect].could_be_valid(battle, attack_inputs):
+                    rule_effect = battle.rules.get_effect(attack_effect)
+                    if rule_effect is not None:
+                        if rule_effect.could_be_valid(battle, attack_inputs):
                             battle.push_action((attack_effect, attack_inputs), ActionPriority.ATTACK_EFFECT.value)
-            battle.current_turn.attacks_used += 1
+            battle.current_turn.use_attack()
             if defending_deck.active[0] is None:
                 if battle.team1_turn():
                     battle.team1_points += 1 if attacked.level <= 100 else 2
@@ -1174,6 +1857,16 @@ class AttackAction(Action):
                     return True
         return False
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        deck = battle.current_deck()
+        if len(deck.active) > 0 and deck.active[0] is not None and battle.current_turn.attacks_used < battle.rules.ATTACKS_PER_TURN:
+            energies = deck.active[0].energies
+            return [(i,) for i, attack in enumerate(deck.active[0].active_card().attacks) if energies.at_least_as_big(attack.energy_cost)]
+        return []
+
+    def depends_on(self) -> frozenset[StateChange]:
+        return frozenset([StateChange.ACTIVE, StateChange.ENERGIES, StateChange.TURN])
+
     def action_name(self) -> str:
         return "attack"
 
@@ -1189,7 +1882,7 @@ class RetreatAction(Action):
             active_index, energies = inputs
             deck = battle.current_deck()
             deck.retreat(active_index, energies)
-            battle.current_turn.retreats += 1
+            battle.current_turn.use_retreat()
             return True
         return False
 
@@ -1209,13 +1902,13 @@ class RetreatAction(Action):
                 active_index = int(inputs[0])
             except ValueError:
                 return False, None
-            energies = EnergyContainer()
+            energies = MutableEnergyContainer()
             for token in inputs[1:]:
                 try:
-                    energies = energies.add_energy(EnergyType[token.upper()])
+                    energies.add_energy_in_place(EnergyType[token.upper()])
                 except KeyError:
                     return False, None
-            return True, (active_index, energies)
+            return True, (active_index, energies.freeze())
         return False, None
 
     def could_act(self, battle:BattleState) -> bool:
@@ -1225,6 +1918,24 @@ class RetreatAction(Action):
                 return deck.active[0].active_card().retreat_cost <= deck.active[0].energies.size() and deck.bench_size() > 0
         return False
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        """Lists a retreat to each bench pokemon with each way of paying the retreat cost from the attached energies.
+        Retreating to index 0 changes nothing and isn't listed
+
+        :param battle: The battle to consider
+        :type battle: BattleState
+        :return: The inputs that make a valid retreat
+        :rtype: list[tuple]
+        """
+        deck = battle.current_deck()
+        if battle.current_turn.retreats >= battle.rules.RETREATS_PER_TURN or deck.bench_size() <= 0 or deck.active[0] is None:
+            return []
+        payments = energy_payments(deck.active[0].energies, deck.active[0].active_card().retreat_cost)
+        return [(active_index, payment) for active_index in range(1, len(deck.active)) for payment in payments]
+
+    def depends_on(self) -> frozenset[StateChange]:
+        return frozenset([StateChange.ACTIVE, StateChange.ENERGIES, StateChange.TURN])
+
     def action_name(self) -> str:
         return "retreat"
 
@@ -1240,7 +1951,7 @@ class PlaceEnergyAction(Action):
             active_index = inputs[0]
             deck = battle.current_deck()
             deck.attach_energy(active_index)
-            battle.current_turn.energy_used = True
+            battle.current_turn.use_energy()
             return True
         return False
 
@@ -1267,6 +1978,15 @@ class PlaceEnergyAction(Action):
                 return True
         return False
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        deck = battle.current_deck()
+        if battle.current_turn.energy_used or len(deck.next_energies) == 0:
+            return []
+        return [(i,) for i in range(len(deck.active))]
+
+    def depends_on(self) -> frozenset[StateChange]:
+        return frozenset([StateChange.ACTIVE, StateChange.TURN])
+
     def action_name(self) -> str:
         return "place_energy"
 
@@ -1298,6 +2018,36 @@ class SelectAction(Action):
         if battle.ready_for_action(self.action_name()):
             return battle.next_action() == self.action_name()
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        """Lists the values that can be selected for the waiting UserInput. The queued effect holding the UserInput
+        decides which values are valid, see Effect.select_values. Every active index of either deck is given for an
+        effect that can't tell
+
+        :param battle: The battle to consider
+        :type battle: BattleState
+        :return: The inputs that make a valid selection
+        :rtype: list[tuple]
+        """
+        if battle.next_action() != self.action_name():
+            return []
+        user_input = battle.get_partial_inputs()[0]
+        # a selection made by the other team has already switched the move, and the effect runs once it switches back
+        team1 = battle.team1_move() != user_input.switch_user()
+        deck, defending = (battle.deck1, battle.deck2) if team1 else (battle.deck2, battle.deck1)
+        values = None
+        for name, inputs in battle.action_queue.ordered():
+            effect = battle.rules.get_effect(name)
+            index = next((i for i, value in enumerate(inputs) if value is user_input), None)
+            if effect is not None and index is not None:
+                values = effect.select_values(battle, inputs, index, deck, defending)
+                break
+        if values is None:
+            values = range(max(len(battle.deck1.active), len(battle.deck2.active)))
+        return [(user_input, value) for value in values]
+
+    def depends_on(self) -> frozenset[StateChange]:
+        return frozenset()
+
     def action_name(self) -> str:
         return 'select'
 
@@ -1323,6 +2073,12 @@ class EndTurnAction(Action):
     def could_act(self, battle:BattleState) -> bool:
         return self.is_valid(battle, tuple())
 
+    def legal_inputs(self, battle:BattleState) -> list[tuple]:
+        return [tuple()]
+
+    def depends_on(self) -> frozenset[StateChange]:
+        return frozenset()
+
     def action_name(self) -> str:
         return "end_turn"
 
@@ -1333,13 +2089,67 @@ class EndTurnAction(Action):
         return "end_turn"
 
 
+class ActionCache:
+    """Remembers the result of each action's could_act until a change it depends on happens. Every result is dropped
+    when the turn or the team moving changes
+    """
+
+    def __init__(self, actions:frozendict[str,Action]):
+        self.actions = actions
+        self.results = dict[str,bool]()
+        self.dependents = {change:tuple(name for name,action in actions.items() if change in action.depends_on()) for change in StateChange}
+        self.move = None
+
+    def changed(self, change:StateChange) -> None:
+        for name in self.dependents[change]:
+            self.results.pop(name, None)
+
+    def clear(self) -> None:
+        self.results.clear()
+
+    def available_actions(self, battle:BattleState) -> dict[str,Action]:
+        move = (battle.turn_number, battle.next_move_team1)
+        if move != self.move:
+            self.results.clear()
+            self.move = move
+        available = dict[str,Action]()
+        for name, action in self.actions.items():
+            could_act = self.results.get(name)
+            if could_act is None:
+                could_act = bool(action.could_act(battle))
+                self.results[name] = could_act
+            if could_act:
+                available[name] = action
+        return available
+
 class Battle:
     """Represents a battle between two decks of cards
     """
 
-    def __init__(self, state:BattleState):
+    def __init__(self, state:BattleState, log:BattleLog|None=None, cache_actions:bool=False):
         self.state = state
-        self.log = None # TODO
+        if log is not None:
+            self.state.log = log
+        self.action_cache = None
+        if cache_actions:
+            self.action_cache = ActionCache(state.rules.action_registry)
+            state.set_listener(self.action_cache.changed)
+
+    @property
+    def log(self) -> BattleLog:
+        return self.state.log
+
+    def fork(self, copy_on_write:bool=False, log:BattleLog|None=None) -> 'Battle':
+        """Copies the battle so moves can be tried on the copy, see BattleState.fork
+
+        :param copy_on_write: Share each deck and discard pile until one of the battles changes them
+        :type copy_on_write: bool
+        :param log: Where the copy sends its events, defaults to dropping them
+        :type log: BattleLog|None
+        :return: The copy
+        :rtype: Battle
+        """
+        return Battle(self.state.fork(copy_on_write, log), cache_actions=self.action_cache is not None)
 
     def team1_move(self) -> bool:
         return self.state.team1_move()
@@ -1351,18 +2161,20 @@ class Battle:
         return self.state.is_over()
     
     def action(self, action:str, inputs:tuple) -> bool:
-        print(f"{action} {inputs}")
+        self.state.log.record(BattleEventType.ACTION, action, inputs)
         success = True
-        if action in self.state.rules.get_actions():
-            success = self.state.rules.get_actions()[action].action(self.state, inputs)
+        rules = self.state.rules
+        rule_action = rules.get_action(action)
+        if rule_action is not None:
+            success = rule_action.action(self.state, inputs)
             if not success:
                 return False
             if action == self.state.next_action():
                 self.state.end_current_action()
         while self.state.queued_actions() > 0:
             sub_action, sub_inputs = self.state.top_action()
-            print(f"sub: {sub_action} {sub_inputs}")
-            if sub_action in self.state.rules.get_actions():
+            self.state.log.record(BattleEventType.SUB_ACTION, sub_action, sub_inputs)
+            if sub_action in rules.action_registry:
                 return success
             
             user_input_needed = False
@@ -1377,7 +2189,8 @@ class Battle:
             if user_input_needed:
                 continue
             
-            if sub_action in self.state.rules.get_effects():
+            handler = rules.effect_handler(sub_action)
+            if handler is not None:
                 new_inputs = []
                 for i in range(len(sub_inputs)):
                     sub_input = sub_inputs[i]
@@ -1385,16 +2198,27 @@ class Battle:
                         new_inputs.append(sub_input.take_value())
                     else:
                         new_inputs.append(sub_input)
-                if self.state.rules.get_effects()[sub_action].effect(self.state, tuple(new_inputs)):
+                if handler(self.state, tuple(new_inputs)):
                     self.state.end_current_action()
                 else:
                     success = False
             else:
-                print(f"error: {sub_action}: {sub_inputs}")
+                self.state.log.record(BattleEventType.ERROR, sub_action, sub_inputs)
         return success
     
+    def legal_moves(self) -> list[tuple[str,tuple]]:
+        return legal_moves(self.state)
+
     def available_actions(self) -> dict[str,Action]:
-        return {name:action for name,action in self.state.rules.get_actions().items() if action.could_act(self.state)}
+        if self.action_cache is not None and self.state.battle_going() and self.state.queued_actions() == 0:
+            return self.action_cache.available_actions(self.state)
+        return {name:action for name,action in self.state.rules.action_registry.items() if action.could_act(self.state)}
+
+    def invalidate_actions(self) -> None:
+        """Forgets the cached available actions, needed after changing the battle without going through its methods
+        """
+        if self.action_cache is not None:
+            self.action_cache.clear()
 
     def get_rules(self) -> Rules:
         return self.state.rules
@@ -1405,6 +2229,22 @@ class Battle:
     def get_partial_inputs(self) -> tuple:
         return self.state.get_partial_inputs()
 
+def legal_moves(state:BattleState) -> list[tuple[str,tuple]]:
+    """Lists every move that can be made in a battle, with fully specified inputs that Battle.action accepts
+
+    :param state: The battle to consider
+    :type state: BattleState
+    :return: The name and inputs of each legal move
+    :rtype: list[tuple[str,tuple]]
+    """
+    moves = list[tuple[str,tuple]]()
+    going = state.battle_going()
+    next_action = state.next_action()
+    for name, action in state.rules.action_registry.items():
+        if not action.uses_action_queue() or going and (next_action is None or next_action == name):
+            moves.extend((name, inputs) for inputs in action.legal_inputs(state))
+    return moves
+
 def standard_actions() -> set[Action]:
     actions = set[Action]([
         PlayTrainerAction(),
@@ -1438,7 +2278,24 @@ def standard_damage_effects() -> set[DamageEffect]:
         EnergyBoostDamageEffect(),
     ])
 
-def battle_factory(deck1:Deck, deck2:Deck, rules:Rules|None=None, actions:set[Action]|None=None, effects:set[Effect]|None=None, damage_effects:set[DamageEffect]|None=None):
+def battle_factory(deck1:Deck, deck2:Deck, rules:Rules|None=None, actions:set[Action]|None=None, effects:set[Effect]|None=None, damage_effects:set[DamageEffect]|None=None, *, log:BattleLog|None=None, headless:bool=False, seed:int|None=None, cache_actions:bool=False):
+    """Creates a battle between two decks
+
+    :param deck1: The deck used by team 1
+    :type deck1: Deck
+    :param deck2: The deck used by team 2
+    :type deck2: Deck
+    :param log: Where the events of the battle are sent, defaults to printing them
+    :type log: BattleLog|None
+    :param headless: Drops every event of the battle instead of printing them when no log is given
+    :type headless: bool
+    :param seed: Seeds the random generator of the battle so the same battle can be played again
+    :type seed: int|None
+    :param cache_actions: Remembers which actions are available until the state they depend on changes
+    :type cache_actions: bool
+    :return: The new battle
+    :rtype: Battle
+    """
     if actions is None:
         actions = standard_actions()
     if effects is None:
@@ -1447,6 +2304,8 @@ def battle_factory(deck1:Deck, deck2:Deck, rules:Rules|None=None, actions:set[Ac
         damage_effects = standard_damage_effects()
     if rules is None:
         rules = Rules(actions, effects, damage_effects)
-    state = BattleState(deck1, deck2, rules)
-    return Battle(state)
+    if log is None and headless:
+        log = BattleLog()
+    state = BattleState(deck1, deck2, rules, log=log, rng=random.Random(seed))
+    return Battle(state, cache_actions=cache_actions)
     
\ No newline at end of file
@@ -40,6 +40,10 @@ class Pokemon:
     name: str
     evolves_from: 'Pokemon'
     types: tuple[PokemonType]
+    stage: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'stage', 0 if self.evolves_from is None else 1 + self.evolves_from.stage)
 
     def get_stage(self) -> int:
         """Gets the evolution stage of the pokemon
@@ -47,10 +51,7 @@ class Pokemon:
         :return: 0 for basic, 1 for stage 1, 2 for stage 2
         :rtype: int
         """
-        if self.evolves_from is None: 
-            return 0
-        else:
-            return 1 + self.evolves_from.get_stage()
+        return self.stage
         
 def stage_to_str(stage:int) -> str:
     if stage == 0:
@@ -147,6 +148,17 @@ class PokemonCard(PlayingCard):
     retreat_cost: int
     level: int = 0
     abilities: tuple[Ability] = field(default_factory=tuple[Ability])
+    name: str = field(init=False, repr=False, compare=False)
+    weakness: EnergyType = field(init=False, repr=False, compare=False)
+    resistance: EnergyType = field(init=False, repr=False, compare=False)
+    energy_type: EnergyType = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # cards are frozen and read constantly during battles, so the values derived from the other fields are stored
+        object.__setattr__(self, 'name', self.pokemon.name if self.level_str() == '' else f'{self.pokemon.name} {self.level_str()}')
+        object.__setattr__(self, 'weakness', weakness(self.pokemon_type))
+        object.__setattr__(self, 'resistance', resistance(self.pokemon_type))
+        object.__setattr__(self, 'energy_type', energy_type(self.pokemon_type))
 
     def id_str(self) -> str:
         return f"{self.get_name()} {self.version}"
@@ -164,7 +176,7 @@ class PokemonCard(PlayingCard):
         return False
 
     def get_name(self) -> str:
-        return self.pokemon.name if self.level_str() == '' else f'{self.pokemon.name} {self.level_str()}'
+        return self.name
     
     def pokemon_name(self) -> str:
         return self.pokemon.name
@@ -184,10 +196,10 @@ class PokemonCard(PlayingCard):
             return 'ex'
 
     def get_weakness(self) -> EnergyType:
-        return weakness(self.pokemon_type)
+        return self.weakness
     
     def get_resistance(self) -> EnergyType:
-        return resistance(self.pokemon_type)
+        return self.resistance
     
     def get_energy_type(self) -> EnergyType:
-        return energy_type(self.pokemon_type)
+        return self.energy_type
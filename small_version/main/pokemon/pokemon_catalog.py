@@ -0,0 +1,189 @@
+from pokemon.pokemon_card import Attack, Ability, Pokemon, PokemonCard, PlayingCard, Trainer, CardType
+from pokemon.pokemon_types import PokemonType, EnergyType, EnergyContainer
+from pokemon.pokemon_battle import UserInput
+
+from typing import Any, Callable
+import json
+import os
+import pickle
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'data', 'catalog.json')
+
+# tagged values in effect inputs, written as {"EnergyType": "FIRE"} and so on
+ENUM_TAGS = {
+    'EnergyType':  EnergyType,
+    'PokemonType': PokemonType,
+    'CardType':    CardType,
+}
+
+def decode_value(value:Any) -> Any:
+    """Turns a value from the catalog file back into the value used by the engine. Lists become tuples and tagged
+    objects become enums or UserInputs
+
+    :param value: The value as read from the json
+    :type value: Any
+    :return: The decoded value
+    :rtype: Any
+    """
+    if isinstance(value, list):
+        return tuple(decode_value(item) for item in value)
+    if isinstance(value, dict):
+        (tag, content), = value.items()
+        if tag == 'UserInput':
+            return UserInput(*content)
+        return ENUM_TAGS[tag][content]
+    return value
+
+def decode_energies(energies:dict[str,int]) -> EnergyContainer:
+    return EnergyContainer({EnergyType[name]:count for name, count in energies.items()})
+
+class CardCatalog:
+    """Reads the cards from a catalog file and only builds the objects that are asked for. Every object is built
+    once, so equal lookups return the same object
+    """
+
+    def __init__(self, data:dict[str,dict[str,dict]]):
+        self.data = data
+        self.built_abilities = dict[str,Ability]()
+        self.built_attacks = dict[str,Attack]()
+        self.built_pokemon = dict[str,Pokemon]()
+        self.built_pokemon_cards = dict[str,PokemonCard]()
+        self.built_trainers = dict[str,Trainer]()
+
+    def ability(self, id_str:str) -> Ability:
+        ability = self.built_abilities.get(id_str)
+        if ability is None:
+            entry = self.data['abilities'][id_str]
+            ability = Ability(id_str, entry['name'], entry['text'], decode_value(entry['effects']), entry['trigger'])
+            self.built_abilities[id_str] = ability
+        return ability
+
+    def attack(self, id_str:str) -> Attack:
+        attack = self.built_attacks.get(id_str)
+        if attack is None:
+            entry = self.data['attacks'][id_str]
+            attack = Attack(id_str, entry['name'], decode_value(entry['damage_effect']), decode_energies(entry['energy_cost']),
+                            PokemonType[entry['attack_type']], entry['text'], decode_value(entry['effects']))
+            self.built_attacks[id_str] = attack
+        return attack
+
+    def pokemon(self, name:str) -> Pokemon:
+        pokemon = self.built_pokemon.get(name)
+        if pokemon is None:
+            entry = self.data['pokemon'][name]
+            evolves_from = self.pokemon(entry['evolves_from']) if entry['evolves_from'] is not None else None
+            pokemon = Pokemon(name, evolves_from, tuple(PokemonType[pokemon_type] for pokemon_type in entry['types']))
+            self.built_pokemon[name] = pokemon
+        return pokemon
+
+    def pokemon_card(self, id_str:str) -> PokemonCard:
+        card = self.built_pokemon_cards.get(id_str)
+        if card is None:
+            card = self.make_pokemon_card(id_str, self.pokemon, self.attack, self.ability)
+            self.built_pokemon_cards[id_str] = card
+        return card
+
+    def make_pokemon_card(self, id_str:str, pokemon:Callable[[str],Pokemon], attacks:Callable[[str],Attack], abilities:Callable[[str],Ability]) -> PokemonCard:
+        """Builds a pokemon card without remembering it, looking up what it refers to with the given functions
+
+        :param id_str: The id of the card, see PokemonCard.id_str
+        :type id_str: str
+        :param pokemon: Finds a Pokemon by name
+        :type pokemon: Callable[[str],Pokemon]
+        :param attacks: Finds an Attack by id
+        :type attacks: Callable[[str],Attack]
+        :param abilities: Finds an Ability by id
+        :type abilities: Callable[[str],Ability]
+        :return: The pokemon card
+        :rtype: PokemonCard
+        """
+        entry = self.data['pokemon_cards'][id_str]
+        return PokemonCard(pokemon(entry['pokemon']), entry['version'], entry['hit_points'], PokemonType[entry['pokemon_type']],
+                           tuple(attacks(attack) for attack in entry['attacks']), entry['retreat_cost'], entry['level'],
+                           tuple(abilities(ability) for ability in entry['abilities']))
+
+    def trainer(self, name:str) -> Trainer:
+        trainer = self.built_trainers.get(name)
+        if trainer is None:
+            entry = self.data['trainers'][name]
+            trainer = Trainer(CardType[entry['card_type']], name, entry['text'], decode_value(entry['effects']))
+            self.built_trainers[name] = trainer
+        return trainer
+
+    def card(self, name:str) -> PlayingCard:
+        """Finds a pokemon card by its id or a trainer by its name
+
+        :param name: The id of a pokemon card, like 'Bulbasaur 0', or the name of a trainer
+        :type name: str
+        :raises KeyError: If the catalog has no such card
+        :return: The card
+        :rtype: PlayingCard
+        """
+        if name in self.data['pokemon_cards']:
+            return self.pokemon_card(name)
+        return self.trainer(name)
+
+    def abilities(self) -> dict[str,Ability]:
+        return {id_str:self.ability(id_str) for id_str in self.data['abilities']}
+
+    def attacks(self) -> dict[str,Attack]:
+        return {id_str:self.attack(id_str) for id_str in self.data['attacks']}
+
+    def all_pokemon(self) -> dict[str,Pokemon]:
+        return {name:self.pokemon(name) for name in self.data['pokemon']}
+
+    def pokemon_cards(self) -> dict[str,PokemonCard]:
+        return {id_str:self.pokemon_card(id_str) for id_str in self.data['pokemon_cards']}
+
+    def trainers(self) -> dict[str,Trainer]:
+        return {name:self.trainer(name) for name in self.data['trainers']}
+
+def read_catalog_data(path:str, cache_path:str|None=None) -> dict[str,dict[str,dict]]:
+    """Reads a catalog file. With a cache path the parsed file is also pickled, and the pickle is read instead while
+    the catalog file keeps the same size and modification time
+
+    :param path: The json catalog file
+    :type path: str
+    :param cache_path: Where to keep the binary cache, defaults to no cache
+    :type cache_path: str|None
+    :return: The entries of each section of the catalog
+    :rtype: dict[str,dict[str,dict]]
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as file:
+                cached_stamp, data = pickle.load(file)
+            if cached_stamp == stamp:
+                return data
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'wb') as file:
+                pickle.dump((stamp, data), file, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+    return data
+
+catalogs = dict[str,CardCatalog]()
+
+def load_catalog(path:str=CATALOG_PATH, cache_path:str|None=None) -> CardCatalog:
+    """Gets the catalog of a file, reading it the first time it is asked for in this process
+
+    :param path: The json catalog file, defaults to the catalog of the standard cards
+    :type path: str
+    :param cache_path: Where to keep a binary cache of the file, see read_catalog_data
+    :type cache_path: str|None
+    :return: The catalog
+    :rtype: CardCatalog
+    """
+    path = os.path.abspath(path)
+    catalog = catalogs.get(path)
+    if catalog is None:
+        catalog = CardCatalog(read_catalog_data(path, cache_path))
+        catalogs[path] = catalog
+    return catalog
@@ -1,143 +1,65 @@
-from pokemon.pokemon_card import Attack, Ability, Pokemon, PokemonCard, Trainer, CardType
-from pokemon.pokemon_types import PokemonType, EnergyType, EnergyContainer
-from pokemon.pokemon_battle import UserInput 
-
-from frozendict import frozendict
+from pokemon.pokemon_card import Attack, Ability, Pokemon, PokemonCard, Trainer
+from pokemon.pokemon_catalog import load_catalog
+from pokemon.pokemon_registry import CardRegistry
+from pokemon.pokemon_index import CardIndex
 
 def generate_abilities() -> dict[str,Ability]:
-    powder_heal = Ability('butterfree_0', 'Powder Heal', 'Once during your turn, you may heal 20 damage from each of your Pokemon.', (('heal', ('all', 20)),), 'user')
-    return {
-        powder_heal.id_str: powder_heal
-    }
+    return load_catalog().abilities()
 
 def generate_attacks() -> dict[str,Attack]:
-    vine_whip     = Attack('bulbasaur_0', 'Vine Whip',     ('base', (40,)),  EnergyContainer(frozendict({EnergyType.COLORLESS:1,EnergyType.GRASS:1})), PokemonType.GRASS)
-    razor_leaf    = Attack('ivysaur_0',   'Razor Leaf',    ('base', (60,)),  EnergyContainer(frozendict({EnergyType.COLORLESS:2,EnergyType.GRASS:1})), PokemonType.GRASS)
-    giant_bloom1  = Attack('venusaur_0',  'Giant Bloom',   ('base', (80,)),  EnergyContainer(frozendict({EnergyType.COLORLESS:2,EnergyType.GRASS:2})), PokemonType.GRASS, 'Heal 30 damage from this pokemon.', effects=(('heal', (0, 30)),))
-    giant_bloom2  = Attack('venusaur_1',  'Giant Bloom',   ('base', (100,)), EnergyContainer(frozendict({EnergyType.COLORLESS:2,EnergyType.GRASS:2})), PokemonType.GRASS, 'Heal 30 damage from this pokemon.', effects=(('heal', (0, 30)),))
-    ember         = Attack('charmander_0','Ember',         ('base', (30,)),  EnergyContainer(frozendict({EnergyType.FIRE:1})),                         PokemonType.FIRE,  'Discard a FIRE energy from this pokemon.', effects=(('discard_energy', (True, 0, 1, EnergyType.FIRE)),))
-    fire_claws    = Attack('charmeleon_0','Fire Claws',    ('base', (60,)),  EnergyContainer(frozendict({EnergyType.FIRE:1, EnergyType.COLORLESS:2})), PokemonType.FIRE)
-    slash         = Attack('charizard_0', 'Slash',         ('base', (60,)),  EnergyContainer(frozendict({EnergyType.FIRE:1, EnergyType.COLORLESS:2})), PokemonType.FIRE)
-    fire_spin     = Attack('charizard_1', 'Fire Spin',     ('base', (150,)), EnergyContainer(frozendict({EnergyType.FIRE:2, EnergyType.COLORLESS:2})), PokemonType.FIRE,  'Discard 2 FIRE energy from this pokemon.', effects=(('discard_energy', (True, 0, 2, EnergyType.FIRE)),))
-    crimson_storm = Attack('charizard_2', 'Crimson Storm', ('base', (200,)), EnergyContainer(frozendict({EnergyType.FIRE:2, EnergyType.COLORLESS:2})), PokemonType.FIRE,  'Discard 2 FIRE energy from this pokemon.', effects=(('discard_energy', (True, 0, 2, EnergyType.FIRE)),))
-    water_gun     = Attack('squirtle_0',  'Water Gun',     ('base', (20,)),  EnergyContainer(frozendict({EnergyType.WATER:1})),                        PokemonType.WATER)
-    wave_splash   = Attack('wartortle_0', 'Wave Splash',   ('base', (40,)),  EnergyContainer(frozendict({EnergyType.WATER:1,EnergyType.COLORLESS:1})), PokemonType.WATER)
-    surf          = Attack('blastoise_0', 'Surf',          ('base', (40,)),  EnergyContainer(frozendict({EnergyType.WATER:1,EnergyType.COLORLESS:1})), PokemonType.WATER)
-    hydro_pump    = Attack('blastoise_1', 'Hydro Pump',    ('energy_boost',  (80,  60, 2, EnergyType.WATER)),  EnergyContainer(frozendict({EnergyType.WATER:2,EnergyType.COLORLESS:1})), PokemonType.WATER, 'If this Pokemon has at least 2 extra WATER energy attached, this attack does 60 more damage.')
-    hydro_bazooka = Attack('blastoise_2', 'Hydro Bazooka', ('energy_boost',  (100, 60, 2, EnergyType.WATER)), EnergyContainer(frozendict({EnergyType.WATER:2,EnergyType.COLORLESS:1})), PokemonType.WATER, 'If this Pokemon has at least 2 extra WATER energy attached, this attack does 60 more damage.')
-    find_a_friend = Attack('caterpie_0',  'Find A Friend', ('base', (0,)),   EnergyContainer(frozendict({EnergyType.COLORLESS:1})), PokemonType.BUG, 'Put 1 random GRASS pokemon from your deck into your hand.', effects=(('get_card', (1, CardType.POKEMON, EnergyType.GRASS, False)),))
-    bug_bite      = Attack('metapod_0',   'Bug Bite',      ('base', (30,)),  EnergyContainer(frozendict({EnergyType.COLORLESS:2})), PokemonType.BUG)
-    gust          = Attack('butterfree_0','Gust',          ('base', (60,)),  EnergyContainer(frozendict({EnergyType.GRASS:1,EnergyType.COLORLESS:2})), PokemonType.BUG)
-    bite          = Attack('growlithe_0', 'Bite',          ('base', (20,)),  EnergyContainer(frozendict({EnergyType.COLORLESS:2})),                    PokemonType.FIRE)
-    heat_tackle   = Attack('arcanine_0',  'Heat Tackle',   ('base', (100,)), EnergyContainer(frozendict({EnergyType.COLORLESS:1,EnergyType.FIRE:2})),  PokemonType.FIRE, 'This Pokemon also does 20 damage to itself.', effects=(('damage', (0, 20)),))
-    inferno_onrush= Attack('arcanine_1',  'Inferno Onrush',('base', (120,)), EnergyContainer(frozendict({EnergyType.COLORLESS:1,EnergyType.FIRE:2})),  PokemonType.FIRE, 'This Pokemon also does 20 damage to itself.', effects=(('damage', (0, 20)),))
-
-    attacks = {
-        vine_whip.id_str:     vine_whip,
-        razor_leaf.id_str:    razor_leaf,
-        giant_bloom1.id_str:  giant_bloom1,
-        giant_bloom2.id_str:  giant_bloom2,
-        ember.id_str:         ember,
-        fire_claws.id_str:    fire_claws,
-        slash.id_str:         slash,
-        fire_spin.id_str:     fire_spin,
-        crimson_storm.id_str: crimson_storm,
-        water_gun.id_str:     water_gun,
-        wave_splash.id_str:   wave_splash,
-        surf.id_str:          surf,
-        hydro_pump.id_str:    hydro_pump,
-        hydro_bazooka.id_str: hydro_bazooka,
-        find_a_friend.id_str: find_a_friend,
-        bug_bite.id_str:      bug_bite,
-        gust.id_str:          gust,
-        bite.id_str:          bite,
-        heat_tackle.id_str:   heat_tackle,
-        inferno_onrush.id_str:inferno_onrush,
-    }
-    return attacks
+    return load_catalog().attacks()
 
 def generate_pokemon() -> dict[str,Pokemon]:
-    bulbasaur =  Pokemon('Bulbasaur',  None,       (PokemonType.GRASS,PokemonType.POISON))
-    ivysaur   =  Pokemon('Ivysaur',    bulbasaur,  (PokemonType.GRASS,PokemonType.POISON))
-    venusaur  =  Pokemon('Venusaur',   ivysaur,    (PokemonType.GRASS,PokemonType.POISON))
-    charmander = Pokemon('Charmander', None,       (PokemonType.FIRE,))
-    charmeleon = Pokemon('Charmeleon', charmander, (PokemonType.FIRE,))
-    charizard  = Pokemon('Charizard',  charmeleon, (PokemonType.FIRE,))
-    squirtle   = Pokemon('Squirtle',   None,       (PokemonType.WATER,))
-    wartortle  = Pokemon('Wartortle',  squirtle,   (PokemonType.WATER,))
-    blastoise  = Pokemon('Blastoise',  wartortle,  (PokemonType.WATER,))
-    caterpie   = Pokemon('Caterpie',   None,       (PokemonType.BUG,))
-    metapod    = Pokemon('Metapod',    caterpie,   (PokemonType.BUG,))
-    butterfree = Pokemon('Butterfree', metapod,    (PokemonType.BUG,))
-    growlithe  = Pokemon('Growlithe',  None,       (PokemonType.FIRE,))
-    arcanine   = Pokemon('Arcanine',   growlithe,  (PokemonType.FIRE,))
-    pokemon = {
-        bulbasaur.name:  bulbasaur,
-        ivysaur.name:    ivysaur,
-        venusaur.name:   venusaur,
-        charmander.name: charmander,
-        charmeleon.name: charmeleon,
-        charizard.name:  charizard,
-        squirtle.name:   squirtle,
-        wartortle.name:  wartortle,
-        blastoise.name:  blastoise,
-        caterpie.name:   caterpie,
-        metapod.name:    metapod,
-        butterfree.name: butterfree,
-        growlithe.name:  growlithe,
-        arcanine.name:   arcanine,
-    }
-    return pokemon
+    return load_catalog().all_pokemon()
 
-def generate_pokemon_cards(pokemon:dict[str,Pokemon], attacks:dict[str,Attack], abilities:dict[str,Ability]) -> dict[str,PokemonCard]:
-    bulbasaur    = PokemonCard(pokemon['Bulbasaur'],  0,  70, PokemonType.GRASS, (attacks['bulbasaur_0'],),1)
-    ivysaur      = PokemonCard(pokemon['Ivysaur'],    0,  90, PokemonType.GRASS, (attacks['ivysaur_0'],),  2)
-    venusaur     = PokemonCard(pokemon['Venusaur'],   0, 160, PokemonType.GRASS, (attacks['venusaur_0'],), 3)
-    venusaur_ex  = PokemonCard(pokemon['Venusaur'],   0, 190, PokemonType.GRASS, (attacks['ivysaur_0'], attacks['venusaur_1']), 3, level=102)
-    charmander   = PokemonCard(pokemon['Charmander'], 0,  60, PokemonType.FIRE,  (attacks['charmander_0'],), 1)
-    charmeleon   = PokemonCard(pokemon['Charmeleon'], 0,  90, PokemonType.FIRE,  (attacks['charmeleon_0'],), 2)
-    charizard    = PokemonCard(pokemon['Charizard'],  0, 150, PokemonType.FIRE,  (attacks['charizard_1'],),  2)
-    charizard_ex = PokemonCard(pokemon['Charizard'],  0, 180, PokemonType.FIRE,  (attacks['charizard_0'], attacks['charizard_2']), 2, level=102)
-    squirtle     = PokemonCard(pokemon['Squirtle'],   0,  60, PokemonType.WATER, (attacks['squirtle_0'],),  1)
-    wartortle    = PokemonCard(pokemon['Wartortle'],  0,  80, PokemonType.WATER, (attacks['wartortle_0'],), 1)
-    blastoise    = PokemonCard(pokemon['Blastoise'],  0, 150, PokemonType.WATER, (attacks['blastoise_1'],), 3)
-    blastoise_ex = PokemonCard(pokemon['Blastoise'],  0, 180, PokemonType.WATER, (attacks['blastoise_0'], attacks['blastoise_2']), 3, level=102)
-    caterpie     = PokemonCard(pokemon['Caterpie'],   0,  50, PokemonType.BUG,   (attacks['caterpie_0'],), 1)
-    metapod      = PokemonCard(pokemon['Metapod'],    0,  80, PokemonType.BUG,   (attacks['metapod_0'],), 2)
-    butterfree   = PokemonCard(pokemon['Butterfree'], 0, 120, PokemonType.BUG,   (attacks['butterfree_0'],), 1, abilities=(abilities['butterfree_0'],))
-    growlithe    = PokemonCard(pokemon['Growlithe'],  0,  70, PokemonType.FIRE,  (attacks['growlithe_0'],), 1)
-    arcanine     = PokemonCard(pokemon['Arcanine'],   0, 130, PokemonType.FIRE,  (attacks['arcanine_0'],), 2)
-    arcanine_ex  = PokemonCard(pokemon['Arcanine'],   0, 150, PokemonType.FIRE,  (attacks['arcanine_1'],), 2, level=102)
-    pokemon = {
-        bulbasaur.id_str():    bulbasaur,
-        ivysaur.id_str():      ivysaur,
-        venusaur.id_str():     venusaur,
-        venusaur_ex.id_str():  venusaur_ex,
-        charmander.id_str():   charmander,
-        charmeleon.id_str():   charmeleon,
-        charizard.id_str():    charizard,
-        charizard_ex.id_str(): charizard_ex,
-        squirtle.id_str():     squirtle,
-        wartortle.id_str():    wartortle,
-        blastoise.id_str():    blastoise,
-        blastoise_ex.id_str(): blastoise_ex,
-        caterpie.id_str():     caterpie,
-        metapod.id_str():      metapod,
-        butterfree.id_str():   butterfree,
-        growlithe.id_str():    growlithe,
-        arcanine.id_str():     arcanine,
-        arcanine_ex.id_str():  arcanine_ex,
-    }
-    return pokemon
+def generate_pokemon_cards(pokemon:dict[str,Pokemon]|None=None, attacks:dict[str,Attack]|None=None, abilities:dict[str,Ability]|None=None) -> dict[str,PokemonCard]:
+    """Gets every pokemon card of the catalog
+
+    :param pokemon: The pokemon the cards are built from, defaults to the ones in the catalog
+    :type pokemon: dict[str,Pokemon]|None
+    :param attacks: The attacks the cards are built from, defaults to the ones in the catalog
+    :type attacks: dict[str,Attack]|None
+    :param abilities: The abilities the cards are built from, defaults to the ones in the catalog
+    :type abilities: dict[str,Ability]|None
+    :return: The cards, keyed by PokemonCard.id_str
+    :rtype: dict[str,PokemonCard]
+    """
+    catalog = load_catalog()
+    if pokemon is None and attacks is None and abilities is None:
+        return catalog.pokemon_cards()
+    find_pokemon   = pokemon.__getitem__   if pokemon   is not None else catalog.pokemon
+    find_attack    = attacks.__getitem__   if attacks   is not None else catalog.attack
+    find_ability   = abilities.__getitem__ if abilities is not None else catalog.ability
+    return {id_str:catalog.make_pokemon_card(id_str, find_pokemon, find_attack, find_ability) for id_str in catalog.data['pokemon_cards']}
 
 def generate_trainers() -> dict[str,Trainer]:
-    oak      = Trainer(CardType.SUPPORTER, "Professor's Research", "Draw 2 cards.",                                                        (("draw", (2,)),))
-    sabrina  = Trainer(CardType.SUPPORTER, "Sabrina",              "Your opponent swaps their active pokemon with a card on their bench.", (('switch_active',(UserInput('Select a new active pokemon.', False), False)),))
-    pokeball = Trainer(CardType.ITEM,      "Pokeball",             "Put a random Basic Pokemon from your bench into your hand.",           (("get_card", (1,CardType.POKEMON,None,True)),))
-    potion   = Trainer(CardType.ITEM,      'Potion',               'Heal 20 damage from one of your cards.',                               (("heal", (UserInput('Select a card to heal.'), 20)),))
-    return {
-        oak.name      :oak,
-        sabrina.name  :sabrina,
-        pokeball.name :pokeball,
-        potion.name   :potion,
-    }
\ No newline at end of file
+    return load_catalog().trainers()
+
+def generate_card_registry(pokemon_cards:dict[str,PokemonCard]|None=None, trainers:dict[str,Trainer]|None=None) -> CardRegistry:
+    """Registers every generated card, pokemon cards first, so each card gets the same id every time
+
+    :param pokemon_cards: The pokemon cards to register, defaults to generating them
+    :type pokemon_cards: dict[str,PokemonCard]|None
+    :param trainers: The trainers to register, defaults to generating them
+    :type trainers: dict[str,Trainer]|None
+    :return: The registry of the cards
+    :rtype: CardRegistry
+    """
+    if pokemon_cards is None:
+        pokemon_cards = generate_pokemon_cards()
+    if trainers is None:
+        trainers = generate_trainers()
+    registry = CardRegistry(pokemon_cards.values())
+    for trainer in trainers.values():
+        registry.intern(trainer)
+    return registry
+
+def generate_card_index(registry:CardRegistry|None=None) -> CardIndex:
+    """Indexes every card of a registry so it can be queried
+
+    :param registry: The cards to index, defaults to generate_card_registry()
+    :type registry: CardRegistry|None
+    :return: The index of the cards
+    :rtype: CardIndex
+    """
+    return CardIndex(registry if registry is not None else generate_card_registry())
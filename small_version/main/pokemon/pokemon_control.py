@@ -1,8 +1,12 @@
 from pokemon.pokemon_battle import Battle, Action, Rules, OwnDeckView, OpponentDeckView, get_opponent_deck_view, get_own_deck_view, UserInput
 from pokemon.print_visualizer import visualize_own_deck, visualize_opponent_deck, visualize_active_pokemon, visualize_card
+from pokemon.pokemon_damage import damage_matrix
 from pokemon.pokemon_types import EnergyType
 
-def battle_control(battle:Battle, controller1:'BattleController', controller2:'BattleController') -> None:
+from typing import Iterable
+import random
+
+def battle_control(battle:Battle, controller1:'BattleController', controller2:'BattleController', verbose:bool=True) -> None:
     """Controls the flow and inputs to a battle
 
     :param battle: The battle to control
@@ -11,47 +15,149 @@ def battle_control(battle:Battle, controller1:'BattleController', controller2:'B
     :type controller1: BattleController
     :param controller2: The controller for team 2
     :type controller2: BattleController
+    :param verbose: Whether to print the progress of the battle
+    :type verbose: bool
     """
-    print("The battle has begun")
+    # the battle itself is passed to make_move as well as the views, which gives automated controllers perfect
+    # information, see AutomatedBattleController
+    say = print if verbose else lambda *args: None
+    say("The battle has begun")
 
-    print("Team 1 set up your cards")
-    action, inputs = controller1.make_move(get_own_deck_view(battle.state.deck1), get_opponent_deck_view(battle.state.deck2), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs())
+    say("Team 1 set up your cards")
+    action, inputs = controller1.make_move(get_own_deck_view(battle.state.deck1), get_opponent_deck_view(battle.state.deck2), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs(), battle)
     inputs = (True, *inputs)
     while not battle.action(action, inputs):
-        print("\nInvalid move, Team 1 set up your cards")
-        action, inputs = controller1.make_move(get_own_deck_view(battle.state.deck1), get_opponent_deck_view(battle.state.deck2), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs())
+        say("\nInvalid move, Team 1 set up your cards")
+        action, inputs = controller1.make_move(get_own_deck_view(battle.state.deck1), get_opponent_deck_view(battle.state.deck2), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs(), battle)
         inputs = (True, *inputs)
     
-    print("Team 2 set up your cards")
-    action, inputs = controller2.make_move(get_own_deck_view(battle.state.deck2), get_opponent_deck_view(battle.state.deck1), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs())
+    say("Team 2 set up your cards")
+    action, inputs = controller2.make_move(get_own_deck_view(battle.state.deck2), get_opponent_deck_view(battle.state.deck1), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs(), battle)
     inputs = (False, *inputs)
     while not battle.action(action, inputs):
-        print("\nInvalid move, Team 2 set up your cards")
-        action, inputs = controller2.make_move(get_own_deck_view(battle.state.deck2), get_opponent_deck_view(battle.state.deck1), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs())
+        say("\nInvalid move, Team 2 set up your cards")
+        action, inputs = controller2.make_move(get_own_deck_view(battle.state.deck2), get_opponent_deck_view(battle.state.deck1), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs(), battle)
         inputs = (False, *inputs)
 
-    print("Team 1, it's your turn")
-    action, inputs = controller1.make_move(get_own_deck_view(battle.state.deck1), get_opponent_deck_view(battle.state.deck2), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs())
+    say("Team 1, it's your turn")
+    action, inputs = controller1.make_move(get_own_deck_view(battle.state.deck1), get_opponent_deck_view(battle.state.deck2), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs(), battle)
     while not battle.is_over():
         success = battle.action(action, inputs)
         if not success:
-            print("Invalid move, try again")
+            say("Invalid move, try again")
+        if battle.is_over():
+            break
         if battle.team1_move():
-            print("Team 1, it's your move")
-            action, inputs = controller1.make_move(get_own_deck_view(battle.state.deck1), get_opponent_deck_view(battle.state.deck2), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs())
+            say("Team 1, it's your move")
+            action, inputs = controller1.make_move(get_own_deck_view(battle.state.deck1), get_opponent_deck_view(battle.state.deck2), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs(), battle)
         else:
-            print("Team 2, it's your turn")
-            action, inputs = controller2.make_move(get_own_deck_view(battle.state.deck2), get_opponent_deck_view(battle.state.deck1), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs())
-    print("Battle is over")
+            say("Team 2, it's your turn")
+            action, inputs = controller2.make_move(get_own_deck_view(battle.state.deck2), get_opponent_deck_view(battle.state.deck1), battle.available_actions(), battle.get_rules(), battle.get_score(), battle.get_partial_inputs(), battle)
+    say("Battle is over")
 
 class BattleController:
 
     def __init__(self):
         pass
 
-    def make_move(self, own_deck:OwnDeckView, opponent_deck:OpponentDeckView, available_actions:dict[str,Action], rules:Rules, score:tuple[int], partial_inputs:tuple) -> tuple[str,tuple[int|EnergyType]]:
+    def make_move(self, own_deck:OwnDeckView, opponent_deck:OpponentDeckView, available_actions:dict[str,Action], rules:Rules, score:tuple[int], partial_inputs:tuple, battle:Battle|None=None) -> tuple[str,tuple[int|EnergyType]]:
         pass
 
+class AutomatedBattleController(BattleController):
+    """A controller that picks its moves from the battle itself, without any input or output. It can also be used
+    as a Policy in pokemon_simulation
+
+    These controllers have perfect information. They are given the whole Battle, so nothing stops them from reading
+    the other team's hand or the order of either draw pile. The controllers here only look at the legal moves and the
+    active pokemon, which the moving team can see anyway. A controller that should only see what a player sees can
+    use the deck views passed to make_move, or search with a DeterminizedMCTSSearch
+    """
+
+    def __init__(self, seed:int|None=None):
+        super().__init__()
+        self.rng = random.Random(seed)
+
+    def choose_move(self, battle:Battle, rng:random.Random) -> tuple[str,tuple]:
+        """Picks the next move
+
+        :param battle: The battle to move in, with nothing hidden from the controller
+        :type battle: Battle
+        :param rng: The random generator to make any random choices with
+        :type rng: random.Random
+        :return: The name and inputs of the move, as accepted by Battle.action
+        :rtype: tuple[str,tuple]
+        """
+        pass
+
+    def make_move(self, own_deck:OwnDeckView, opponent_deck:OpponentDeckView, available_actions:dict[str,Action], rules:Rules, score:tuple[int], partial_inputs:tuple, battle:Battle|None=None) -> tuple[str,tuple[int|EnergyType]]:
+        if battle is None:
+            raise ValueError(f'{type(self).__name__} needs the battle to choose a move')
+        name, inputs = self.choose_move(battle, self.rng)
+        if name == 'setup':
+            # battle_control adds the team to setup moves
+            inputs = inputs[1:]
+        return name, inputs
+
+    def __call__(self, battle:Battle, rng:random.Random) -> tuple[str,tuple]:
+        return self.choose_move(battle, rng)
+
+class RandomBattleController(AutomatedBattleController):
+    """Picks uniformly among the legal moves
+    """
+
+    def choose_move(self, battle:Battle, rng:random.Random) -> tuple[str,tuple]:
+        return rng.choice(battle.legal_moves())
+
+class ScriptedBattleController(AutomatedBattleController):
+    """Replays a fixed list of moves in order, whether or not they are legal. A select move is given the UserInput
+    the battle is waiting on, so scripts can be recorded from one battle and replayed in another. Its inputs can be
+    just the selected value
+    """
+
+    def __init__(self, moves:Iterable[tuple[str,tuple]]):
+        super().__init__(0)
+        self.moves = list(moves)
+        self.next_move = 0
+
+    def choose_move(self, battle:Battle, rng:random.Random) -> tuple[str,tuple]:
+        if self.next_move >= len(self.moves):
+            raise IndexError('The script has no moves left')
+        name, inputs = self.moves[self.next_move]
+        self.next_move += 1
+        if name == 'select' and battle.state.next_action() == name:
+            inputs = (battle.get_partial_inputs()[0], inputs[-1])
+        return name, inputs
+
+class GreedyBattleController(AutomatedBattleController):
+    """Attacks with the attack that does the most damage when it can, otherwise attaches energy to the active pokemon,
+    otherwise plays basics, otherwise ends the turn. Moves the battle asks for, like selections, are picked at random
+    """
+
+    def choose_move(self, battle:Battle, rng:random.Random) -> tuple[str,tuple]:
+        moves = battle.legal_moves()
+        by_name = dict[str,list[tuple]]()
+        for name, inputs in moves:
+            by_name.setdefault(name, []).append(inputs)
+        if 'setup' in by_name:
+            return 'setup', max(by_name['setup'], key=len)
+        if 'attack' in by_name:
+            return 'attack', self.best_attack(battle, by_name['attack'])
+        if 'place_energy' in by_name:
+            return 'place_energy', by_name['place_energy'][0]
+        if 'play_basic' in by_name:
+            return 'play_basic', by_name['play_basic'][0]
+        if 'end_turn' in by_name:
+            return 'end_turn', by_name['end_turn'][0]
+        return rng.choice(moves)
+
+    def best_attack(self, battle:Battle, attacks:list[tuple]) -> tuple:
+        state = battle.state
+        defender = state.defending_deck().active[0] if len(state.defending_deck().active) > 0 else None
+        if defender is None:
+            return attacks[0]
+        damage = damage_matrix(state.rules, state.current_deck().active[0], [defender], battle=state).damage[:, 0]
+        return max(attacks, key=lambda inputs: damage[inputs[0]])
+
 
 class CommandLineAction:
     def action_name(self) -> str:
@@ -251,7 +357,7 @@ class CommandLineBattleController(BattleController):
                 print("Invalid command, try list to see all commands")
         return False, None, None
 
-    def make_move(self, own_deck:OwnDeckView, opponent_deck:OpponentDeckView, available_actions:dict[str,Action], rules:Rules, score:tuple[int], partial_inputs:tuple) -> tuple[str,tuple[int|EnergyType]]:
+    def make_move(self, own_deck:OwnDeckView, opponent_deck:OpponentDeckView, available_actions:dict[str,Action], rules:Rules, score:tuple[int], partial_inputs:tuple, battle:Battle|None=None) -> tuple[str,tuple[int|EnergyType]]:
         commands = list[CommandLineAction]([
             ListAction(),
             ScoreAction(),
@@ -0,0 +1,182 @@
+from pokemon.pokemon_battle import ActivePokemon, BattleState, Rules, BaseDamageEffect, EnergyBoostDamageEffect
+from pokemon.pokemon_card import Attack
+from pokemon.pokemon_types import EnergyType, ENERGY_TYPE_COUNT, TYPE_MODIFIERS
+
+from dataclasses import dataclass
+from typing import Sequence
+import numpy as np
+
+# columns of an attack row: base damage, boost, energy type of the boost, energies of that type needed, energies needed
+ATTACK_ROW_SIZE = 5
+
+@dataclass(frozen=True)
+class DamageResult:
+    """The outcome of every attack against every defender. The arrays are indexed by attack and then defender, with
+    a leading state axis when several states are evaluated at once
+
+    damage is the damage done after weakness and resistance, remaining_hp is the hp left on the defender and
+    knocked_out is whether the attack knocks the defender out. Entries where valid is False are padding, with no
+    damage, no hp and no knock out
+    """
+    damage:np.ndarray
+    remaining_hp:np.ndarray
+    knocked_out:np.ndarray
+    valid:np.ndarray
+
+    def matchup(self, index:int) -> 'DamageResult':
+        """Gets the results of one matchup or state from a batch
+
+        :param index: The position of the matchup in the batch
+        :type index: int
+        :return: Arrays indexed by attack and then defender
+        :rtype: DamageResult
+        """
+        return DamageResult(self.damage[index], self.remaining_hp[index], self.knocked_out[index], self.valid[index])
+
+def attack_row(rules:Rules, attack:Attack) -> tuple[int,int,int,int,int]|None:
+    """Turns the damage effect of an attack into numbers that can be evaluated in bulk
+
+    :param rules: The rules that decide which damage effect the attack uses
+    :type rules: Rules
+    :param attack: The attack to convert
+    :type attack: Attack
+    :return: The base damage, the boost, the EnergyType value of the boost, the energies of that type needed for the
+        boost and the total energies needed for the boost. None if the damage effect can only be evaluated one at a time
+    :rtype: tuple[int,int,int,int,int]|None
+    """
+    effect_name, inputs = attack.get_damage_effect()
+    effect = rules.get_damage_effect(effect_name)
+    if effect is None:
+        effect = rules.get_damage_effect('base')
+    if type(effect) is BaseDamageEffect:
+        return inputs[0], 0, 0, 0, 0
+    if type(effect) is EnergyBoostDamageEffect:
+        base, boost, extra_needed, type_needed = inputs
+        total_needed = extra_needed + attack.energy_cost.size()
+        if type_needed == EnergyType.COLORLESS:
+            return base, boost, 0, 0, total_needed
+        return base, boost, type_needed.value, extra_needed + attack.energy_cost.size_of(type_needed), total_needed
+    return None
+
+def scalar_attack_damage(battle:BattleState|None, rules:Rules, attacker:ActivePokemon, attack:Attack) -> int:
+    effect_name, inputs = attack.get_damage_effect()
+    effect = rules.get_damage_effect(effect_name)
+    if effect is None:
+        effect = rules.get_damage_effect('base')
+    return effect.damage(battle, attacker, attack, inputs)
+
+def raw_damage(rows:np.ndarray, counts:np.ndarray) -> np.ndarray:
+    """Evaluates attack rows against the energies attached to their attackers
+
+    :param rows: Attack rows, with any leading shape and a last axis of size ATTACK_ROW_SIZE
+    :type rows: np.ndarray
+    :param counts: The energies of each attacker indexed by EnergyType value, with the leading shape of rows minus
+        the attack axis
+    :type counts: np.ndarray
+    :return: The damage of each attack before weakness and resistance
+    :rtype: np.ndarray
+    """
+    counts = counts[..., None, :]
+    totals = counts.sum(axis=-1)
+    of_type = np.take_along_axis(counts, rows[..., 2:3], axis=-1)[..., 0]
+    boosted = (of_type >= rows[..., 3]) & (totals >= rows[..., 4])
+    return rows[..., 0] + np.where(boosted, rows[..., 1], 0)
+
+def damage_against(damage:np.ndarray, damage_type:np.ndarray, hit_points:np.ndarray, taken:np.ndarray, pokemon_types:np.ndarray, valid:np.ndarray, apply_weakness_resistance:bool) -> DamageResult:
+    # damage is (..., attacks) and the defender arrays are (..., defenders)
+    if apply_weakness_resistance:
+        modifiers = TYPE_MODIFIERS[pokemon_types, damage_type[..., None]]
+        damage = damage[..., :, None] + modifiers[..., None, :]
+    else:
+        damage = np.broadcast_to(damage[..., :, None], valid.shape)
+    remaining_hp = np.maximum(hit_points[..., None, :] - (taken[..., None, :] + damage), 0)
+    return DamageResult(np.where(valid, damage, 0), np.where(valid, remaining_hp, 0), valid & (remaining_hp <= 0), valid)
+
+def damage_matrix(rules:Rules, attacker:ActivePokemon, defenders:Sequence[ActivePokemon|None], *, battle:BattleState|None=None, apply_weakness_resistance:bool=True) -> DamageResult:
+    """Finds what every attack of a pokemon would do to each defender, the same way the attack action does
+
+    :param rules: The rules that decide the damage effects
+    :type rules: Rules
+    :param attacker: The attacking pokemon
+    :type attacker: ActivePokemon
+    :param defenders: The pokemon that could be attacked. None entries are left invalid
+    :type defenders: Sequence[ActivePokemon|None]
+    :param battle: Passed to damage effects that can't be evaluated in bulk
+    :type battle: BattleState|None
+    :param apply_weakness_resistance: Whether weakness and resistance change the damage
+    :type apply_weakness_resistance: bool
+    :return: Arrays indexed by attack index and then defender index
+    :rtype: DamageResult
+    """
+    return batch_damage(rules, [(attacker, defenders, battle)], apply_weakness_resistance=apply_weakness_resistance).matchup(0)
+
+def state_damage(states:Sequence[BattleState], *, apply_weakness_resistance:bool=True) -> DamageResult:
+    """Finds what every attack of the active pokemon of the team that is moving would do to each pokemon of the
+    defending team, for many states at once. The states need to share their rules
+
+    :param states: The states to evaluate
+    :type states: Sequence[BattleState]
+    :param apply_weakness_resistance: Whether weakness and resistance change the damage
+    :type apply_weakness_resistance: bool
+    :return: Arrays indexed by state, attack index and active index of the defending deck
+    :rtype: DamageResult
+    """
+    if len(states) == 0:
+        raise ValueError('No states to evaluate')
+    rules = states[0].rules
+    return batch_damage(rules, [(state.current_deck().active[0] if len(state.current_deck().active) > 0 else None, state.defending_deck().active, state) for state in states],
+                        apply_weakness_resistance=apply_weakness_resistance)
+
+def batch_damage(rules:Rules, matchups:Sequence[tuple[ActivePokemon|None,Sequence[ActivePokemon|None],BattleState|None]], *, apply_weakness_resistance:bool=True) -> DamageResult:
+    """Finds what every attack of each attacker would do to each of its defenders. Shorter lists of attacks and
+    defenders are padded to the longest and marked invalid
+
+    :param rules: The rules that decide the damage effects
+    :type rules: Rules
+    :param matchups: Each attacker with its defenders and the state passed to damage effects that can't be evaluated
+        in bulk. Missing attackers and defenders are left invalid
+    :type matchups: Sequence[tuple[ActivePokemon|None,Sequence[ActivePokemon|None],BattleState|None]]
+    :param apply_weakness_resistance: Whether weakness and resistance change the damage
+    :type apply_weakness_resistance: bool
+    :return: Arrays indexed by matchup, attack index and defender index
+    :rtype: DamageResult
+    """
+    batch = len(matchups)
+    attack_count = max((len(attacker.active_card().attacks) for attacker, _, _ in matchups if attacker is not None), default=0)
+    defender_count = max((len(defenders) for _, defenders, _ in matchups), default=0)
+    rows = np.zeros((batch, attack_count, ATTACK_ROW_SIZE), dtype=np.int64)
+    counts = np.zeros((batch, ENERGY_TYPE_COUNT), dtype=np.int64)
+    damage_type = np.zeros(batch, dtype=np.int64)
+    valid_attacks = np.zeros((batch, attack_count), dtype=bool)
+    hit_points = np.zeros((batch, defender_count), dtype=np.int64)
+    taken = np.zeros((batch, defender_count), dtype=np.int64)
+    pokemon_types = np.zeros((batch, defender_count), dtype=np.int64)
+    valid_defenders = np.zeros((batch, defender_count), dtype=bool)
+    scalar = list[tuple[int,int,int]]()
+    compiled = dict[int,tuple[int,int,int,int,int]|None]()
+    for i, (attacker, defenders, battle) in enumerate(matchups):
+        if attacker is not None:
+            card = attacker.active_card()
+            counts[i] = attacker.energies.counts
+            damage_type[i] = card.get_energy_type().value
+            for j, attack in enumerate(card.attacks):
+                if id(attack) not in compiled:
+                    compiled[id(attack)] = attack_row(rules, attack)
+                row = compiled[id(attack)]
+                if row is None:
+                    scalar.append((i, j, scalar_attack_damage(battle, rules, attacker, attack)))
+                else:
+                    rows[i, j] = row
+                valid_attacks[i, j] = True
+        for j, defender in enumerate(defenders):
+            if defender is not None:
+                card = defender.active_card()
+                hit_points[i, j] = card.hit_points
+                taken[i, j] = defender.damage
+                pokemon_types[i, j] = card.pokemon_type.value
+                valid_defenders[i, j] = True
+    damage = raw_damage(rows, counts)
+    for i, j, value in scalar:
+        damage[i, j] = value
+    valid = valid_attacks[:, :, None] & valid_defenders[:, None, :]
+    return damage_against(damage, damage_type, hit_points, taken, pokemon_types, valid, apply_weakness_resistance)
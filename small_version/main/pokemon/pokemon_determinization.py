@@ -0,0 +1,127 @@
+from pokemon.pokemon_battle import Battle, BattleState, Deck, OpponentDeckView, get_opponent_deck_view
+from pokemon.pokemon_card import PlayingCard
+from pokemon.pokemon_mcts import MCTSSearch, SearchNode, SearchStats, replace_pile
+from pokemon.pokemon_simulation import team1_moving
+
+from collections import Counter
+import numpy as np
+import random
+
+def unseen_cards(deck:Deck, view:OpponentDeckView) -> list[PlayingCard]:
+    """Finds the cards of a deck that could be in the hand or draw pile, which is the deck list minus the cards that
+    can be seen in the discard pile and the active pokemon
+
+    :param deck: The deck list of the team being viewed
+    :type deck: Deck
+    :param view: What can be seen of the team
+    :type view: OpponentDeckView
+    :raises ValueError: If the seen cards are not in the deck list or the number of unseen cards doesn't match the
+        hand and deck sizes of the view
+    :return: The unseen cards, in the order of the deck list
+    :rtype: list[PlayingCard]
+    """
+    seen = Counter(view.discard_pile)
+    for active in view.active:
+        if active is not None:
+            seen.update(active.get_cards())
+    unseen = list[PlayingCard]()
+    for card in deck.cards:
+        if seen[card] > 0:
+            seen[card] -= 1
+        else:
+            unseen.append(card)
+    if seen.total() > 0 or len(unseen) != view.hand_size + view.deck_size:
+        raise ValueError(f'The view of {deck.name} does not match its deck list')
+    return unseen
+
+class Determinizer:
+    """Samples full battle states that match what one team can see. The other team's hand and draw pile are dealt
+    again from the cards of its deck list that can't be seen, with a basic in the hand while that team hasn't set up,
+    and the viewing team's own draw pile is shuffled since its order can't be seen either. Everything else is copied
+    from the real state
+
+    The orders are drawn in bulk with a seeded numpy generator, so many worlds cost one array operation and a fork
+    each
+    """
+
+    def __init__(self, deck1:Deck, deck2:Deck, seed:int|None=None):
+        self.decks = {True: deck1, False: deck2}
+        self.rng = np.random.default_rng(seed)
+
+    def orders(self, size:int, count:int) -> np.ndarray:
+        """Draws random orders of a number of cards
+
+        :param size: How many cards to order
+        :type size: int
+        :param count: How many orders to draw
+        :type count: int
+        :return: One order per row, as positions into the cards
+        :rtype: np.ndarray
+        """
+        return self.rng.permuted(np.broadcast_to(np.arange(size), (count, size)), axis=1)
+
+    def sample(self, state:BattleState, team1:bool, count:int) -> list[BattleState]:
+        """Makes several determinizations of a state
+
+        :param state: The real state of the battle
+        :type state: BattleState
+        :param team1: Whether the worlds are sampled for team 1, otherwise team 2
+        :type team1: bool
+        :param count: How many worlds to make
+        :type count: int
+        :return: The sampled states, each with its own random generator
+        :rtype: list[BattleState]
+        """
+        own = state.deck1 if team1 else state.deck2
+        other = state.deck2 if team1 else state.deck1
+        view = get_opponent_deck_view(other)
+        hidden = unseen_cards(self.decks[not team1], view)
+        own_pile = list(own.deck)
+        hidden_orders = self.orders(len(hidden), count).tolist()
+        own_orders = self.orders(len(own_pile), count).tolist()
+        seeds = self.rng.integers(0, 2**63, count).tolist()
+        set_up = len(view.active) > 0
+        worlds = list[BattleState]()
+        for hidden_order, own_order, seed in zip(hidden_orders, own_orders, seeds):
+            world = state.fork(copy_on_write=True)
+            world.rng.seed(seed)
+            own_world, other_world = (world.deck1, world.deck2) if team1 else (world.deck2, world.deck1)
+            cards = [hidden[i] for i in hidden_order]
+            if not set_up and view.hand_size > 0:
+                # an opening hand always holds a basic, see DeckSetup
+                basics = [i for i, card in enumerate(cards) if card.is_basic()]
+                if len(basics) > 0:
+                    starter = basics[int(self.rng.integers(len(basics)))]
+                    cards[0], cards[starter] = cards[starter], cards[0]
+            other_world.hand = cards[:view.hand_size]
+            replace_pile(other_world, cards[view.hand_size:])
+            replace_pile(own_world, [own_pile[i] for i in own_order])
+            other_world.rehash_zones()
+            worlds.append(world)
+        return worlds
+
+    def sample_battles(self, battle:Battle, team1:bool, count:int) -> list[Battle]:
+        return [Battle(world, cache_actions=battle.action_cache is not None) for world in self.sample(battle.state, team1, count)]
+
+class DeterminizedMCTSSearch(MCTSSearch):
+    """Monte Carlo tree search that only uses what the team moving at the root can see. Each iteration plays in a
+    world from the Determinizer instead of a copy of the real battle. Worlds are drawn batch_size at a time
+    """
+
+    def __init__(self, determinizer:Determinizer, batch_size:int=32, **kwargs):
+        super().__init__(**kwargs)
+        self.determinizer = determinizer
+        self.batch_size = batch_size
+        self.worlds = list[Battle]()
+
+    def search(self, root:SearchNode, battle:Battle, rng:random.Random, iterations:int|None, time_limit:float|None) -> SearchStats:
+        # worlds drawn for an earlier position don't match this one
+        self.worlds.clear()
+        stats = super().search(root, battle, rng, iterations, time_limit)
+        self.worlds.clear()
+        return stats
+
+    def sample(self, battle:Battle, rng:random.Random) -> Battle:
+        if len(self.worlds) == 0:
+            self.worlds = self.determinizer.sample_battles(battle, team1_moving(battle.state), self.batch_size)
+        return self.worlds.pop()
@@ -0,0 +1,166 @@
+from pokemon.pokemon_battle import ActivePokemon, BattleState, OpponentDeckView, OwnDeckView, Rules, Turn
+from pokemon.pokemon_card import PlayingCard
+from pokemon.pokemon_registry import CardRegistry
+from pokemon.pokemon_simulation import team1_moving
+from pokemon.pokemon_types import EnergyContainer, EnergyType, ENERGY_TYPES, ENERGY_TYPE_COUNT
+
+from typing import Iterable, Sequence
+import numpy as np
+
+GLOBAL_FEATURES = ('own_points', 'opponent_points', 'turn_number', 'own_turn', 'used_supporters', 'retreats', 'energy_used', 'attacks_used')
+SLOT_FEATURES   = ('present', 'hit_points', 'hp', 'damage', 'turns_in_active', 'stage') + tuple(f'energy_{energy.name}' for energy in ENERGY_TYPES)
+
+class StateEncoder:
+    """Turns battle positions into vectors of a fixed length, seen from one team. Only what that team can see is
+    encoded: the hand of the other team only counts towards its hand size. Each vector holds, in order
+
+    - the points of both teams, the turn number, whether it is the team's turn and the counters of the current turn
+    - for the team and then the other team, each active and bench slot, with the hit points, hp left, damage, turns in
+      play, stage and energies of each type of the pokemon in it, then the hand, deck and discard sizes, the queue of
+      next energies one hot per position and the discarded energies of each type
+    - how many copies of each card of the registry are in the team's hand, by card id
+
+    feature_names gives the name of each position
+    """
+
+    def __init__(self, rules:Rules, registry:CardRegistry, dtype:np.dtype=np.float32):
+        self.registry = registry
+        self.dtype = dtype
+        self.slots = rules.BENCH_SIZE + 1
+        # the queue holds FUTURE_ENERGIES energies between turns and one more during a turn until it is attached
+        self.queue_length = rules.FUTURE_ENERGIES + 1
+        deck_names = [f'slot{slot}_{name}' for slot in range(self.slots) for name in SLOT_FEATURES]
+        deck_names += ['hand_size', 'deck_size', 'discard_size']
+        deck_names += [f'next_energy{position}_{energy.name}' for position in range(self.queue_length) for energy in ENERGY_TYPES]
+        deck_names += [f'discarded_{energy.name}' for energy in ENERGY_TYPES]
+        self.names = list(GLOBAL_FEATURES) + [f'own_{name}' for name in deck_names] + [f'opponent_{name}' for name in deck_names]
+        self.hand_start = len(self.names)
+        self.names += [f'hand_{card_id}' for card_id in range(len(registry))]
+        self.size = len(self.names)
+        self.empty_slot = [0] * len(SLOT_FEATURES)
+
+    def feature_names(self) -> list[str]:
+        return list(self.names)
+
+    def new_array(self, count:int|None=None) -> np.ndarray:
+        """Allocates an array to encode into
+
+        :param count: How many positions the array holds, defaults to a single vector
+        :type count: int|None
+        :return: The array, of shape (size,) or (count, size)
+        :rtype: np.ndarray
+        """
+        return np.zeros(self.size if count is None else (count, self.size), dtype=self.dtype)
+
+    def slot_features(self, active:ActivePokemon|None) -> list[int]:
+        if active is None:
+            return self.empty_slot
+        card = active.active_card()
+        return [1, card.hit_points, active.hp(), active.damage, active.turns_in_active, card.pokemon.get_stage(), *active.energies.counts]
+
+    def deck_features(self, active:Sequence[ActivePokemon|None], hand_size:int, deck_size:int, discard_size:int, energy_queue:Iterable[EnergyType], energy_discard:EnergyContainer) -> list[int]:
+        """Encodes what can be seen of one team, see the class description
+
+        :return: The features of the team
+        :rtype: list[int]
+        """
+        features = list[int]()
+        for slot in range(self.slots):
+            features += self.slot_features(active[slot] if slot < len(active) else None)
+        features += [hand_size, deck_size, discard_size]
+        queue = [0] * (self.queue_length * ENERGY_TYPE_COUNT)
+        for position, energy in zip(range(self.queue_length), energy_queue):
+            queue[position * ENERGY_TYPE_COUNT + energy.value] = 1
+        features += queue
+        features += energy_discard.counts
+        return features
+
+    def dense_features(self, state:BattleState, team1:bool) -> list[int]:
+        own, other = (state.deck1, state.deck2) if team1 else (state.deck2, state.deck1)
+        points = (state.team1_points, state.team2_points) if team1 else (state.team2_points, state.team1_points)
+        turn = state.current_turn
+        features = [*points, state.turn_number, team1_moving(state) == team1, turn.used_supporters, turn.retreats, turn.energy_used, turn.attacks_used]
+        for deck in (own, other):
+            features += self.deck_features(deck.active, len(deck.hand), len(deck.deck), len(deck.discard), deck.next_energies, deck.energy_discard)
+        return features
+
+    def encode(self, state:BattleState, team1:bool|None=None, out:np.ndarray|None=None) -> np.ndarray:
+        """Encodes one position
+
+        :param state: The position
+        :type state: BattleState
+        :param team1: Which team the position is seen from, defaults to the team making the next move
+        :type team1: bool|None
+        :param out: The array of shape (size,) to write into, defaults to a new one
+        :type out: np.ndarray|None
+        :return: The features of the position
+        :rtype: np.ndarray
+        """
+        if out is None:
+            out = self.new_array()
+        self.encode_batch([state], team1, out.reshape(1, self.size))
+        return out
+
+    def encode_batch(self, states:Sequence[BattleState], team1:bool|Sequence[bool]|None=None, out:np.ndarray|None=None) -> np.ndarray:
+        """Encodes many positions with one numpy write for the dense features and one for the hands
+
+        :param states: The positions
+        :type states: Sequence[BattleState]
+        :param team1: Which team each position is seen from, one value for every position or a value per position,
+            defaults to the team making the next move in each position
+        :type team1: bool|Sequence[bool]|None
+        :param out: The array of shape (len(states), size) to write into, defaults to a new one
+        :type out: np.ndarray|None
+        :return: The features of each position, one row per position
+        :rtype: np.ndarray
+        """
+        if out is None:
+            out = self.new_array(len(states))
+        if team1 is None:
+            teams = [team1_moving(state) for state in states]
+        elif isinstance(team1, bool):
+            teams = [team1] * len(states)
+        else:
+            teams = list(team1)
+        if len(states) == 0:
+            return out
+        out[:, :self.hand_start] = [self.dense_features(state, team) for state, team in zip(states, teams)]
+        self.write_hands([(state.deck1 if team else state.deck2).hand for state, team in zip(states, teams)], out)
+        return out
+
+    def encode_views(self, own:OwnDeckView, opponent:OpponentDeckView, points:tuple[int,int], turn_number:int, own_turn:bool, turn:Turn|None=None, out:np.ndarray|None=None) -> np.ndarray:
+        """Encodes a position from the views a controller is given, matching encode for the same position
+
+        :param own: The view of the team's own deck
+        :type own: OwnDeckView
+        :param opponent: The view of the other team's deck
+        :type opponent: OpponentDeckView
+        :param points: The points of the team and then of the other team
+        :type points: tuple[int,int]
+        :param turn_number: The number of the turn
+        :type turn_number: int
+        :param own_turn: Whether the team makes the next move
+        :type own_turn: bool
+        :param turn: What has been done in the current turn, defaults to nothing
+        :type turn: Turn|None
+        :param out: The array of shape (size,) to write into, defaults to a new one
+        :type out: np.ndarray|None
+        :return: The features of the position
+        :rtype: np.ndarray
+        """
+        if out is None:
+            out = self.new_array()
+        if turn is None:
+            turn = Turn()
+        features = [*points, turn_number, own_turn, turn.used_supporters, turn.retreats, turn.energy_used, turn.attacks_used]
+        features += self.deck_features(own.active, len(own.hand), own.deck_size, len(own.discard_pile), own.energy_queue, own.energy_discard)
+        features += self.deck_features(opponent.active, opponent.hand_size, opponent.deck_size, len(opponent.discard_pile), opponent.energy_queue, opponent.energy_discard)
+        out[:self.hand_start] = features
+        self.write_hands([own.hand], out.reshape(1, self.size))
+        return out
+
+    def write_hands(self, hands:Sequence[Sequence[PlayingCard]], out:np.ndarray) -> None:
+        out[:, self.hand_start:] = 0
+        rows = [row for row, hand in enumerate(hands) for _ in hand]
+        columns = [self.hand_start + card_id for hand in hands for card_id in self.registry.encode(hand)]
+        np.add.at(out, (rows, columns), 1)
@@ -0,0 +1,142 @@
+from pokemon.pokemon_card import PlayingCard, CardType
+from pokemon.pokemon_registry import CardRegistry
+from pokemon.pokemon_types import EnergyType, PokemonType
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Hashable, Iterator
+
+class CardIndex:
+    """Secondary indexes over the cards of a CardRegistry. Each index maps a value to the set of ids of the cards with
+    that value, and the numeric ones are kept sorted so ranges can be found with a binary search. Build it once and
+    ask questions with query
+    """
+
+    def __init__(self, registry:CardRegistry):
+        self.registry = registry
+        self.all_ids = frozenset(range(len(registry)))
+        indexes = defaultdict[str,defaultdict[Hashable,set[int]]](lambda: defaultdict(set))
+        hit_points = list[tuple[int,int]]()
+        cheapest_attacks = list[tuple[int,int]]()
+        for card_id, card in enumerate(registry.cards):
+            indexes['card_type'][card.get_card_type()].add(card_id)
+            if not card.is_pokemon():
+                continue
+            indexes['pokemon_type'][card.pokemon_type].add(card_id)
+            indexes['energy_type'][card.get_energy_type()].add(card_id)
+            indexes['stage'][card.pokemon.get_stage()].add(card_id)
+            indexes['name'][card.pokemon_name()].add(card_id)
+            if card.evolves_from() is not None:
+                indexes['evolves_from'][card.evolves_from().name].add(card_id)
+            for attack in card.attacks:
+                for energy, count in attack.energy_cost.energies.items():
+                    if count > 0:
+                        indexes['attack_energy'][energy].add(card_id)
+            hit_points.append((card.hit_points, card_id))
+            if len(card.attacks) > 0:
+                cheapest_attacks.append((min(attack.energy_cost.size() for attack in card.attacks), card_id))
+        self.indexes = {name:{value:frozenset(ids) for value, ids in index.items()} for name, index in indexes.items()}
+        hit_points.sort()
+        cheapest_attacks.sort()
+        self.hit_points = hit_points
+        self.cheapest_attacks = cheapest_attacks
+
+    def lookup(self, index:str, value:Hashable) -> frozenset[int]:
+        """Finds the ids of the cards with a value in one of the indexes
+
+        :param index: The name of the index: card_type, pokemon_type, energy_type, stage, name, evolves_from or attack_energy
+        :type index: str
+        :param value: The value to look up
+        :type value: Hashable
+        :return: The ids of the cards with the value
+        :rtype: frozenset[int]
+        """
+        return self.indexes.get(index, {}).get(value, frozenset())
+
+    def in_range(self, index:str, minimum:int|None=None, maximum:int|None=None) -> frozenset[int]:
+        """Finds the ids of the cards with a number between two bounds in one of the sorted indexes
+
+        :param index: The name of the sorted index: hit_points or cheapest_attack
+        :type index: str
+        :param minimum: The smallest number allowed, defaults to no lower bound
+        :type minimum: int|None
+        :param maximum: The largest number allowed, defaults to no upper bound
+        :type maximum: int|None
+        :return: The ids of the cards in the range
+        :rtype: frozenset[int]
+        """
+        entries = self.hit_points if index == 'hit_points' else self.cheapest_attacks
+        start = bisect_left(entries, (minimum, -1)) if minimum is not None else 0
+        end = bisect_right(entries, (maximum, len(self.registry))) if maximum is not None else len(entries)
+        return frozenset(card_id for _, card_id in entries[start:end])
+
+    def query(self) -> 'CardQuery':
+        return CardQuery(self)
+
+class CardQuery:
+    """A question about the cards of a CardIndex. Every condition returns a new query holding the ids that are left,
+    found by intersecting the indexes. Queries can be combined with & and |
+    """
+
+    def __init__(self, index:CardIndex, ids:frozenset[int]|None=None):
+        self.index = index
+        self.ids = ids if ids is not None else index.all_ids
+
+    def where(self, ids:frozenset[int]) -> 'CardQuery':
+        return CardQuery(self.index, self.ids & ids)
+
+    def card_type(self, card_type:CardType) -> 'CardQuery':
+        return self.where(self.index.lookup('card_type', card_type))
+
+    def pokemon(self) -> 'CardQuery':
+        return self.card_type(CardType.POKEMON)
+
+    def pokemon_type(self, pokemon_type:PokemonType) -> 'CardQuery':
+        return self.where(self.index.lookup('pokemon_type', pokemon_type))
+
+    def energy_type(self, energy_type:EnergyType) -> 'CardQuery':
+        return self.where(self.index.lookup('energy_type', energy_type))
+
+    def stage(self, stage:int) -> 'CardQuery':
+        return self.where(self.index.lookup('stage', stage))
+
+    def basic(self) -> 'CardQuery':
+        return self.stage(0)
+
+    def named(self, name:str) -> 'CardQuery':
+        return self.where(self.index.lookup('name', name))
+
+    def evolves_from(self, name:str) -> 'CardQuery':
+        return self.where(self.index.lookup('evolves_from', name))
+
+    def attack_needs(self, energy:EnergyType) -> 'CardQuery':
+        return self.where(self.index.lookup('attack_energy', energy))
+
+    def hit_points(self, minimum:int|None=None, maximum:int|None=None) -> 'CardQuery':
+        return self.where(self.index.in_range('hit_points', minimum, maximum))
+
+    def cheapest_attack(self, minimum:int|None=None, maximum:int|None=None) -> 'CardQuery':
+        return self.where(self.index.in_range('cheapest_attack', minimum, maximum))
+
+    def __and__(self, other:'CardQuery') -> 'CardQuery':
+        return self.where(other.ids)
+
+    def __or__(self, other:'CardQuery') -> 'CardQuery':
+        return CardQuery(self.index, self.ids | other.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[PlayingCard]:
+        return iter(self.cards())
+
+    def card_ids(self) -> list[int]:
+        return sorted(self.ids)
+
+    def cards(self) -> list[PlayingCard]:
+        """Gets the cards that meet every condition
+
+        :return: The cards, in the order of their ids
+        :rtype: list[PlayingCard]
+        """
+        return self.index.registry.decode(self.card_ids())
@@ -0,0 +1,315 @@
+from pokemon.pokemon_battle import Battle, BattleState, BattleEventType, DeckSetup, EventBattleLog, UserInput, draw_pile_key
+from pokemon.pokemon_card import PlayingCard
+from pokemon.pokemon_control import AutomatedBattleController
+from pokemon.pokemon_simulation import NoLegalMovesError, Policy, random_policy, team1_moving
+import pokemon.utils as utils
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import math
+import random
+import time
+
+MoveKey = tuple[str,tuple]
+
+def move_key(move:tuple[str,tuple]) -> MoveKey:
+    """Identifies a move the same way in every copy of a battle. A UserInput only exists in one battle, so it is
+    left out
+
+    :param move: The name and inputs of the move
+    :type move: tuple[str,tuple]
+    :return: The key of the move
+    :rtype: MoveKey
+    """
+    name, inputs = move
+    return name, tuple(None if isinstance(value, UserInput) else value for value in inputs)
+
+class SearchNode:
+    """A node of an open loop search tree. Nodes are reached by a sequence of moves rather than by a state, since each
+    iteration samples its own future of the battle
+
+    value is the total reward of the playouts through the node for the team that made the move into it
+    """
+    __slots__ = ('parent', 'team1', 'children', 'visits', 'value')
+
+    def __init__(self, parent:'SearchNode|None', team1:bool):
+        self.parent = parent
+        self.team1 = team1
+        self.children = dict[MoveKey,SearchNode]()
+        self.visits = 0
+        self.value = 0.0
+
+    def mean(self) -> float:
+        return self.value / self.visits if self.visits > 0 else 0
+
+@dataclass
+class SearchStats:
+    playouts:int = 0
+    seconds:float = 0
+
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.seconds if self.seconds > 0 else 0
+
+def playout_reward(state:BattleState, team1:bool) -> float:
+    """Scores the end of a playout for a team. A win is 1 and a loss is 0. Unfinished battles score between the two
+    by the difference in points
+
+    :param state: The battle at the end of the playout
+    :type state: BattleState
+    :param team1: The team to score for
+    :type team1: bool
+    :return: The reward of the team
+    :rtype: float
+    """
+    winner = state.winner()
+    if winner is not None:
+        return 1.0 if (winner == 1) == team1 else 0.0
+    points = state.team1_points - state.team2_points
+    return 0.5 + (points if team1 else -points) / (2 * state.rules.POINTS_TO)
+
+def replace_pile(deck:DeckSetup, cards:list[PlayingCard]) -> None:
+    # the discard pile stays shared with the real state until the world changes it
+    deck.deck = utils.IndexedPile[PlayingCard](cards, draw_pile_key, True)
+
+def redeal_hidden(state:BattleState, team1:bool, rng:random.Random) -> None:
+    """Deals again what one team can't see. The other team's hand and draw pile are shuffled together and dealt back
+    with the same hand size, keeping a basic in the hand before the other team has set up, and the team's own draw
+    pile is shuffled
+
+    :param state: The state to change, usually a fork of the real one
+    :type state: BattleState
+    :param team1: Whether team 1 is the one that can't see the cards, otherwise team 2
+    :type team1: bool
+    :param rng: Shuffles the cards
+    :type rng: random.Random
+    """
+    own, other = (state.deck1, state.deck2) if team1 else (state.deck2, state.deck1)
+    hidden = other.hand + list(other.deck)
+    rng.shuffle(hidden)
+    hand_size = len(other.hand)
+    if len(other.active) == 0 and hand_size > 0:
+        # the team hasn't set up, and an opening hand always holds a basic, see DeckSetup
+        basics = [i for i, card in enumerate(hidden) if card.is_basic()]
+        if len(basics) > 0:
+            starter = rng.choice(basics)
+            hidden[0], hidden[starter] = hidden[starter], hidden[0]
+    pile = list(own.deck)
+    rng.shuffle(pile)
+    other.hand = hidden[:hand_size]
+    replace_pile(other, hidden[hand_size:])
+    replace_pile(own, pile)
+    other.rehash_zones()
+
+class MCTSSearch:
+    """Runs Monte Carlo tree search from one battle. Every iteration forks the battle, deals again the cards the team
+    moving at the root can't see, reseeds the fork so the draws and other random effects vary, follows the tree with
+    UCB1 until it adds a node and then plays out the rest of the battle with the playout policy
+
+    With redeal False the hidden cards are left where they are, and the search plays with perfect information: it
+    knows the other team's hand and the order of both draw piles. The hidden cards are dealt from what the real state
+    holds, so only the order and split between hand and draw pile are hidden. DeterminizedMCTSSearch deals them from
+    the deck lists instead
+    """
+
+    def __init__(self, exploration:float=math.sqrt(2), playout_policy:Policy=random_policy, max_playout_moves:int=400, redeal:bool=True):
+        self.exploration = exploration
+        self.playout_policy = playout_policy
+        self.max_playout_moves = max_playout_moves
+        self.redeal = redeal
+
+    def sample(self, battle:Battle, rng:random.Random) -> Battle:
+        """Makes the copy of the battle one iteration plays in
+
+        :param battle: The battle being searched
+        :type battle: Battle
+        :param rng: The random generator of the search
+        :type rng: random.Random
+        :return: The copy to play in, with the hidden cards dealt again unless redeal is False
+        :rtype: Battle
+        """
+        fork = battle.fork()
+        fork.state.rng.seed(rng.getrandbits(64))
+        if self.redeal:
+            redeal_hidden(fork.state, team1_moving(battle.state), rng)
+        return fork
+
+    def select(self, node:SearchNode, keys:list[MoveKey]) -> MoveKey:
+        log_visits = math.log(max(node.visits, 1))
+        best, best_score = keys[0], -math.inf
+        for key in keys:
+            child = node.children[key]
+            score = child.value / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = key, score
+        return best
+
+    def iterate(self, root:SearchNode, battle:Battle, rng:random.Random) -> None:
+        fork = self.sample(battle, rng)
+        state = fork.state
+        node = root
+        path = [root]
+        expanded = False
+        while not expanded and not state.is_over():
+            moves = {move_key(move):move for move in fork.legal_moves()}
+            if len(moves) == 0:
+                break
+            untried = [key for key in moves if key not in node.children]
+            team1 = team1_moving(state)
+            if len(untried) > 0:
+                key = rng.choice(untried)
+                node.children[key] = SearchNode(node, team1)
+                expanded = True
+            else:
+                key = self.select(node, list(moves))
+            fork.action(*moves[key])
+            node = node.children[key]
+            path.append(node)
+        for _ in range(self.max_playout_moves):
+            if state.is_over():
+                break
+            try:
+                fork.action(*self.playout_policy(fork, rng))
+            except NoLegalMovesError:
+                break
+        rewards = {True: playout_reward(state, True), False: playout_reward(state, False)}
+        for node in path:
+            node.visits += 1
+            node.value += rewards[node.team1]
+
+    def search(self, root:SearchNode, battle:Battle, rng:random.Random, iterations:int|None, time_limit:float|None) -> SearchStats:
+        """Grows a tree until the budget runs out
+
+        :param root: The node of the battle's current state
+        :type root: SearchNode
+        :param battle: The battle to search
+        :type battle: Battle
+        :param rng: The random generator of the search
+        :type rng: random.Random
+        :param iterations: The most playouts to run, no limit if None
+        :type iterations: int|None
+        :param time_limit: The most seconds to search for, no limit if None
+        :type time_limit: float|None
+        :return: How many playouts were run and how long they took
+        :rtype: SearchStats
+        """
+        if iterations is None and time_limit is None:
+            raise ValueError('The search needs an iteration or time budget')
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit is not None else math.inf
+        stats = SearchStats()
+        while (iterations is None or stats.playouts < iterations) and time.perf_counter() < deadline:
+            self.iterate(root, battle, rng)
+            stats.playouts += 1
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+def search_root(search:MCTSSearch, battle:Battle, seed:int, iterations:int|None, time_limit:float|None) -> tuple[dict[MoveKey,tuple[int,float]],SearchStats]:
+    """Searches a battle from a new tree, for one process of a root parallel search
+
+    :return: The visits and value of each move from the root, with the stats of the search
+    :rtype: tuple[dict[MoveKey,tuple[int,float]],SearchStats]
+    """
+    root = SearchNode(None, not team1_moving(battle.state))
+    stats = search.search(root, battle, random.Random(seed), iterations, time_limit)
+    return {key:(child.visits, child.value) for key, child in root.children.items()}, stats
+
+class MCTSBattleController(AutomatedBattleController):
+    """Picks moves with Monte Carlo tree search over the legal moves of the battle
+
+    The search runs until either budget is used up. The tree under the chosen move is kept for the next move as long
+    as the moves made in between can be followed, which needs the battle to keep an EventBattleLog, or when the next
+    move comes straight after the chosen one. With more than one worker each process searches its own tree for the
+    whole budget and the visits of the root moves are added up, and no tree is kept. The processes are kept between
+    moves until close is called
+    """
+
+    def __init__(self, iterations:int|None=1000, time_limit:float|None=None, *, workers:int=1, reuse_tree:bool=True, search:MCTSSearch|None=None, seed:int|None=None):
+        super().__init__(seed)
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.workers = workers
+        self.reuse_tree = reuse_tree
+        self.search = search if search is not None else MCTSSearch()
+        self.stats = SearchStats()
+        self.total_stats = SearchStats()
+        self.root:SearchNode|None = None
+        self.root_battle:Battle|None = None
+        self.root_turn:tuple[int,bool]|None = None
+        self.log_position = 0
+        self.executor:ProcessPoolExecutor|None = None
+
+    def playouts_per_second(self) -> float:
+        """The playout rate of every search made so far
+
+        :return: The playouts per second
+        :rtype: float
+        """
+        return self.total_stats.playouts_per_second()
+
+    def kept_root(self, battle:Battle) -> SearchNode|None:
+        # finds the node of the current state in the tree kept from the last move
+        if not self.reuse_tree or self.root is None or self.root_battle is not battle:
+            return None
+        log = battle.state.log
+        node = self.root
+        if isinstance(log, EventBattleLog):
+            for event in log.events[self.log_position:]:
+                if event.event_type == BattleEventType.ACTION:
+                    node = node.children.get(move_key((event.name, event.inputs)))
+                    if node is None:
+                        return None
+            return node
+        # without a log, a move in the same turn by the same team is taken to come straight after the chosen one
+        if (battle.state.turn_number, team1_moving(battle.state)) == self.root_turn:
+            return node
+        return None
+
+    def choose_move(self, battle:Battle, rng:random.Random) -> tuple[str,tuple]:
+        moves = {move_key(move):move for move in battle.legal_moves()}
+        if len(moves) == 1:
+            self.root = None
+            self.stats = SearchStats()
+            return next(iter(moves.values()))
+        if self.workers > 1:
+            visits = self.parallel_search(battle, rng)
+        else:
+            root = self.kept_root(battle)
+            if root is None:
+                root = SearchNode(None, not team1_moving(battle.state))
+            root.parent = None
+            self.stats = self.search.search(root, battle, rng, self.iterations, self.time_limit)
+            visits = {key:child.visits for key, child in root.children.items()}
+        self.total_stats.playouts += self.stats.playouts
+        self.total_stats.seconds += self.stats.seconds
+        key = max(moves, key=lambda key: visits.get(key, 0))
+        if self.workers <= 1 and self.reuse_tree:
+            self.root = root.children.get(key)
+            self.root_battle = battle
+            self.root_turn = (battle.state.turn_number, team1_moving(battle.state))
+            # the chosen move is logged after this returns, so it is skipped when following the log
+            log = battle.state.log
+            self.log_position = len(log.events) + 1 if isinstance(log, EventBattleLog) else 0
+        return moves[key]
+
+    def parallel_search(self, battle:Battle, rng:random.Random) -> dict[MoveKey,int]:
+        visits = dict[MoveKey,int]()
+        self.stats = SearchStats()
+        self.root = None
+        start = time.perf_counter()
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [self.executor.submit(search_root, self.search, battle, rng.getrandbits(64), self.iterations, self.time_limit) for _ in range(self.workers)]
+        for future in futures:
+            children, stats = future.result()
+            for key, (child_visits, _) in children.items():
+                visits[key] = visits.get(key, 0) + child_visits
+            self.stats.playouts += stats.playouts
+        self.stats.seconds = time.perf_counter() - start
+        return visits
+
+    def close(self) -> None:
+        """Stops the processes of a root parallel search. They are started again if another move is asked for
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
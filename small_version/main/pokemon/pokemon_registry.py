@@ -0,0 +1,116 @@
+from pokemon.pokemon_card import PlayingCard
+
+from typing import Iterable
+
+class CardRegistry:
+    """Gives every distinct card a small integer id, starting at 0. Equal cards share an id and the first one
+    registered is kept as the canonical card. Looking up a canonical card is done by identity, so it never hashes
+    the card
+
+    The registry only translates between cards and ids. Battles still store card objects in their zones, see
+    DeckSetup.encode for getting a snapshot of them as ids
+    """
+
+    def __init__(self, cards:Iterable[PlayingCard]=()):
+        self.cards = list[PlayingCard]()
+        self.ids = dict[PlayingCard,int]()
+        self.canonical_ids = dict[int,int]()
+        for card in cards:
+            self.intern(card)
+
+    def intern(self, card:PlayingCard) -> int:
+        """Registers a card if an equal card isn't registered yet
+
+        :param card: The card to register
+        :type card: PlayingCard
+        :return: The id of the card
+        :rtype: int
+        """
+        card_id = self.canonical_ids.get(id(card))
+        if card_id is not None:
+            return card_id
+        card_id = self.ids.get(card)
+        if card_id is None:
+            card_id = len(self.cards)
+            self.cards.append(card)
+            self.ids[card] = card_id
+            self.canonical_ids[id(card)] = card_id
+        return card_id
+
+    def id_of(self, card:PlayingCard) -> int:
+        """Finds the id of a registered card
+
+        :param card: The card to look up
+        :type card: PlayingCard
+        :raises KeyError: If no equal card is registered
+        :return: The id of the card
+        :rtype: int
+        """
+        card_id = self.canonical_ids.get(id(card))
+        if card_id is not None:
+            return card_id
+        return self.ids[card]
+
+    def get_id(self, card:PlayingCard, default:int|None=None) -> int|None:
+        """Finds the id of a card that may not be registered
+
+        :param card: The card to look up
+        :type card: PlayingCard
+        :param default: What to give if no equal card is registered, defaults to None
+        :type default: int|None
+        :return: The id of the card, or default
+        :rtype: int|None
+        """
+        card_id = self.canonical_ids.get(id(card))
+        if card_id is not None:
+            return card_id
+        return self.ids.get(card, default)
+
+    def card(self, card_id:int) -> PlayingCard:
+        return self.cards[card_id]
+
+    def canonical(self, card:PlayingCard) -> PlayingCard:
+        return self.cards[self.id_of(card)]
+
+    def __getitem__(self, card_id:int) -> PlayingCard:
+        return self.cards[card_id]
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __contains__(self, card:PlayingCard) -> bool:
+        return id(card) in self.canonical_ids or card in self.ids
+
+    def encode(self, cards:Iterable[PlayingCard]) -> tuple[int,...]:
+        """Turns cards into their ids
+
+        :param cards: The registered cards to encode
+        :type cards: Iterable[PlayingCard]
+        :return: The id of each card, in the same order
+        :rtype: tuple[int,...]
+        """
+        return tuple(self.id_of(card) for card in cards)
+
+    def decode(self, card_ids:Iterable[int]) -> list[PlayingCard]:
+        """Turns ids back into their canonical cards
+
+        :param card_ids: The ids to decode
+        :type card_ids: Iterable[int]
+        :return: The card of each id, in the same order
+        :rtype: list[PlayingCard]
+        """
+        cards = self.cards
+        return [cards[card_id] for card_id in card_ids]
+
+    def counts(self, cards:Iterable[PlayingCard]) -> list[int]:
+        """Counts the copies of each card, like utils.tuple_to_counts but indexed by id
+
+        :param cards: The registered cards to count
+        :type cards: Iterable[PlayingCard]
+        :return: The number of copies of each card, with one entry for every id
+        :rtype: list[int]
+        """
+        counts = [0] * len(self.cards)
+        for card in cards:
+            counts[self.id_of(card)] += 1
+        return counts
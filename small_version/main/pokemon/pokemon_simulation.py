@@ -0,0 +1,173 @@
+from pokemon.pokemon_battle import Battle, BattleState, Deck, Rules, battle_factory
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+import os
+import random
+
+Policy = Callable[[Battle, random.Random], tuple[str,tuple]]
+
+class NoLegalMovesError(ValueError):
+    """Raised by a policy asked to move in a battle that isn't over but has no legal moves
+    """
+
+def random_policy(battle:Battle, rng:random.Random) -> tuple[str,tuple]:
+    """Picks one of the legal moves at random
+
+    :param battle: The battle to move in
+    :type battle: Battle
+    :param rng: The random generator of the game
+    :type rng: random.Random
+    :raises NoLegalMovesError: If there is no legal move
+    :return: The name and inputs of the move
+    :rtype: tuple[str,tuple]
+    """
+    moves = battle.legal_moves()
+    if len(moves) == 0:
+        raise NoLegalMovesError('The battle has no legal moves')
+    return rng.choice(moves)
+
+def team1_moving(state:BattleState) -> bool:
+    """Finds which team makes the next move, counting the setup of each team as its move. A selection is made by the
+    team its UserInput asks, which is the other team when the UserInput isn't for the current user
+
+    :param state: The battle to consider
+    :type state: BattleState
+    :return: True if team 1 moves next, False if team 2 does
+    :rtype: bool
+    """
+    if not state.team1_ready:
+        return True
+    if not state.team2_ready:
+        return False
+    if state.next_action() == 'select':
+        return state.team1_turn() == state.get_partial_inputs()[0].current_user
+    return state.team1_move()
+
+@dataclass
+class SimulationResult:
+    games:int = 0
+    wins:int = 0
+    losses:int = 0
+    draws:int = 0
+    total_turns:int = 0
+    points:Counter[tuple[int,int]] = field(default_factory=Counter)
+
+    def add_game(self, winner:int|None, turns:int, points:tuple[int,int]) -> None:
+        self.games += 1
+        if winner == 1:
+            self.wins += 1
+        elif winner == 2:
+            self.losses += 1
+        else:
+            self.draws += 1
+        self.total_turns += turns
+        self.points[points] += 1
+
+    def merge(self, other:'SimulationResult') -> None:
+        self.games += other.games
+        self.wins += other.wins
+        self.losses += other.losses
+        self.draws += other.draws
+        self.total_turns += other.total_turns
+        self.points.update(other.points)
+
+    def average_turns(self) -> float:
+        return self.total_turns / self.games if self.games > 0 else 0
+
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games > 0 else 0
+
+def play_game(deck1:Deck, deck2:Deck, policy1:Policy, policy2:Policy, rules:Rules|None, seed:int, max_turns:int, max_moves_per_turn:int) -> tuple[int|None,int,tuple[int,int]]:
+    """Plays a battle with no output until it ends or stalls
+
+    :param deck1: The deck used by team 1
+    :type deck1: Deck
+    :param deck2: The deck used by team 2
+    :type deck2: Deck
+    :param policy1: Picks the moves of team 1
+    :type policy1: Policy
+    :param policy2: Picks the moves of team 2
+    :type policy2: Policy
+    :param rules: The rules of the battle, defaults to the standard rules
+    :type rules: Rules|None
+    :param seed: Seeds both the battle and the policies
+    :type seed: int
+    :param max_turns: The game is a draw once this many turns have started
+    :type max_turns: int
+    :param max_moves_per_turn: The game is a draw once a turn takes this many moves, valid or not, or when a policy
+        finds no legal move
+    :type max_moves_per_turn: int
+    :return: The winning team or None, the number of turns and the points of each team
+    :rtype: tuple[int|None,int,tuple[int,int]]
+    """
+    rng = random.Random(seed)
+    battle = battle_factory(deck1, deck2, rules, headless=True, seed=rng.getrandbits(64))
+    state = battle.state
+    moves = 0
+    turn = state.turn_number
+    while not state.is_over() and state.turn_number < max_turns:
+        policy = policy1 if team1_moving(state) else policy2
+        try:
+            battle.action(*policy(battle, rng))
+        except NoLegalMovesError:
+            break
+        if state.turn_number != turn:
+            turn = state.turn_number
+            moves = 0
+        moves += 1
+        if moves >= max_moves_per_turn:
+            break
+    return state.winner(), state.turn_number, (state.team1_points, state.team2_points)
+
+def simulate_games(deck1:Deck, deck2:Deck, policy1:Policy, policy2:Policy, rules:Rules|None, seeds:range, max_turns:int, max_moves_per_turn:int) -> SimulationResult:
+    result = SimulationResult()
+    for seed in seeds:
+        result.add_game(*play_game(deck1, deck2, policy1, policy2, rules, seed, max_turns, max_moves_per_turn))
+    return result
+
+def simulate(deck1:Deck, deck2:Deck, policy:Policy=random_policy, games:int=1000, seed:int|None=None, workers:int|None=None, *, opponent_policy:Policy|None=None, rules:Rules|None=None, max_turns:int=100, max_moves_per_turn:int=200) -> SimulationResult:
+    """Plays many battles between two decks across a process pool and totals the results. Each game gets its own seed,
+    so the same seed gives the same results no matter how many workers are used
+
+    :param deck1: The deck the results are given for
+    :type deck1: Deck
+    :param deck2: The opposing deck
+    :type deck2: Deck
+    :param policy: Picks the moves of deck 1, and deck 2 if there is no opponent policy. Needs to be picklable, such as a module level function, when using more than one worker
+    :type policy: Policy
+    :param games: How many games to play
+    :type games: int
+    :param seed: Seeds every game, defaults to a random seed
+    :type seed: int|None
+    :param workers: How many processes to use, defaults to the number of cpus. 1 plays every game in this process
+    :type workers: int|None
+    :param opponent_policy: Picks the moves of deck 2
+    :type opponent_policy: Policy|None
+    :param rules: The rules of every battle, defaults to the standard rules
+    :type rules: Rules|None
+    :param max_turns: Games still going after this many turns are draws
+    :type max_turns: int
+    :param max_moves_per_turn: Games with a turn of this many moves are draws
+    :type max_moves_per_turn: int
+    :return: The wins, losses and draws of deck 1, with the turns and points of every game
+    :rtype: SimulationResult
+    """
+    if opponent_policy is None:
+        opponent_policy = policy
+    if workers is None:
+        workers = os.cpu_count() or 1
+    first_seed = random.Random(seed).getrandbits(64)
+    seeds = range(first_seed, first_seed + games)
+    if workers <= 1 or games <= 1:
+        return simulate_games(deck1, deck2, policy, opponent_policy, rules, seeds, max_turns, max_moves_per_turn)
+    chunk_size = max(1, -(-games // (workers * 4)))
+    result = SimulationResult()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(simulate_games, deck1, deck2, policy, opponent_policy, rules, seeds[i:i+chunk_size], max_turns, max_moves_per_turn)
+                   for i in range(0, games, chunk_size)]
+        for future in futures:
+            result.merge(future.result())
+    return result
@@ -1,6 +1,9 @@
 from enum import Enum
 from frozendict import frozendict
-from dataclasses import dataclass, field
+from dataclasses import FrozenInstanceError
+from operator import add, sub, ge
+from typing import Mapping
+import numpy as np
 
 class EnergyType(Enum):
     """Represents the different types of energy available
@@ -39,48 +42,80 @@ class PokemonType(Enum):
     ROCK     = 16
     GHOST    = 17
 
+# indexed by PokemonType.value
+ENERGY_TYPE_OF_POKEMON_TYPE = (
+    EnergyType.COLORLESS, # NORMAL
+    EnergyType.FIRE,      # FIRE
+    EnergyType.WATER,     # WATER
+    EnergyType.LIGHTNING, # ELECTRIC
+    EnergyType.GRASS,     # GRASS
+    EnergyType.FIGHTING,  # FIGHTING
+    EnergyType.PSYCHIC,   # PSYCHIC
+    EnergyType.DARKNESS,  # DARK
+    EnergyType.METAL,     # STEEL
+    EnergyType.DRAGON,    # DRAGON
+    EnergyType.FAIRY,     # FAIRY
+    EnergyType.WATER,     # ICE
+    EnergyType.FIGHTING,  # GROUND
+    EnergyType.DRAGON,    # FLYING
+    EnergyType.DARKNESS,  # POISON
+    EnergyType.GRASS,     # BUG
+    EnergyType.FIGHTING,  # ROCK
+    EnergyType.PSYCHIC,   # GHOST
+)
+
+WEAKNESS_OF_POKEMON_TYPE = (
+    None,                 # NORMAL
+    EnergyType.WATER,     # FIRE
+    EnergyType.LIGHTNING, # WATER
+    EnergyType.FIGHTING,  # ELECTRIC
+    EnergyType.FIRE,      # GRASS
+    EnergyType.PSYCHIC,   # FIGHTING
+    EnergyType.DARKNESS,  # PSYCHIC
+    EnergyType.FIGHTING,  # DARK
+    EnergyType.FIRE,      # STEEL
+    None,                 # DRAGON
+    EnergyType.METAL,     # FAIRY
+    EnergyType.LIGHTNING, # ICE
+    EnergyType.GRASS,     # GROUND
+    EnergyType.LIGHTNING, # FLYING
+    EnergyType.FIGHTING,  # POISON
+    EnergyType.FIRE,      # BUG
+    EnergyType.GRASS,     # ROCK
+    EnergyType.DARKNESS,  # GHOST
+)
+
+RESISTANCE_OF_POKEMON_TYPE = (None,) * len(PokemonType)
+
+WEAKNESS_MODIFIER   =  20
+RESISTANCE_MODIFIER = -20
+
 def energy_type(pokemon_type:PokemonType) -> EnergyType:
-    if pokemon_type.value <= 10:
-        return EnergyType(pokemon_type.value)
-    match pokemon_type:
-        case PokemonType.ICE:
-            return EnergyType.WATER
-        case PokemonType.GROUND | PokemonType.ROCK:
-            return EnergyType.FIGHTING
-        case PokemonType.FLYING:
-            return EnergyType.DRAGON
-        case PokemonType.PSYCHIC | PokemonType.GHOST:
-            return EnergyType.PSYCHIC
-        case PokemonType.BUG:
-            return EnergyType.GRASS
-        case PokemonType.POISON:
-            return EnergyType.DARKNESS
+    return ENERGY_TYPE_OF_POKEMON_TYPE[pokemon_type.value]
         
 def weakness(pokemon_type:PokemonType) -> EnergyType|None:
-    match pokemon_type:
-        case PokemonType.NORMAL | PokemonType.DRAGON:
-            return None
-        case PokemonType.FIRE:
-            return EnergyType.WATER
-        case PokemonType.WATER | PokemonType.ICE | PokemonType.FLYING:
-            return EnergyType.LIGHTNING
-        case PokemonType.ELECTRIC | PokemonType.POISON | PokemonType.DARK:
-            return EnergyType.FIGHTING
-        case PokemonType.GRASS | PokemonType.STEEL | PokemonType.BUG:
-            return EnergyType.FIRE
-        case PokemonType.FIGHTING:
-            return EnergyType.PSYCHIC
-        case PokemonType.PSYCHIC | PokemonType.GHOST:
-            return EnergyType.DARKNESS
-        case PokemonType.FAIRY:
-            return EnergyType.METAL
-        case PokemonType.GROUND | PokemonType.ROCK:
-            return EnergyType.GRASS
+    return WEAKNESS_OF_POKEMON_TYPE[pokemon_type.value]
         
 def resistance(pokemon_type:PokemonType) -> EnergyType|None:
-    match pokemon_type:
-        case PokemonType.NORMAL:
-            return None
+    return RESISTANCE_OF_POKEMON_TYPE[pokemon_type.value]
+
+def type_modifier_matrix() -> np.ndarray:
+    """Builds the damage modifiers from weakness and resistance for every pair of defending pokemon type and attacking
+    energy type
+
+    :return: An 18x11 read only array of ints, indexed by PokemonType.value and then EnergyType.value
+    :rtype: np.ndarray
+    """
+    modifiers = np.zeros((len(PokemonType), len(EnergyType)), dtype=np.int64)
+    for pokemon_type in PokemonType:
+        if weakness(pokemon_type) is not None:
+            modifiers[pokemon_type.value, weakness(pokemon_type).value] += WEAKNESS_MODIFIER
+        if resistance(pokemon_type) is not None:
+            modifiers[pokemon_type.value, resistance(pokemon_type).value] += RESISTANCE_MODIFIER
+    modifiers.setflags(write=False)
+    return modifiers
+
+TYPE_MODIFIERS = type_modifier_matrix()
         
 class Condition(Enum):
     """Represents a condition that a pokemon can be effected by
@@ -94,15 +129,87 @@ class Condition(Enum):
     CANT_RETREAT   = 6
     REDUCED_ATTACK = 7
 
-@dataclass(frozen=True)
-class EnergyContainer:
-    energies: frozendict[EnergyType,int] = field(default_factory=frozendict[EnergyType,int])
+ENERGY_TYPE_COUNT = len(EnergyType)
+ENERGY_TYPES = tuple(sorted(EnergyType, key=lambda energy: energy.value))
+
+class BaseEnergyContainer:
+    """Counts energies with one slot per EnergyType value and keeps the total so it never has to be summed
+    """
+    __slots__ = ('counts', 'total')
 
     def size(self) -> int:
-        return sum(self.energies.values())
+        return self.total
     
     def size_of(self, energy:EnergyType) -> int:
-        return self.energies[energy] if energy in self.energies else 0 
+        return self.counts[energy.value]
+
+    @property
+    def energies(self) -> frozendict[EnergyType,int]:
+        return frozendict({ENERGY_TYPES[i]:count for i, count in enumerate(self.counts) if count > 0})
+
+    def at_least_as_big(self, energies:'BaseEnergyContainer', ignore_colorless:bool=True) -> bool:
+        """Determines whether this EnergyContainer holds at least as many energies of each type as another
+
+        :param energies: The EnergyContainer to compare with
+        :type energies: EnergyContainer
+        :param ignore_colorless: Whether colorless energies should be ignored when comparing types of energy, optional
+        :type energies: bool
+        :return: True if this EnergyContainer has at least as many energies of each type as energies, False otherwise
+        :rtype: bool
+        """
+        if self.total < energies.total:
+            return False
+        start = EnergyType.COLORLESS.value + 1 if ignore_colorless else 0
+        return all(map(ge, self.counts[start:], energies.counts[start:]))
+
+    def __eq__(self, other:object) -> bool:
+        if not isinstance(other, BaseEnergyContainer):
+            return NotImplemented
+        return tuple(self.counts) == tuple(other.counts)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.energies)})"
+
+class EnergyContainer(BaseEnergyContainer):
+    """An immutable count of energies. Every change returns a new EnergyContainer
+    """
+    __slots__ = ()
+
+    def __init__(self, energies:Mapping[EnergyType,int]|None=None):
+        counts = [0] * ENERGY_TYPE_COUNT
+        if energies is not None:
+            for energy, count in energies.items():
+                counts[energy.value] += count
+        object.__setattr__(self, 'counts', tuple(counts))
+        object.__setattr__(self, 'total', sum(counts))
+
+    @classmethod
+    def from_counts(cls, counts:tuple[int,...], total:int|None=None) -> 'EnergyContainer':
+        """Creates an EnergyContainer directly from its slots
+
+        :param counts: The number of energies of each type, indexed by EnergyType value
+        :type counts: tuple[int,...]
+        :param total: The sum of counts, computed when not given
+        :type total: int|None
+        :return: The new energy container
+        :rtype: EnergyContainer
+        """
+        container = object.__new__(cls)
+        object.__setattr__(container, 'counts', counts)
+        object.__setattr__(container, 'total', sum(counts) if total is None else total)
+        return container
+
+    def __setattr__(self, name:str, value) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name:str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __hash__(self) -> int:
+        return hash(self.counts)
+
+    def __reduce__(self):
+        return (EnergyContainer.from_counts, (self.counts, self.total))
 
     def add_energy(self, energy:EnergyType) -> 'EnergyContainer':
         """Add an energy to the container
@@ -112,14 +219,11 @@ class EnergyContainer:
         :return: The new energy container with the energy added
         :rtype: EnergyContainer
         """
-        energies = dict(self.energies)
-        if energy in self.energies:
-            energies[energy] += 1
-        else:
-            energies[energy] = 1        
-        return EnergyContainer(frozendict(energies))
+        counts = list(self.counts)
+        counts[energy.value] += 1
+        return EnergyContainer.from_counts(tuple(counts), self.total + 1)
     
-    def add_energies(self, energies:'EnergyContainer') -> 'EnergyContainer':
+    def add_energies(self, energies:BaseEnergyContainer) -> 'EnergyContainer':
         """Adds two energy containers together
 
         :param energies: The energies to add
@@ -127,13 +231,7 @@ class EnergyContainer:
         :return: The new energy container with energies from both containers
         :rtype: EnergyContainer
         """
-        new_energies = dict(self.energies)
-        for energy, count in energies.energies.items():
-            if energy in new_energies:
-                new_energies[energy] += count
-            else:
-                new_energies[energy] = count
-        return EnergyContainer(frozendict(new_energies))
+        return EnergyContainer.from_counts(tuple(map(add, self.counts, energies.counts)), self.total + energies.total)
 
     def remove_energy(self, energy:EnergyType) -> 'EnergyContainer':
         """Remove an energy from the container
@@ -144,13 +242,13 @@ class EnergyContainer:
         :rtype: EnergyContainer
         :raises ValueError: When there is no energy of the type specified within the container
         """
-        energies = dict(self.energies)
-        if self.size_of(energy) > 0:
-            energies[energy] -= 1
-            return EnergyContainer(frozendict(energies))
+        if self.counts[energy.value] > 0:
+            counts = list(self.counts)
+            counts[energy.value] -= 1
+            return EnergyContainer.from_counts(tuple(counts), self.total - 1)
         raise ValueError
     
-    def remove_energies(self, energies:'EnergyContainer') -> 'EnergyContainer':
+    def remove_energies(self, energies:BaseEnergyContainer) -> 'EnergyContainer':
         """Removes one energy container from another
 
         :param energies: The energies to remove from the container
@@ -159,25 +257,57 @@ class EnergyContainer:
         :rtype: EnergyContainer
         :raises ValueError: When an energy can't be removed
         """
-        new_energies = dict(self.energies)
-        for energy, count in energies.energies.items():
-            if self.size_of(energy) >= count:
-                new_energies[energy] -= count
-            else:
-                raise ValueError
-        return EnergyContainer(frozendict(new_energies))
-    
-    def at_least_as_big(self, energies:'EnergyContainer', ignore_colorless:bool=True) -> bool:
-        """Determines whether this EnergyContainer holds at least as many energies of each type as another
+        counts = tuple(map(sub, self.counts, energies.counts))
+        if min(counts) < 0:
+            raise ValueError
+        return EnergyContainer.from_counts(counts, self.total - energies.total)
 
-        :param energies: The EnergyContainer to compare with
+class MutableEnergyContainer(BaseEnergyContainer):
+    """A count of energies that is changed in place, for the engine to build up energies without creating a container per change
+    """
+    __slots__ = ()
+
+    def __init__(self, energies:BaseEnergyContainer|None=None):
+        self.counts = list(energies.counts) if energies is not None else [0] * ENERGY_TYPE_COUNT
+        self.total = energies.total if energies is not None else 0
+
+    __hash__ = None
+
+    def add_energy_in_place(self, energy:EnergyType) -> None:
+        self.counts[energy.value] += 1
+        self.total += 1
+
+    def add_energies_in_place(self, energies:BaseEnergyContainer) -> None:
+        self.counts = list(map(add, self.counts, energies.counts))
+        self.total += energies.total
+
+    def remove_energy_in_place(self, energy:EnergyType) -> None:
+        """Remove an energy from the container
+
+        :param energy: The type of energy to remove
+        :type energy: EnergyType
+        :raises ValueError: When there is no energy of the type specified within the container
+        """
+        if self.counts[energy.value] <= 0:
+            raise ValueError
+        self.counts[energy.value] -= 1
+        self.total -= 1
+
+    def remove_energies_in_place(self, energies:BaseEnergyContainer) -> None:
+        """Removes energies from the container, leaving it unchanged if any can't be removed
+
+        :param energies: The energies to remove from the container
         :type energies: EnergyContainer
-        :param ignore_colorless: Whether colorless energies should be ignored when comparing types of energy, optional
-        :type energies: bool
-        :return: True if this EnergyContainer has at least as many energies of each type as energies, False otherwise
-        :rtype: bool
+        :raises ValueError: When an energy can't be removed
         """
-        for energy, count in energies.energies.items():
-            if count > self.size_of(energy) and (not ignore_colorless or not energy == EnergyType.COLORLESS):
-                return False
-        return self.size() >= energies.size()
\ No newline at end of file
+        counts = list(map(sub, self.counts, energies.counts))
+        if min(counts) < 0:
+            raise ValueError
+        self.counts = counts
+        self.total -= energies.total
+
+    def copy(self) -> 'MutableEnergyContainer':
+        return MutableEnergyContainer(self)
+
+    def freeze(self) -> EnergyContainer:
+        return EnergyContainer.from_counts(tuple(self.counts), self.total)
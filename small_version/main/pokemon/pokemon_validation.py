@@ -0,0 +1,107 @@
+from pokemon.pokemon_battle import Deck, Rules
+from pokemon.pokemon_registry import CardRegistry
+
+from enum import Enum
+from typing import Sequence
+import numpy as np
+
+class DeckViolation(Enum):
+    """The rule a deck breaks, in the order Rules.is_valid_deck checks them
+    """
+    NONE            = 0
+    DECK_SIZE       = 1
+    DUPLICATE_LIMIT = 2
+    BASIC_REQUIRED  = 3
+
+# pads the rows of decks with fewer cards
+NO_CARD = -1
+
+def encode_decks(registry:CardRegistry, decks:Sequence[Deck|Sequence[int]]) -> np.ndarray:
+    """Turns decks into a 2d array of card ids, one row per deck, padded with NO_CARD
+
+    :param registry: Gives the ids of the cards
+    :type registry: CardRegistry
+    :param decks: The decks, or the card ids of each deck
+    :type decks: Sequence[Deck|Sequence[int]]
+    :return: The card ids of each deck
+    :rtype: np.ndarray
+    """
+    rows = [registry.encode(deck.cards) if isinstance(deck, Deck) else deck for deck in decks]
+    card_ids = np.full((len(rows), max((len(row) for row in rows), default=0)), NO_CARD, dtype=np.int64)
+    for i, row in enumerate(rows):
+        card_ids[i, :len(row)] = row
+    return card_ids
+
+class DeckValidator:
+    """Checks many decks against the deck rules at once. Everything the rules need about a card is looked up once per
+    card id, and looked up again when cards are added to the registry
+    """
+
+    def __init__(self, rules:Rules, registry:CardRegistry):
+        self.rules = rules
+        self.registry = registry
+        self.card_count = -1
+        self.update_lookups()
+
+    def update_lookups(self) -> None:
+        """Looks up the name and whether it is basic of every card in the registry, unless the registry hasn't grown
+        since the last time. Registries only ever add cards, so a card id never changes its card
+        """
+        if self.card_count == len(self.registry):
+            return
+        self.card_count = len(self.registry)
+        # cards with the same name count towards the same duplicate limit, like Rules.is_valid_deck
+        name_ids = dict[str,int]()
+        names = [name_ids.setdefault(card.get_name(), len(name_ids)) for card in self.registry.cards]
+        self.no_name = len(name_ids)
+        # the extra last entry is looked up by NO_CARD
+        self.card_names = np.array(names + [self.no_name], dtype=np.int64)
+        self.card_basics = np.array([card.is_basic() for card in self.registry.cards] + [False], dtype=bool)
+
+    def validate(self, card_ids:np.ndarray|Sequence[Deck|Sequence[int]]) -> tuple[np.ndarray,np.ndarray]:
+        """Checks which decks can be used in a battle
+
+        :param card_ids: The card ids of each deck, one row per deck padded with NO_CARD, see encode_decks. Decks and
+            lists of ids are encoded first
+        :type card_ids: np.ndarray|Sequence[Deck|Sequence[int]]
+        :raises ValueError: If a card id isn't in the registry
+        :return: Whether each deck is valid, and the DeckViolation value of the first rule each deck breaks
+        :rtype: tuple[np.ndarray,np.ndarray]
+        """
+        if not isinstance(card_ids, np.ndarray):
+            card_ids = encode_decks(self.registry, card_ids)
+        self.update_lookups()
+        if card_ids.size > 0 and (card_ids.min() < NO_CARD or card_ids.max() >= self.card_count):
+            raise ValueError(f'Card ids must be in the registry, which has {self.card_count} cards, or NO_CARD')
+        present = card_ids != NO_CARD
+        sizes = present.sum(axis=1)
+        wrong_size = sizes != self.rules.DECK_SIZE
+
+        names = np.sort(self.card_names[card_ids], axis=1)
+        # Rules.is_valid_deck only checks the limit from the second copy of a card on
+        limit = max(self.rules.DUPLICATE_LIMIT, 1)
+        if limit < names.shape[1]:
+            # once sorted, a name shows up more than the limit when it is still there limit places later
+            too_many = ((names[:, limit:] == names[:, :-limit]) & (names[:, limit:] != self.no_name)).any(axis=1)
+        else:
+            too_many = np.zeros(len(card_ids), dtype=bool)
+
+        if self.rules.BASIC_REQUIRED:
+            no_basic = ~self.card_basics[card_ids].any(axis=1)
+        else:
+            no_basic = np.zeros(len(card_ids), dtype=bool)
+
+        violations = np.where(wrong_size, DeckViolation.DECK_SIZE.value,
+                     np.where(too_many, DeckViolation.DUPLICATE_LIMIT.value,
+                     np.where(no_basic, DeckViolation.BASIC_REQUIRED.value, DeckViolation.NONE.value))).astype(np.int8)
+        return violations == DeckViolation.NONE.value, violations
+
+    def violations(self, card_ids:np.ndarray|Sequence[Deck|Sequence[int]]) -> list[DeckViolation]:
+        """Finds the first rule each deck breaks
+
+        :param card_ids: The decks to check, see validate
+        :type card_ids: np.ndarray|Sequence[Deck|Sequence[int]]
+        :return: The first rule broken by each deck, DeckViolation.NONE for valid decks
+        :rtype: list[DeckViolation]
+        """
+        return [DeckViolation(value) for value in self.validate(card_ids)[1].tolist()]
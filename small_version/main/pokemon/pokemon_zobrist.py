@@ -0,0 +1,140 @@
+from pokemon.pokemon_card import PlayingCard
+
+from hashlib import blake2b
+from typing import Hashable, Iterable
+
+# Zobrist style hashing of battle positions. Every feature of a position, like a card in a zone or the damage on a
+# pokemon, has a random 64 bit key and the hash of a position is the sum of the keys of its features, so a change only
+# subtracts the keys of what it removes and adds the keys of what it adds. Keys are added modulo 2**64 instead of
+# xored since a zone can hold several copies of a card, and xor would cancel each pair of them
+MASK = (1 << 64) - 1
+
+# checks every hash against a full recomputation when True, see set_debug
+DEBUG = False
+
+# the caches below are emptied when they reach this many entries, since features like queued effect inputs have no
+# fixed number of values. Keys are made the same way again after, so emptying a cache only costs time
+CACHE_LIMIT = 1 << 16
+
+keys = dict[tuple,int]()
+
+def zobrist_key(*parts:Hashable) -> int:
+    """Gets the key of a feature. Keys come from blake2b of the feature, so they are the same in every process
+
+    :param parts: Describes the feature, made of strings, numbers, enums and tuples of them
+    :type parts: Hashable
+    :return: The 64 bit key
+    :rtype: int
+    """
+    key = keys.get(parts)
+    if key is None:
+        key = int.from_bytes(blake2b(repr(parts).encode(), digest_size=8).digest(), 'little')
+        if len(keys) >= CACHE_LIMIT:
+            keys.clear()
+        keys[parts] = key
+    return key
+
+def set_debug(debug:bool) -> None:
+    """Turns on or off checking each hash against a full recomputation, which raises an AssertionError when a change
+    wasn't tracked
+
+    :param debug: Whether to check the hashes
+    :type debug: bool
+    """
+    global DEBUG
+    DEBUG = debug
+
+def card_token(card:PlayingCard) -> str:
+    return card.id_str() if card.is_pokemon() else card.get_name()
+
+# HAND, DECK and DISCARD index the keys from card_keys
+HAND    = 0
+DECK    = 1
+DISCARD = 2
+
+# the card is kept with its keys so its id can't be reused by another card while the entry is there
+card_key_cache = dict[int,tuple[PlayingCard,tuple[int,int,int]]]()
+
+def card_keys(card:PlayingCard) -> tuple[int,int,int]:
+    """Gets the keys of a card in the hand, draw pile and discard pile
+
+    :param card: The card
+    :type card: PlayingCard
+    :return: The keys of the card in each zone, indexed by HAND, DECK and DISCARD
+    :rtype: tuple[int,int,int]
+    """
+    cached = card_key_cache.get(id(card))
+    if cached is None:
+        token = card_token(card)
+        cached = card, (zobrist_key('hand', token), zobrist_key('deck', token), zobrist_key('discard', token))
+        if len(card_key_cache) >= CACHE_LIMIT:
+            card_key_cache.clear()
+        card_key_cache[id(card)] = cached
+    return cached[1]
+
+def zone_hash(cards:Iterable[PlayingCard], zone:int) -> int:
+    return sum(card_keys(card)[zone] for card in cards) & MASK
+
+def stack_key(card:PlayingCard, depth:int) -> int:
+    # depth counts from the basic card at the bottom of an evolved pokemon, so evolving doesn't move the other cards
+    return zobrist_key('stack', depth, card_token(card))
+
+energy_hashes = dict[tuple[str,tuple[int,...]],int]()
+
+def energy_hash(zone:str, counts:tuple[int,...]) -> int:
+    """Hashes a count of energies, see BaseEnergyContainer.counts
+
+    :param zone: Where the energies are
+    :type zone: str
+    :param counts: The number of energies of each type
+    :type counts: tuple[int,...]
+    :return: The hash of the energies
+    :rtype: int
+    """
+    value = energy_hashes.get((zone, counts))
+    if value is None:
+        value = sum(zobrist_key(zone, energy, count) for energy, count in enumerate(counts) if count > 0) & MASK
+        if len(energy_hashes) >= CACHE_LIMIT:
+            energy_hashes.clear()
+        energy_hashes[(zone, counts)] = value
+    return value
+
+def mix(value:int) -> int:
+    """Scrambles a hash so it can be placed somewhere, like a bench slot or a team, without its parts lining up with
+    the same parts placed somewhere else. This is the splitmix64 finalizer
+
+    :param value: The hash to scramble
+    :type value: int
+    :return: The scrambled hash
+    :rtype: int
+    """
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & MASK
+    return value ^ (value >> 31)
+
+# The actions queued with one priority are hashed as sum(key * QUEUE_BASE**place) where place counts from the front,
+# so pushing to the back adds one term and popping the front removes its key and divides by QUEUE_BASE. The base is
+# odd, so it has an inverse modulo 2**64
+QUEUE_BASE = 0x9e3779b97f4a7c15
+QUEUE_BASE_INVERSE = pow(QUEUE_BASE, -1, MASK + 1)
+
+def queue_push(count:int, value:int, key:int) -> int:
+    """Adds an action to the back of the hash of a priority's actions
+
+    :param count: How many actions have the priority before the push
+    :type count: int
+    :param value: The hash of those actions
+    :type value: int
+    :param key: The key of the pushed action
+    :type key: int
+    :return: The hash after the push
+    :rtype: int
+    """
+    return (value + key * pow(QUEUE_BASE, count, MASK + 1)) & MASK
+
+def queue_pop(value:int, key:int) -> int:
+    return ((value - key) * QUEUE_BASE_INVERSE) & MASK
+
+def queue_hash(priority:int, count:int, value:int) -> int:
+    # a priority's actions are placed like a bench slot, see mix, and add nothing when there are none
+    return mix(value ^ zobrist_key('queue', priority, count)) if count > 0 else 0
@@ -1,15 +1,98 @@
 from pokemon.pokemon_card import PlayingCard
 from pokemon.pokemon_battle import Deck
 from pokemon.pokemon_control import BattleController
-import pokemon.utils as utils
+from pokemon.pokemon_registry import CardRegistry
+
+from typing import Iterable, Sequence
+import numpy as np
+
+class CardCollection:
+    """Counts the copies of each card owned in a dense array indexed by the card's registry id, so many decks can be
+    checked against it at once
+    """
+
+    def __init__(self, registry:CardRegistry|None=None, cards:dict[PlayingCard,int]|None=None):
+        self.registry = registry if registry is not None else CardRegistry()
+        self.counts = np.zeros(max(len(self.registry), 16), dtype=np.int64)
+        if cards is not None:
+            for card, copies in cards.items():
+                self.add(card, copies)
+
+    def add(self, card:PlayingCard, copies:int=1) -> None:
+        card_id = self.registry.intern(card)
+        if card_id >= len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros(max(card_id + 1, 2 * len(self.counts)) - len(self.counts), dtype=np.int64)])
+        self.counts[card_id] += copies
+
+    def copies(self, card:PlayingCard) -> int:
+        if card not in self.registry:
+            return 0
+        return int(self.counts[self.registry.id_of(card)])
+
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def deck_counts(self, decks:Sequence[Deck]) -> np.ndarray:
+        """Counts the copies of each card in each deck
+
+        :param decks: The decks to count
+        :type decks: Sequence[Deck]
+        :return: One row per deck, indexed by card id. The extra last column counts the cards that aren't registered,
+            which are never owned
+        :rtype: np.ndarray
+        """
+        width = len(self.registry) + 1
+        unknown = width - 1
+        get_id = self.registry.get_id
+        rows = list[int]()
+        card_ids = list[int]()
+        for row, deck in enumerate(decks):
+            for card in deck.cards:
+                rows.append(row)
+                card_ids.append(get_id(card, unknown))
+        flat = np.array(rows, dtype=np.int64) * width + np.array(card_ids, dtype=np.int64)
+        return np.bincount(flat, minlength=len(decks) * width).reshape(len(decks), width)
+
+    def owned(self) -> np.ndarray:
+        """Gets the copies of each card, lined up with the columns of deck_counts
+
+        :return: The copies owned of each card id, with 0 for the cards that aren't registered
+        :rtype: np.ndarray
+        """
+        owned = np.zeros(len(self.registry) + 1, dtype=np.int64)
+        # a shared registry can have cards added after this collection last grew
+        known = min(len(self.registry), len(self.counts))
+        owned[:known] = self.counts[:known]
+        return owned
+
+    def can_build(self, decks:Sequence[Deck]) -> np.ndarray:
+        """Checks which decks could each be made from the cards in the collection
+
+        :param decks: The decks to check
+        :type decks: Sequence[Deck]
+        :return: Whether the collection has enough copies of every card of each deck
+        :rtype: np.ndarray
+        """
+        return (self.deck_counts(decks) <= self.owned()).all(axis=1)
+
+    def committed(self, decks:Iterable[Deck]) -> np.ndarray:
+        """Counts the copies of each card used across several decks
+
+        :param decks: The decks that use cards from the collection
+        :type decks: Iterable[Deck]
+        :return: The copies used of each card id, with the cards that aren't registered in the last entry
+        :rtype: np.ndarray
+        """
+        return self.deck_counts(list(decks)).sum(axis=0)
 
 class User:
     """Represents a user that collects and battles with cards
     """
 
-    def __init__(self, username:str, initial_cards:dict[PlayingCard,int]|None=None):
+    def __init__(self, username:str, initial_cards:dict[PlayingCard,int]|None=None, registry:CardRegistry|None=None):
         self.username = username
         self.cards = dict[PlayingCard,int]() if initial_cards is None else initial_cards
+        self.collection = CardCollection(registry, self.cards)
         self.collection_decks = dict[str,Deck]()
         self.unlimited_decks  = dict[str,Deck]()
         self.controller = BattleController()
@@ -24,6 +107,7 @@ class User:
             self.cards[card] += 1
         else:
             self.cards[card] = 1
+        self.collection.add(card)
 
     def add_cards(self, cards:list[PlayingCard]) -> None:
         """Adds many cards to the user's collection
@@ -54,12 +138,30 @@ class User:
         :return: True if the deck is added, false otherwise
         :rtype: bool
         """
-        counts = dict[PlayingCard, int](utils.tuple_to_counts(deck.get_cards()))
-        for card, count in counts.items():
-            if count > self.number_of_copies(card):
-                return False
+        if not self.collection.can_build([deck])[0]:
+            return False
         self.collection_decks[deck.name] = deck
         return True
+
+    def buildable_decks(self, decks:Sequence[Deck]) -> np.ndarray:
+        """Checks which decks could each be made with the user's cards
+
+        :param decks: The decks to check
+        :type decks: Sequence[Deck]
+        :return: Whether each deck can be made
+        :rtype: np.ndarray
+        """
+        return self.collection.can_build(decks)
+
+    def committed_copies(self) -> dict[PlayingCard,int]:
+        """Counts the copies of each card used across all of the user's collection decks
+
+        :return: The copies used of each card that is in at least one collection deck
+        :rtype: dict[PlayingCard,int]
+        """
+        committed = self.collection.committed(self.collection_decks.values())
+        registry = self.collection.registry
+        return {registry.card(card_id):int(committed[card_id]) for card_id in np.flatnonzero(committed[:len(registry)]).tolist()}
     
     def add_unlimited_deck(self, deck:Deck) -> None:
         """Adds a deck to the User's collection of decks
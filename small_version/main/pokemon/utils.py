@@ -2,6 +2,10 @@ from typing import Any
 from frozendict import frozendict
 from dataclasses import dataclass, field
 from heapq import heappop, heappush
+from collections import deque
+from typing import Iterable, Callable
+from itertools import islice
+from random import Random
 
 def tuple_to_counts(tup:tuple[Any]) -> dict[Any,int]:
     """Takes in a list of hashable objects and returns a dict where each item is mapped to the number of times it appears
@@ -89,6 +93,9 @@ class PriorityQueue[T]:
         priority, count, item = heappop(self.items)
         heappush(self.items, (priority, count, item))
         return item
+
+    def top_priority(self) -> int:
+        return self.items[0][0]
     
     def size(self) -> int:
         return len(self.items)
@@ -96,3 +103,302 @@ class PriorityQueue[T]:
     def clear(self) -> None:
         self.items.clear()
         self.i = 0
+
+    def ordered(self) -> list[T]:
+        return [item for _, item in self.prioritized()]
+
+    def prioritized(self) -> list[tuple[int,T]]:
+        return [(priority, item) for priority, _, item in sorted(self.items, key=lambda entry: entry[:2])]
+
+    def map(self, function:Callable[[T],T]) -> 'PriorityQueue[T]':
+        """Creates a copy of the queue with every item passed through a function, keeping the order of the items
+
+        :param function: Creates the item for the new queue from an item in this queue
+        :type function: Callable[[T],T]
+        :return: The new queue
+        :rtype: PriorityQueue[T]
+        """
+        queue = PriorityQueue[T]()
+        queue.items = [(priority, count, function(item)) for priority, count, item in self.items]
+        queue.i = self.i
+        return queue
+
+
+class BucketQueue[T]:
+    """A priority queue for a small, fixed range of integer priorities. Each priority has its own deque so items
+    with the same priority come out in the order they were pushed, and push, pop and top take constant time
+    """
+
+    def __init__(self, lowest:int, highest:int):
+        self.lowest = lowest
+        self.buckets = tuple(deque[T]() for _ in range(highest - lowest + 1))
+        self.first = len(self.buckets)
+        self.count = 0
+
+    def push(self, priority:int, item:T) -> None:
+        index = self.__bucket_index(priority)
+        self.buckets[index].append(item)
+        self.count += 1
+        if index < self.first:
+            self.first = index
+
+    def push_all(self, priority:int, items:Iterable[T]) -> None:
+        """Pushes many items with the same priority, keeping their order
+
+        :param priority: The priority of every item
+        :type priority: int
+        :param items: The items to push
+        :type items: Iterable[T]
+        :raises ValueError: If the priority is outside the range of the queue
+        """
+        index = self.__bucket_index(priority)
+        bucket = self.buckets[index]
+        before = len(bucket)
+        bucket.extend(items)
+        added = len(bucket) - before
+        if added > 0:
+            self.count += added
+            if index < self.first:
+                self.first = index
+
+    def __bucket_index(self, priority:int) -> int:
+        index = priority - self.lowest
+        if index < 0 or index >= len(self.buckets):
+            raise ValueError(f'Priority {priority} is outside the range {self.lowest} to {self.lowest + len(self.buckets) - 1} of the BucketQueue')
+        return index
+
+    def pop(self) -> T:
+        if self.count == 0:
+            raise IndexError('pop from an empty BucketQueue')
+        item = self.buckets[self.first].popleft()
+        self.count -= 1
+        while self.first < len(self.buckets) and len(self.buckets[self.first]) == 0:
+            self.first += 1
+        return item
+    
+    def top(self) -> T:
+        if self.count == 0:
+            raise IndexError('top of an empty BucketQueue')
+        return self.buckets[self.first][0]
+
+    def top_priority(self) -> int:
+        if self.count == 0:
+            raise IndexError('top of an empty BucketQueue')
+        return self.lowest + self.first
+    
+    def size(self) -> int:
+        return self.count
+    
+    def clear(self) -> None:
+        for bucket in self.buckets:
+            bucket.clear()
+        self.first = len(self.buckets)
+        self.count = 0
+
+    def ordered(self) -> list[T]:
+        """Lists the items in the order they would be popped
+
+        :return: The items
+        :rtype: list[T]
+        """
+        return [item for bucket in self.buckets[self.first:] for item in bucket]
+
+    def prioritized(self) -> list[tuple[int,T]]:
+        """Lists the items with their priorities in the order they would be popped
+
+        :return: The priority and item of each item
+        :rtype: list[tuple[int,T]]
+        """
+        return [(self.lowest + index, item) for index in range(self.first, len(self.buckets)) for item in self.buckets[index]]
+
+    def map(self, function:Callable[[T],T]) -> 'BucketQueue[T]':
+        """Creates a copy of the queue with every item passed through a function, keeping the order of the items
+
+        :param function: Creates the item for the new queue from an item in this queue
+        :type function: Callable[[T],T]
+        :return: The new queue
+        :rtype: BucketQueue[T]
+        """
+        queue = BucketQueue.__new__(BucketQueue)
+        queue.lowest = self.lowest
+        queue.buckets = tuple(deque[T](map(function, bucket)) for bucket in self.buckets)
+        queue.first = self.first
+        queue.count = self.count
+        return queue
+
+
+class IndexedPile[T]:
+    """A pile of items drawn from the top, indexed by a key so the items with a key are found without looking through
+    the whole pile. Each item is kept with its key in a list with the top of the pile at head, so drawing only moves
+    head. The index is built the first time it is needed after the pile is shuffled or copied.
+
+    The pile remembers whether its order is uniformly random. Drawing, taking and removing items keep a random order
+    random, so randomize only shuffles a pile that isn't
+    """
+
+    def __init__(self, items:Iterable[T], key:Callable[[T],Any], random_order:bool=False):
+        self.key = key
+        self.reset(items, random_order)
+
+    def reset(self, items:Iterable[T], random_order:bool=False) -> None:
+        """Replaces the items in the pile
+
+        :param items: The new items, top first
+        :type items: Iterable[T]
+        :param random_order: Whether the order of the items is uniformly random
+        :type random_order: bool
+        """
+        self.entries = [(item, self.key(item)) for item in items]
+        self.head = 0
+        self.index = None
+        self.random_order = random_order
+
+    def copy(self) -> 'IndexedPile[T]':
+        pile = IndexedPile.__new__(IndexedPile)
+        pile.key = self.key
+        pile.entries = self.entries[self.head:]
+        pile.head = 0
+        pile.index = None
+        pile.random_order = self.random_order
+        return pile
+
+    def shuffle(self, rng:Random) -> None:
+        """Shuffles the pile in place
+
+        :param rng: The random generator to shuffle with
+        :type rng: Random
+        """
+        if self.head > 0:
+            del self.entries[:self.head]
+            self.head = 0
+        rng.shuffle(self.entries)
+        self.index = None
+        self.random_order = True
+
+    def randomize(self, rng:Random) -> None:
+        """Makes the order of the pile uniformly random, only shuffling it if it isn't already
+
+        :param rng: The random generator to shuffle with
+        :type rng: Random
+        """
+        if not self.random_order:
+            self.shuffle(rng)
+
+    def extend(self, items:Iterable[T]) -> None:
+        """Puts items on the bottom of the pile
+
+        :param items: The items to add
+        :type items: Iterable[T]
+        """
+        for item in items:
+            key = self.key(item)
+            if self.index is not None:
+                self.index.setdefault(key, set()).add(len(self.entries))
+            self.entries.append((item, key))
+        self.random_order = False
+
+    def __len__(self) -> int:
+        return len(self.entries) - self.head
+
+    def __iter__(self):
+        return (item for item, _ in islice(self.entries, self.head, None))
+
+    def __contains__(self, item:T) -> bool:
+        return any(self.entries[position][0] == item for position in self.__get_index().get(self.key(item), ()))
+
+    def keys(self) -> list[Any]:
+        return list(self.__get_index().keys())
+
+    def positions(self, key:Any) -> list[int]:
+        """Finds where the items with a key are in the pile
+
+        :param key: The key to look for
+        :type key: Any
+        :return: The positions of the items with the key, from the top of the pile down
+        :rtype: list[int]
+        """
+        return sorted(self.__get_index().get(key, ()))
+
+    def find(self, matches:Callable[[Any],bool]) -> list[int]:
+        """Finds where the items with a matching key are in the pile. Builds the index if the pile keeps its order,
+        otherwise looks through the keys of the pile since the index would be thrown away by the next shuffle. Either
+        way the positions come in the same order, so piles with the same items give the same picks to the same random
+        numbers however their index was built
+
+        :param matches: Whether items with a key should be found
+        :type matches: Callable[[Any],bool]
+        :return: The positions of the items with a matching key, from the top of the pile down
+        :rtype: list[int]
+        """
+        if self.index is None and not self.random_order:
+            return [position for position, (_, key) in enumerate(islice(self.entries, self.head, None), self.head) if matches(key)]
+        found = [position for key, positions in self.__get_index().items() if matches(key) for position in positions]
+        found.sort()
+        return found
+
+    def draw(self) -> T:
+        if self.head == len(self.entries):
+            raise IndexError('draw from an empty IndexedPile')
+        return self.__take_head()
+
+    def take(self, positions:Iterable[int]) -> list[T]:
+        """Removes the items at some positions. The item on top of the pile fills each gap, which keeps a uniformly
+        random order random since the positions don't depend on the order of the other items
+
+        :param positions: The positions of the items to remove, from positions
+        :type positions: Iterable[int]
+        :return: The removed items, in the order of the positions
+        :rtype: list[T]
+        """
+        positions = list(positions)
+        taken = [self.entries[position][0] for position in positions]
+        entries = self.entries
+        for position in sorted(positions):
+            head = self.head
+            if position != head:
+                top_key, item_key = entries[head][1], entries[position][1]
+                entries[head], entries[position] = entries[position], entries[head]
+                if self.index is not None and top_key != item_key:
+                    self.index[top_key].discard(head)
+                    self.index[top_key].add(position)
+                    self.index[item_key].discard(position)
+                    self.index[item_key].add(head)
+            self.__take_head()
+        return taken
+
+    def remove(self, item:T) -> None:
+        """Removes an item, keeping the order of the rest of the pile
+
+        :param item: The item to remove
+        :type item: T
+        :raises ValueError: If the item isn't in the pile
+        """
+        for position in range(self.head, len(self.entries)):
+            if self.entries[position][0] == item:
+                del self.entries[position]
+                self.index = None
+                return
+        raise ValueError('item is not in the IndexedPile')
+
+    def __get_index(self) -> dict[Any,set[int]]:
+        if self.index is None:
+            index = {}
+            for position, (_, key) in enumerate(islice(self.entries, self.head, None), self.head):
+                positions = index.get(key)
+                if positions is None:
+                    index[key] = {position}
+                else:
+                    positions.add(position)
+            self.index = index
+        return self.index
+
+    def __take_head(self) -> T:
+        item, key = self.entries[self.head]
+        if self.index is not None:
+            positions = self.index[key]
+            positions.discard(self.head)
+            if len(positions) == 0:
+                del self.index[key]
+        self.entries[self.head] = None
+        self.head += 1
+        return item
@@ -0,0 +1,32 @@
+from pokemon.pokemon_battle import Battle, BattleLog, BattleState, Deck, battle_factory
+from pokemon.pokemon_simulation import random_policy
+from pokemon.pokemon_collections import generate_pokemon_cards, generate_trainers
+from main import example_decks
+
+import random
+
+# battles of the example decks shared by the tests of the engine's users, like the controllers and the searches
+
+def get_decks() -> tuple[Deck,Deck]:
+    return example_decks(generate_pokemon_cards(), generate_trainers())
+
+def get_battle(seed:int, moves:int=0, log:BattleLog|None=None, decks:tuple[Deck,Deck]|None=None) -> Battle:
+    # the random moves are seeded with the battle's seed
+    deck1, deck2 = decks if decks is not None else get_decks()
+    battle = battle_factory(deck1, deck2, log=log, headless=True, seed=seed)
+    rng = random.Random(seed)
+    for _ in range(moves):
+        if battle.is_over():
+            break
+        battle.action(*random_policy(battle, rng))
+    return battle
+
+def get_states(seed:int, count:int) -> tuple[Battle,list[BattleState]]:
+    # a copy of the state after each of the first count moves
+    battle = get_battle(seed)
+    rng = random.Random(seed)
+    states = list[BattleState]()
+    while not battle.is_over() and len(states) < count:
+        battle.action(*random_policy(battle, rng))
+        states.append(battle.state.fork())
+    return battle, states
@@ -0,0 +1,33 @@
+from benchmarks.engine_benchmarks import BENCHMARKS, compare, load_baseline, save_baseline, main
+
+import os
+import sys
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'baseline.json')
+
+# TESTING FOR compare
+def test_compare():
+    baseline = {'fast': 100.0, 'slow': 10.0, 'gone': 5.0}
+    assert compare({'fast': 95.0, 'slow': 8.0, 'new': 1.0}, baseline, 0.1) == ['slow']
+    assert compare({'fast': 90.0, 'slow': 10.0}, baseline, 0.1) == []
+    assert compare({'fast': 89.9, 'slow': 20.0}, baseline, 0.1) == ['fast']
+    assert compare({'fast': 50.0, 'slow': 5.0}, baseline, 0.5) == []
+
+def test_baseline_file(tmp_path):
+    baseline = load_baseline(BASELINE_PATH)
+    assert set(baseline) == set(BENCHMARKS)
+    assert all(rate > 0 for rate in baseline.values())
+    path = str(tmp_path / 'baseline.json')
+    save_baseline({'fast': 100.0}, path)
+    assert load_baseline(path) == {'fast': 100.0}
+
+def test_threshold(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / 'baseline.json')
+    # nothing can run a million times faster, so comparing against this baseline always fails
+    save_baseline({'energy_container': 1e12}, path)
+    monkeypatch.setattr(sys, 'argv', ['engine_benchmarks', 'energy_container', '--repeat', '1', '--scale', '0.01', '--compare', path])
+    assert main() == 1
+    assert 'energy_container' in capsys.readouterr().out.splitlines()[-1]
+    monkeypatch.setattr(sys, 'argv', ['engine_benchmarks', 'energy_container', '--repeat', '1', '--scale', '0.01', '--compare', path, '--threshold', '1'])
+    assert main() == 0
+# END OF TESTING FOR compare
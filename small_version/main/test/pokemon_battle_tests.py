@@ -1,19 +1,18 @@
-from pokemon.pokemon_battle import ActivePokemon, DeckSetup, Deck, Action, Battle, Rules, battle_factory, standard_actions, standard_effects, standard_damage_effects
+from pokemon.pokemon_battle import ActivePokemon, DeckSetup, Deck, Action, Battle, Rules, battle_factory, standard_actions, standard_effects, standard_damage_effects, EventBattleLog, BattleEventType, StateChange, legal_moves
 from pokemon.pokemon_types import Condition, EnergyContainer, EnergyType
-from pokemon.pokemon_card import PokemonCard, PlayingCard, Trainer
-from pokemon.pokemon_collections import generate_attacks, generate_pokemon, generate_pokemon_cards, generate_trainers, generate_abilities
+from pokemon.pokemon_card import PokemonCard, PlayingCard, Trainer, CardType
+from pokemon.pokemon_collections import generate_pokemon_cards, generate_trainers
+from test.battle_helpers import get_battle
 
 from frozendict import frozendict
 import pytest
+import random
 
 # TESTING FOR ActivePokemon
 def get_cards() -> dict[str, PlayingCard]:
-    abilities = generate_abilities()
-    attacks = generate_attacks()
-    pokemon = generate_pokemon()
     trainers = generate_trainers()
-    pokemon_cards = generate_pokemon_cards(pokemon, attacks, abilities)
-    cards = dict[PlayingCard]()
+    pokemon_cards = generate_pokemon_cards()
+    cards = dict[str,PlayingCard]()
     for name,trainer in trainers.items():
         cards[name] = trainer
     for name,pokemon_card in pokemon_cards.items():
@@ -225,6 +224,20 @@ def test_play_card_from_hand():
     assert len(deck_setup.hand) == 5 - 1
     assert len(deck_setup.discard) == 1
 
+def test_get_cards():
+    cards = get_cards()
+    deck = get_deck()
+    deck_setup = DeckSetup(deck, 0, 1)
+    deck_setup.get_cards(3, CardType.POKEMON, EnergyType.FIRE, True)
+    assert deck_setup.hand == [cards['Charmander 0'], cards['Charmander 0']]
+    deck_setup.get_cards(1, CardType.POKEMON, None, False)
+    assert len(deck_setup.hand) == 3
+    deck_setup.get_cards(1, CardType.SUPPORTER, None, False)
+    assert len(deck_setup.hand) == 3
+    deck_setup.draw_basic()
+    assert deck_setup.hand[-1].is_basic()
+    assert same_cards(deck.cards, deck_setup)
+
 def test_evolve():
     # TO TEST: figure out where error checking for evolving should go
     deck = get_deck()
@@ -236,11 +249,25 @@ def test_evolve():
 
 # END OF TESTING FOR DeckSetup
 
+# TESTING FOR Rules
+def test_rules_registries():
+    rules = Rules(standard_actions(), standard_effects(), standard_damage_effects())
+    assert rules.get_actions() is rules.get_actions()
+    assert rules.get_action('attack').action_name() == 'attack'
+    assert rules.get_action('missing') is None
+    assert rules.get_effect('heal').effect_name() == 'heal'
+    assert rules.get_damage_effect('energy_boost').effect_name() == 'energy_boost'
+    assert rules.effect_handler('draw').__self__ is rules.get_effect('draw')
+    assert rules.effect_handler('missing') is None
+    with pytest.raises(TypeError):
+        rules.get_effects()['heal'] = None
+# END OF TESTING FOR Rules
+
 # FULL BATTLE TESTING
-def deterministic_battle_setup(deck_cards:list[PokemonCard]) -> Battle:
+def deterministic_battle_setup(deck_cards:list[PokemonCard], **kwargs) -> Battle:
     deck = Deck("name1", deck_cards, (EnergyType.GRASS,))
     rules = Rules(standard_actions(), standard_effects(), standard_damage_effects(), SHUFFLE=False, DUPLICATE_LIMIT=3, DECK_SIZE=len(deck.cards))
-    return battle_factory(deck, deck, rules)
+    return battle_factory(deck, deck, rules, **kwargs)
 
 def test_battle():
     cards = get_cards()
@@ -328,6 +355,197 @@ def test_battle():
     assert battle.is_over()
     assert list(battle.available_actions().keys()) == []
 
+def test_headless_battle(capsys):
+    cards = get_cards()
+    deck_cards = [
+        cards['Bulbasaur 0'],
+        cards['Ivysaur 0'],
+        cards['Venusaur 0'],
+        cards['Bulbasaur 0'],
+        cards['Ivysaur 0'],
+        cards['Venusaur 0'],
+    ]
+    battle = deterministic_battle_setup(deck_cards, headless=True)
+    assert battle.action('setup', (True, 0))
+    assert battle.action('setup', (False, 0))
+    assert battle.action('end_turn', tuple())
+    assert capsys.readouterr().out == ''
+
+    log = EventBattleLog()
+    battle = deterministic_battle_setup(deck_cards, log=log)
+    assert battle.action('setup', (True, 0))
+    assert battle.action('setup', (False, 0))
+    assert not battle.action('attack', (0,))
+    assert capsys.readouterr().out == ''
+    assert [event.name for event in log.events] == ['setup', 'setup', 'attack']
+    assert all(event.event_type == BattleEventType.ACTION for event in log.events)
+
+def test_fork():
+    cards = get_cards()
+    deck_cards = [
+        cards['Bulbasaur 0'],
+        cards['Ivysaur 0'],
+        cards['Potion'],
+        cards['Bulbasaur 0'],
+        cards['Venusaur 0'],
+        cards['Ivysaur 0'],
+        cards['Potion'],
+        cards['Venusaur 0'],
+    ]
+    for copy_on_write in [False, True]:
+        battle = deterministic_battle_setup(deck_cards, headless=True)
+        assert battle.action('setup', (True, 0))
+        assert battle.action('setup', (False, 0))
+        battle.state.current_deck().active[0].damage = 30
+        assert battle.action('trainer', (1,))
+
+        fork = battle.fork(copy_on_write)
+        assert fork.state.rules is battle.state.rules
+        assert fork.state.deck1.hand[0] is battle.state.deck1.hand[0]
+        assert fork.get_partial_inputs()[0] is not battle.get_partial_inputs()[0]
+
+        assert fork.action('select', (*fork.get_partial_inputs(), 0))
+        assert fork.action('end_turn', tuple())
+        assert fork.action('place_energy', (0,))
+        assert fork.state.deck1.active[0].hp() == 60
+        assert fork.state.deck2.active[0].energies.size() == 1
+        assert len(fork.state.deck2.hand) == 5
+
+        assert battle.state.deck1.active[0].hp() == 40
+        assert battle.state.deck2.active[0].energies.size() == 0
+        assert len(battle.state.deck2.hand) == 4
+        assert len(battle.state.deck2.deck) == 3
+        assert list(battle.available_actions().keys()) == ['select']
+        assert battle.action('select', (*battle.get_partial_inputs(), 0))
+        assert battle.state.deck1.active[0].hp() == 60
+        assert same_cards(deck_cards, battle.state.deck2)
+        assert same_cards(deck_cards, fork.state.deck2)
+
+def test_fork_draws_same_cards():
+    played = 0
+    for seed in range(250, 400):
+        battle = get_battle(seed, 6)
+        deck = battle.state.current_deck()
+        if battle.is_over() or len(deck.hand) == 0 or deck.hand[0].get_name() != 'Pokeball':
+            continue
+        # the original pile has its index built, the copy builds its own
+        deck.deck.keys()
+        fork = battle.fork()
+        assert battle.action('trainer', (0,)) == fork.action('trainer', (0,))
+        assert battle.state.current_deck().hand == fork.state.current_deck().hand
+        assert list(battle.state.current_deck().deck) == list(fork.state.current_deck().deck)
+        played += 1
+    assert played > 0
+
+def test_seeded_battle():
+    cards = get_cards()
+    deck = get_deck()
+    rules = Rules(standard_actions(), standard_effects(), standard_damage_effects(), DECK_SIZE=len(deck.cards))
+    battle1 = battle_factory(deck, deck, rules, headless=True, seed=7)
+    battle2 = battle_factory(deck, deck, rules, headless=True, seed=7)
+    for battle in [battle1, battle2]:
+        assert battle.action('setup', (True, 0))
+        assert battle.action('setup', (False, 0))
+    assert battle1.state.deck1.hand == battle2.state.deck1.hand
+    assert list(battle1.state.deck2.deck) == list(battle2.state.deck2.deck)
+    assert battle1.state.deck1.next_energies == battle2.state.deck1.next_energies
+
+    fork = battle1.fork()
+    for battle in [battle1, fork]:
+        battle.state.deck1.get_cards(2, cards['Bulbasaur 0'].get_card_type(), None, False)
+        assert battle.action('end_turn', tuple())
+    assert battle1.state.deck1.hand == fork.state.deck1.hand
+    assert list(battle1.state.deck1.deck) == list(fork.state.deck1.deck)
+    assert battle1.state.deck2.next_energies == fork.state.deck2.next_energies
+
+def test_legal_moves():
+    cards = get_cards()
+    deck = get_deck()
+    deck.cards.extend([cards['Potion'], cards['Potion']])
+    rules = Rules(standard_actions(), standard_effects(), standard_damage_effects(), DECK_SIZE=len(deck.cards))
+    for seed in range(5):
+        rng = random.Random(seed)
+        battle = battle_factory(deck, deck, rules, headless=True, seed=seed)
+        for _ in range(200):
+            moves = battle.legal_moves()
+            if len(moves) == 0:
+                break
+            assert moves == legal_moves(battle.state)
+            assert {name for name,_ in moves} <= set(battle.available_actions().keys())
+            for name, inputs in moves:
+                assert battle.fork().action(name, inputs)
+            assert battle.action(*rng.choice(moves))
+        assert battle.state.team1_ready and battle.state.team2_ready
+
+    battle = battle_factory(deck, deck, rules, headless=True, seed=0)
+    setups = battle.legal_moves()
+    assert all(name == 'setup' and inputs[0] for name,inputs in setups)
+    assert len(setups) == len(set(setups))
+
+def test_start_turn_notifies():
+    deck = get_deck()
+    rules = Rules(standard_actions(), standard_effects(), standard_damage_effects(), DECK_SIZE=len(deck.cards))
+    battle = battle_factory(deck, deck, rules, headless=True, seed=0)
+    changes = []
+    battle.state.set_listener(changes.append)
+    battle.state.start_turn(False)
+    assert battle.state.current_turn.energy_used
+    assert StateChange.TURN in changes
+
+def test_legal_select_values():
+    cards = get_cards()
+    deck = get_deck()
+    deck.cards.extend([cards['Potion'], cards['Potion'], cards['Sabrina'], cards['Sabrina']])
+    rules = Rules(standard_actions(), standard_effects(), standard_damage_effects(), DECK_SIZE=len(deck.cards))
+    selects = 0
+    for seed in range(20):
+        rng = random.Random(seed)
+        battle = battle_factory(deck, deck, rules, headless=True, seed=seed)
+        for _ in range(200):
+            moves = battle.legal_moves()
+            if len(moves) == 0:
+                break
+            if battle.state.next_action() == 'select':
+                selects += 1
+                # every value that works when tried must be listed, and nothing else
+                user_input = battle.get_partial_inputs()[0]
+                tried = [value for value in range(max(len(battle.state.deck1.active), len(battle.state.deck2.active)) + 1)
+                         if (fork := battle.fork()).action('select', (*fork.get_partial_inputs(), value))]
+                assert moves == [('select', (user_input, value)) for value in tried]
+            assert battle.action(*rng.choice(moves))
+    assert selects > 0
+
+def test_action_cache():
+    cards = get_cards()
+    deck = get_deck()
+    deck.cards.extend([cards['Potion'], cards['Potion']])
+    rules = Rules(standard_actions(), standard_effects(), standard_damage_effects(), DECK_SIZE=len(deck.cards))
+    for seed in range(5):
+        rng = random.Random(seed)
+        cached = battle_factory(deck, deck, rules, headless=True, seed=seed, cache_actions=True)
+        battle = battle_factory(deck, deck, rules, headless=True, seed=seed)
+        while not battle.is_over() and battle.state.turn_number < 100:
+            assert list(cached.available_actions().keys()) == list(battle.available_actions().keys())
+            moves = battle.legal_moves()
+            cached_moves = cached.legal_moves()
+            assert len(moves) == len(cached_moves)
+            i = rng.randrange(len(moves))
+            assert cached.action(*cached_moves[i]) and battle.action(*moves[i])
+            fork = cached.fork()
+            assert fork.action_cache is not None
+            assert list(fork.available_actions().keys()) == list(battle.available_actions().keys())
+
+    battle = deterministic_battle_setup(get_deck().cards, headless=True, cache_actions=True)
+    assert battle.action('setup', (True, 0))
+    assert battle.action('setup', (False, 0))
+    assert battle.action('end_turn', tuple())
+    battle.available_actions()
+    assert 'evolve' in battle.action_cache.results
+    assert battle.action('place_energy', (0,))
+    assert 'evolve' in battle.action_cache.results
+    assert 'place_energy' not in battle.action_cache.results
+    assert 'place_energy' not in battle.available_actions()
+
 def check_actions(actions:dict[str,Action], should_have:list[str]):
     action_list = list(actions.keys())
     action_list.sort()
@@ -666,4 +884,22 @@ def test_potion():
     assert battle.action('select', (*battle.get_partial_inputs(), 2,))
     assert battle.state.current_deck().active[2].hp() == 40
 
+def test_trainer_inputs_not_shared():
+    cards = get_cards()
+    deck_cards = [cards['Bulbasaur 0'], cards['Potion'], cards['Potion'], cards['Ivysaur 0'], cards['Bulbasaur 0']]
+    battles = [deterministic_battle_setup(deck_cards, headless=True) for _ in range(2)]
+    for battle in battles:
+        assert battle.action('setup', (True,0))
+        assert battle.action('setup', (False,0))
+        battle.state.current_deck().active[0].damage = 30
+        assert battle.action('trainer', (0,))
+    first, second = (battle.get_partial_inputs()[0] for battle in battles)
+    assert first is not second
+    assert first is not cards['Potion'].get_actions()[0][1][0]
+
+    assert battles[0].action('select', (first, 0))
+    assert not second.has_value
+    assert battles[1].action('select', (second, 0))
+    assert all(battle.state.current_deck().active[0].hp() == 60 for battle in battles)
+
 # END OF FULL BATTLE TESTING
\ No newline at end of file
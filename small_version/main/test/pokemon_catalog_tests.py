@@ -0,0 +1,40 @@
+from pokemon.pokemon_catalog import CardCatalog, load_catalog, read_catalog_data, decode_value, CATALOG_PATH
+from pokemon.pokemon_battle import UserInput
+from pokemon.pokemon_card import CardType
+from pokemon.pokemon_types import EnergyType
+
+import os
+import pytest
+
+# TESTING FOR decode_value
+def test_decode_value():
+    assert decode_value(['get_card', [1, {'CardType': 'POKEMON'}, {'EnergyType': 'GRASS'}, False]]) == ('get_card', (1, CardType.POKEMON, EnergyType.GRASS, False))
+    user_input = decode_value({'UserInput': ['Select a card.', False]})
+    assert isinstance(user_input, UserInput) and user_input.prompt == 'Select a card.' and not user_input.current_user
+    assert decode_value(None) is None
+# END OF TESTING FOR decode_value
+
+# TESTING FOR CardCatalog
+def test_lazy_catalog():
+    catalog = CardCatalog(read_catalog_data(CATALOG_PATH))
+    charizard = catalog.card('Charizard 0')
+    assert charizard.get_name() == 'Charizard' and charizard.evolves_from().name == 'Charmeleon'
+    assert set(catalog.built_pokemon_cards) == {'Charizard 0'}
+    assert set(catalog.built_pokemon) == {'Charizard', 'Charmeleon', 'Charmander'}
+    assert len(catalog.built_trainers) == 0
+    assert catalog.card('Charizard 0') is charizard
+    assert catalog.pokemon('Charmeleon') is charizard.evolves_from()
+    assert catalog.card('Potion').get_card_type() == CardType.ITEM
+    with pytest.raises(KeyError):
+        catalog.card('Mewtwo 0')
+
+def test_load_catalog(tmp_path):
+    assert load_catalog() is load_catalog(CATALOG_PATH)
+    cache_path = os.path.join(tmp_path, 'catalog.pickle')
+    data = read_catalog_data(CATALOG_PATH, cache_path)
+    assert os.path.exists(cache_path)
+    assert read_catalog_data(CATALOG_PATH, cache_path) == data == read_catalog_data(CATALOG_PATH)
+    with open(cache_path, 'wb') as file:
+        file.write(b'not a pickle')
+    assert read_catalog_data(CATALOG_PATH, cache_path) == data
+# END OF TESTING FOR CardCatalog
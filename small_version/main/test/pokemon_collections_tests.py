@@ -1,8 +1,11 @@
 from pokemon.pokemon_collections import generate_attacks, generate_pokemon, generate_pokemon_cards, generate_abilities
 from pokemon.pokemon_types import EnergyType, PokemonType, EnergyContainer
-from pokemon.pokemon_card import Pokemon, Attack, Ability
+from pokemon.pokemon_card import Pokemon, PokemonCard, Attack, Ability
 
 from frozendict import frozendict
+from dataclasses import FrozenInstanceError
+import pickle
+import pytest
 
 def test_generate_attacks():
     attacks = generate_attacks()
@@ -49,4 +52,21 @@ def test_generate_pokemon_cards():
         assert card.level >= 0 and card.level <= 102
         assert isinstance(card.abilities, tuple)
         for ability in card.abilities:
-            assert isinstance(ability, Ability)
\ No newline at end of file
+            assert isinstance(ability, Ability)
+
+
+def test_precomputed_card_attributes():
+    cards = generate_pokemon_cards(generate_pokemon(), generate_attacks(), generate_abilities())
+    venusaur = cards['Venusaur ex 0']
+    assert venusaur.get_name() == 'Venusaur ex'
+    assert cards['Venusaur 0'].get_name() == 'Venusaur'
+    assert venusaur.pokemon.get_stage() == 2
+    assert venusaur.get_energy_type() == EnergyType.GRASS
+    assert venusaur.get_weakness() == EnergyType.FIRE
+    assert 'weakness' not in repr(venusaur)
+    with pytest.raises(FrozenInstanceError):
+        venusaur.name = 'Bulbasaur'
+
+    copy = PokemonCard(venusaur.pokemon, venusaur.version, venusaur.hit_points, venusaur.pokemon_type, venusaur.attacks, venusaur.retreat_cost, venusaur.level)
+    assert copy == venusaur and hash(copy) == hash(venusaur)
+    assert pickle.loads(pickle.dumps(venusaur)).get_name() == 'Venusaur ex'
@@ -0,0 +1,61 @@
+from pokemon.pokemon_control import battle_control, RandomBattleController, ScriptedBattleController, GreedyBattleController
+from test.battle_helpers import get_battle
+
+import io
+import pytest
+
+class RecordingController(RandomBattleController):
+    def __init__(self, seed:int):
+        super().__init__(seed)
+        self.moves = []
+
+    def choose_move(self, battle, rng):
+        move = super().choose_move(battle, rng)
+        self.moves.append(move)
+        return move
+
+# TESTING FOR automated controllers
+def test_controllers_are_silent(capsys, monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO())
+    for controller1, controller2 in [(RandomBattleController(0), RandomBattleController(1)), (GreedyBattleController(), RandomBattleController(2)), (GreedyBattleController(), GreedyBattleController())]:
+        battle = get_battle(3)
+        battle_control(battle, controller1, controller2, verbose=False)
+        assert battle.is_over()
+    assert capsys.readouterr() == ('', '')
+
+def test_random_controller_seeded():
+    results = []
+    for _ in range(2):
+        battle = get_battle(4)
+        battle_control(battle, RandomBattleController(5), RandomBattleController(6), verbose=False)
+        results.append((battle.state.winner(), battle.state.turn_number, battle.get_score()))
+    assert results[0] == results[1]
+
+def test_scripted_controller():
+    battle = get_battle(7)
+    recorder1, recorder2 = RecordingController(8), RecordingController(9)
+    battle_control(battle, recorder1, recorder2, verbose=False)
+
+    replay = get_battle(7)
+    script1, script2 = ScriptedBattleController(recorder1.moves), ScriptedBattleController(recorder2.moves)
+    battle_control(replay, script1, script2, verbose=False)
+    assert (replay.state.winner(), replay.state.turn_number, replay.get_score()) == (battle.state.winner(), battle.state.turn_number, battle.get_score())
+    with pytest.raises(IndexError):
+        script1.choose_move(replay, script1.rng)
+
+def test_greedy_controller():
+    battle = get_battle(10)
+    controller = GreedyBattleController()
+    name, inputs = controller.choose_move(battle, controller.rng)
+    assert name == 'setup' and len(inputs) == max(len(move) for action, move in battle.legal_moves())
+    while not battle.is_over():
+        moves = battle.legal_moves()
+        name, inputs = controller.choose_move(battle, controller.rng)
+        assert (name, inputs) in moves
+        names = {action for action, _ in moves}
+        if 'attack' in names:
+            assert name == 'attack'
+        elif 'place_energy' in names:
+            assert name == 'place_energy'
+        battle.action(name, inputs)
+# END OF TESTING FOR automated controllers
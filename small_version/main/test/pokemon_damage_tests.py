@@ -0,0 +1,81 @@
+from pokemon.pokemon_battle import ActivePokemon, BaseDamageEffect, EnergyBoostDamageEffect, Rules, battle_factory, standard_actions, standard_effects, standard_damage_effects
+from pokemon.pokemon_damage import damage_matrix, state_damage
+from pokemon.pokemon_simulation import random_policy
+from pokemon.pokemon_types import EnergyContainer, EnergyType
+from pokemon.pokemon_collections import generate_attacks, generate_pokemon, generate_pokemon_cards, generate_trainers, generate_abilities
+from main import example_decks
+
+import random
+
+def get_rules(damage_effects=None) -> Rules:
+    return Rules(standard_actions(), standard_effects(), standard_damage_effects() if damage_effects is None else damage_effects)
+
+def scalar_damage(rules:Rules, attacker:ActivePokemon, attack_index:int, defender:ActivePokemon) -> tuple[int,int,bool]:
+    # the same steps as the attack action
+    attack = attacker.active_card().attacks[attack_index]
+    effect_name, inputs = attack.get_damage_effect()
+    effect = rules.get_damage_effect(effect_name)
+    if effect is None:
+        effect = rules.get_damage_effect('base')
+    defender = defender.copy()
+    before = defender.damage
+    defender.take_damage(effect.damage(None, attacker, attack, inputs), attacker.active_card().get_energy_type(), True)
+    return defender.damage - before, defender.hp(), defender.is_knocked_out()
+
+def random_active(rng:random.Random, cards:list) -> ActivePokemon:
+    card = rng.choice(cards)
+    energies = EnergyContainer({energy:rng.randint(0, 3) for energy in rng.sample(list(EnergyType), 3)})
+    return ActivePokemon([card], damage=rng.choice([0, 10, 30, 60, 90]), energies=energies)
+
+class DoubleDamageEffect(BaseDamageEffect):
+    def damage(self, battle, attacker, attack, inputs):
+        return 2 * inputs[0]
+
+# TESTING FOR damage_matrix
+def test_damage_matrix():
+    rng = random.Random(0)
+    cards = list(generate_pokemon_cards(generate_pokemon(), generate_attacks(), generate_abilities()).values())
+    for rules in [get_rules(), get_rules({DoubleDamageEffect(), EnergyBoostDamageEffect()})]:
+        for _ in range(200):
+            attacker = random_active(rng, cards)
+            defenders = [random_active(rng, cards) for _ in range(rng.randint(1, 4))]
+            result = damage_matrix(rules, attacker, defenders)
+            assert result.damage.shape == (len(attacker.active_card().attacks), len(defenders))
+            assert result.valid.all()
+            for i in range(len(attacker.active_card().attacks)):
+                for j, defender in enumerate(defenders):
+                    assert (result.damage[i,j], result.remaining_hp[i,j], result.knocked_out[i,j]) == scalar_damage(rules, attacker, i, defender)
+
+def test_damage_matrix_padding():
+    cards = list(generate_pokemon_cards(generate_pokemon(), generate_attacks(), generate_abilities()).values())
+    attacker = ActivePokemon([cards[0]])
+    result = damage_matrix(get_rules(), attacker, [None, ActivePokemon([cards[1]])])
+    assert not result.valid[:,0].any() and result.valid[:,1].all()
+    assert (result.damage[:,0] == 0).all() and not result.knocked_out[:,0].any()
+# END OF TESTING FOR damage_matrix
+
+# TESTING FOR state_damage
+def test_state_damage():
+    rng = random.Random(1)
+    rules = get_rules()
+    deck1, deck2 = example_decks(generate_pokemon_cards(generate_pokemon(), generate_attacks(), generate_abilities()), generate_trainers())
+    states = []
+    for seed in range(5):
+        battle = battle_factory(deck1, deck2, rules, headless=True, seed=seed)
+        for _ in range(60):
+            if battle.state.is_over():
+                break
+            battle.action(*random_policy(battle, rng))
+            states.append(battle.state.fork())
+    states = [state for state in states if len(state.current_deck().active) > 0]
+    result = state_damage(states)
+    for s, state in enumerate(states):
+        attacker = state.current_deck().active[0]
+        defenders = state.defending_deck().active
+        for i in range(result.damage.shape[1]):
+            for j in range(result.damage.shape[2]):
+                valid = attacker is not None and i < len(attacker.active_card().attacks) and j < len(defenders) and defenders[j] is not None
+                assert result.valid[s,i,j] == valid
+                if valid:
+                    assert (result.damage[s,i,j], result.remaining_hp[s,i,j], result.knocked_out[s,i,j]) == scalar_damage(rules, attacker, i, defenders[j])
+# END OF TESTING FOR state_damage
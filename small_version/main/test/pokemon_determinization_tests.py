@@ -0,0 +1,61 @@
+from pokemon.pokemon_battle import get_opponent_deck_view
+from pokemon.pokemon_control import GreedyBattleController
+from pokemon.pokemon_determinization import Determinizer, DeterminizedMCTSSearch, unseen_cards
+from pokemon.pokemon_mcts import MCTSBattleController, move_key
+from test.battle_helpers import get_battle, get_decks
+
+from collections import Counter
+import pytest
+
+# TESTING FOR unseen_cards
+def test_unseen_cards():
+    deck1, deck2 = get_decks()
+    battle = get_battle(0, 40, decks=(deck1, deck2))
+    view = get_opponent_deck_view(battle.state.deck2)
+    assert Counter(unseen_cards(deck2, view)) == Counter(battle.state.deck2.hand + list(battle.state.deck2.deck))
+    with pytest.raises(ValueError):
+        unseen_cards(deck1, view)
+# END OF TESTING FOR unseen_cards
+
+# TESTING FOR Determinizer
+def test_determinizer():
+    deck1, deck2 = get_decks()
+    battle = get_battle(1, 40, decks=(deck1, deck2))
+    state = battle.state
+    worlds = Determinizer(deck1, deck2, seed=2).sample(state, True, 20)
+    assert len(worlds) == 20
+    for world in worlds:
+        # what team 1 can see is unchanged
+        assert world.deck1.hand == state.deck1.hand and world.deck1.discard == state.deck1.discard
+        assert Counter(world.deck1.deck) == Counter(state.deck1.deck)
+        assert world.deck2.discard == state.deck2.discard and len(world.deck2.hand) == len(state.deck2.hand)
+        assert len(world.deck2.deck) == len(state.deck2.deck)
+        assert Counter(world.deck2.hand + list(world.deck2.deck)) == Counter(state.deck2.hand + list(state.deck2.deck))
+        assert (world.turn_number, world.team1_points, world.team2_points) == (state.turn_number, state.team1_points, state.team2_points)
+    assert len({tuple(map(id, world.deck2.hand + list(world.deck2.deck))) for world in worlds}) > 1
+
+def test_determinizer_opening_hand():
+    deck1, deck2 = get_decks()
+    battle = get_battle(2, 1, decks=(deck1, deck2))
+    assert len(battle.state.deck2.active) == 0
+    worlds = Determinizer(deck1, deck2, seed=5).sample(battle.state, True, 50)
+    assert all(any(card.is_basic() for card in world.deck2.hand) for world in worlds)
+    assert all(len(world.legal_moves()) > 0 for world in Determinizer(deck1, deck2, seed=5).sample_battles(battle, True, 50))
+
+def test_determinizer_seeded():
+    deck1, deck2 = get_decks()
+    battle = get_battle(3, 30, decks=(deck1, deck2))
+    samples = [[list(world.deck2.deck) for world in Determinizer(deck1, deck2, seed=4).sample(battle.state, True, 5)] for _ in range(2)]
+    assert samples[0] == samples[1]
+
+def test_determinized_search():
+    deck1, deck2 = get_decks()
+    battle = get_battle(5, 30, decks=(deck1, deck2))
+    while not battle.is_over() and len(battle.legal_moves()) == 1:
+        battle.action(*battle.legal_moves()[0])
+    search = DeterminizedMCTSSearch(Determinizer(deck1, deck2, seed=6), batch_size=4, playout_policy=GreedyBattleController())
+    controller = MCTSBattleController(10, search=search, seed=7)
+    moves = [move_key(move) for move in battle.legal_moves()]
+    assert move_key(controller.choose_move(battle, controller.rng)) in moves
+    assert controller.stats.playouts == 10
+# END OF TESTING FOR Determinizer
@@ -0,0 +1,51 @@
+from pokemon.pokemon_battle import get_own_deck_view, get_opponent_deck_view
+from pokemon.pokemon_features import StateEncoder
+from pokemon.pokemon_simulation import team1_moving
+from pokemon.pokemon_types import EnergyType
+from pokemon.pokemon_collections import generate_card_registry
+from test.battle_helpers import get_states
+
+import numpy as np
+
+def get_encoder(battle) -> StateEncoder:
+    return StateEncoder(battle.get_rules(), generate_card_registry())
+
+# TESTING FOR StateEncoder
+def test_encode():
+    battle, states = get_states(0, 60)
+    encoder = get_encoder(battle)
+    names = encoder.feature_names()
+    assert len(names) == encoder.size == len(set(names))
+    for state in states:
+        team1 = team1_moving(state)
+        own, other = (state.deck1, state.deck2) if team1 else (state.deck2, state.deck1)
+        vector = dict(zip(names, encoder.encode(state).tolist()))
+        assert vector['own_turn'] == 1 and vector['turn_number'] == state.turn_number
+        assert vector['own_hand_size'] == len(own.hand) and vector['opponent_hand_size'] == len(other.hand)
+        assert vector['opponent_deck_size'] == len(other.deck)
+        assert sum(value for name, value in vector.items() if name.startswith('hand_')) == len(own.hand)
+        if len(own.active) > 0 and own.active[0] is not None:
+            assert vector['own_slot0_hp'] == own.active[0].hp() and vector['own_slot0_damage'] == own.active[0].damage
+            assert vector['own_slot0_energy_GRASS'] == own.active[0].energies.size_of(EnergyType.GRASS)
+
+def test_encode_batch():
+    battle, states = get_states(1, 80)
+    encoder = get_encoder(battle)
+    out = encoder.new_array(len(states))
+    out[:] = 7
+    result = encoder.encode_batch(states, out=out)
+    assert result is out
+    for state, row in zip(states, out):
+        assert np.array_equal(row, encoder.encode(state))
+    assert np.array_equal(encoder.encode_batch(states, True)[:, 3], [team1_moving(state) for state in states])
+
+def test_encode_views():
+    battle, states = get_states(2, 40)
+    encoder = get_encoder(battle)
+    for state in states:
+        team1 = team1_moving(state)
+        own, other = (state.deck1, state.deck2) if team1 else (state.deck2, state.deck1)
+        points = (state.team1_points, state.team2_points) if team1 else (state.team2_points, state.team1_points)
+        from_views = encoder.encode_views(get_own_deck_view(own), get_opponent_deck_view(other), points, state.turn_number, True, state.current_turn)
+        assert np.array_equal(from_views, encoder.encode(state))
+# END OF TESTING FOR StateEncoder
@@ -0,0 +1,35 @@
+from pokemon.pokemon_collections import generate_card_index, generate_card_registry
+from pokemon.pokemon_card import CardType
+from pokemon.pokemon_types import EnergyType, PokemonType
+
+def scan(registry, condition):
+    return [card for card in registry.cards if condition(card)]
+
+# TESTING FOR CardIndex
+def test_query():
+    registry = generate_card_registry()
+    index = generate_card_index(registry)
+    pokemon = lambda card: card.is_pokemon()
+
+    assert index.query().pokemon_type(PokemonType.GRASS).basic().hit_points(70).cards() == \
+        scan(registry, lambda card: pokemon(card) and card.pokemon_type == PokemonType.GRASS and card.is_basic() and card.hit_points >= 70)
+    assert index.query().evolves_from('Charmander').cards() == scan(registry, lambda card: pokemon(card) and card.evolves_from() is not None and card.evolves_from().name == 'Charmander')
+    assert [card.get_name() for card in index.query().evolves_from('Charmander')] == ['Charmeleon']
+    assert index.query().hit_points(80, 120).cards() == scan(registry, lambda card: pokemon(card) and 80 <= card.hit_points <= 120)
+    assert index.query().hit_points(maximum=60).cards() == scan(registry, lambda card: pokemon(card) and card.hit_points <= 60)
+    assert index.query().energy_type(EnergyType.FIRE).stage(2).cards() == scan(registry, lambda card: pokemon(card) and card.get_energy_type() == EnergyType.FIRE and card.pokemon.get_stage() == 2)
+    assert index.query().cheapest_attack(maximum=1).cards() == scan(registry, lambda card: pokemon(card) and min(attack.energy_cost.size() for attack in card.attacks) <= 1)
+    assert index.query().attack_needs(EnergyType.WATER).cards() == scan(registry, lambda card: pokemon(card) and any(attack.energy_cost.size_of(EnergyType.WATER) > 0 for attack in card.attacks))
+    assert index.query().card_type(CardType.SUPPORTER).cards() == scan(registry, lambda card: card.get_card_type() == CardType.SUPPORTER)
+    assert len(index.query()) == len(registry)
+    assert len(index.query().pokemon_type(PokemonType.PSYCHIC)) == 0
+
+def test_combine_queries():
+    registry = generate_card_registry()
+    index = generate_card_index(registry)
+    water = index.query().pokemon_type(PokemonType.WATER)
+    basic = index.query().basic()
+    assert (water & basic).cards() == water.basic().cards()
+    assert (water | index.query().card_type(CardType.ITEM)).cards() == scan(registry, lambda card: card.get_card_type() == CardType.ITEM or card.is_pokemon() and card.pokemon_type == PokemonType.WATER)
+    assert (water & basic).card_ids() == sorted(set(water.card_ids()) & set(basic.card_ids()))
+# END OF TESTING FOR CardIndex
@@ -0,0 +1,88 @@
+from pokemon.pokemon_battle import EventBattleLog
+from pokemon.pokemon_control import GreedyBattleController
+from pokemon.pokemon_mcts import MCTSBattleController, MCTSSearch, SearchNode, move_key
+from pokemon.pokemon_simulation import team1_moving
+from test.battle_helpers import get_battle
+
+import pytest
+import random
+
+def get_controller(**kwargs) -> MCTSBattleController:
+    return MCTSBattleController(search=MCTSSearch(playout_policy=GreedyBattleController()), seed=0, **kwargs)
+
+# TESTING FOR MCTSBattleController
+def test_mcts_controller():
+    battle = get_battle(0)
+    controller = get_controller(iterations=10)
+    for _ in range(4):
+        moves = [move_key(move) for move in battle.legal_moves()]
+        name, inputs = controller.choose_move(battle, controller.rng)
+        assert move_key((name, inputs)) in moves
+        if len(moves) > 1:
+            assert controller.stats.playouts == 10
+        battle.action(name, inputs)
+    assert controller.total_stats.playouts > 0 and controller.playouts_per_second() > 0
+
+def test_mcts_tree_reuse():
+    battle = get_battle(1, log=EventBattleLog())
+    controller = get_controller(iterations=20)
+    battle.action(*controller.choose_move(battle, controller.rng))
+    kept = controller.root
+    assert kept is not None and kept.visits > 0
+    assert controller.kept_root(battle) is kept
+    # follow a move the search tried from there, so the tree has a node for it
+    follow_ups = [move for move in battle.legal_moves() if move_key(move) in kept.children]
+    assert len(follow_ups) > 0
+    move = random.Random(2).choice(follow_ups)
+    battle.action(*move)
+    root = controller.kept_root(battle)
+    assert root is kept.children[move_key(move)]
+    assert root.parent is kept
+
+def test_mcts_sample():
+    battle = get_battle(5)
+    skip_forced_moves(battle)
+    team1 = team1_moving(battle.state)
+    own, other = (battle.state.deck1, battle.state.deck2) if team1 else (battle.state.deck2, battle.state.deck1)
+    rng = random.Random(6)
+    hands = set()
+    for _ in range(10):
+        state = MCTSSearch().sample(battle, rng).state
+        sample_own, sample_other = (state.deck1, state.deck2) if team1 else (state.deck2, state.deck1)
+        assert sample_own.hand == own.hand
+        assert sorted(map(str, sample_own.deck)) == sorted(map(str, own.deck))
+        assert len(sample_other.hand) == len(other.hand)
+        assert len(other.active) > 0 or any(card.is_basic() for card in sample_other.hand)
+        assert sorted(map(str, sample_other.hand + list(sample_other.deck))) == sorted(map(str, other.hand + list(other.deck)))
+        assert state.zobrist_hash() == state.full_zobrist_hash()
+        hands.add(tuple(map(str, sample_other.hand)))
+    assert len(hands) > 1
+
+    state = MCTSSearch(redeal=False).sample(battle, rng).state
+    assert state.deck1.hand == battle.state.deck1.hand and state.deck2.hand == battle.state.deck2.hand
+    assert list(state.deck1.deck) == list(battle.state.deck1.deck) and list(state.deck2.deck) == list(battle.state.deck2.deck)
+
+def skip_forced_moves(battle):
+    while len(battle.legal_moves()) == 1:
+        battle.action(*battle.legal_moves()[0])
+
+def test_mcts_budget():
+    with pytest.raises(ValueError):
+        MCTSSearch().search(SearchNode(None, True), get_battle(2), random.Random(3), None, None)
+    controller = get_controller(iterations=None, time_limit=0.05)
+    battle = get_battle(2)
+    skip_forced_moves(battle)
+    controller.choose_move(battle, controller.rng)
+    assert controller.stats.playouts > 0
+
+def test_mcts_workers():
+    battle = get_battle(4)
+    skip_forced_moves(battle)
+    controller = get_controller(iterations=4, workers=2)
+    try:
+        moves = [move_key(move) for move in battle.legal_moves()]
+        assert move_key(controller.choose_move(battle, controller.rng)) in moves
+        assert controller.stats.playouts == 8
+    finally:
+        controller.close()
+# END OF TESTING FOR MCTSBattleController
@@ -0,0 +1,60 @@
+from pokemon.pokemon_registry import CardRegistry
+from pokemon.pokemon_collections import generate_attacks, generate_pokemon, generate_pokemon_cards, generate_trainers, generate_abilities, generate_card_registry
+from pokemon.pokemon_battle import Deck, DeckSetup
+from pokemon.pokemon_types import EnergyType
+
+import random
+import pytest
+
+def get_pokemon_cards():
+    return generate_pokemon_cards(generate_pokemon(), generate_attacks(), generate_abilities())
+
+# TESTING FOR CardRegistry
+def test_intern():
+    cards = get_pokemon_cards()
+    registry = CardRegistry()
+    assert registry.intern(cards['Bulbasaur 0']) == 0
+    assert registry.intern(cards['Ivysaur 0']) == 1
+    assert registry.intern(cards['Bulbasaur 0']) == 0
+    copies = get_pokemon_cards()
+    assert copies['Bulbasaur 0'] is not cards['Bulbasaur 0']
+    assert registry.intern(copies['Bulbasaur 0']) == 0
+    assert registry.canonical(copies['Bulbasaur 0']) is cards['Bulbasaur 0']
+    assert len(registry) == 2
+    assert copies['Ivysaur 0'] in registry
+    assert cards['Venusaur 0'] not in registry
+    with pytest.raises(KeyError):
+        registry.id_of(cards['Venusaur 0'])
+    assert registry.get_id(copies['Ivysaur 0']) == 1
+    assert registry.get_id(cards['Venusaur 0']) is None
+    assert registry.get_id(cards['Venusaur 0'], -1) == -1
+
+def test_generate_card_registry():
+    registry = generate_card_registry()
+    cards = get_pokemon_cards()
+    trainers = generate_trainers()
+    assert len(registry) == len(cards) + len(trainers)
+    assert registry.id_of(cards['Bulbasaur 0']) == 0
+    assert [registry[i] for i in range(len(registry))] == registry.cards
+    assert registry.id_of(generate_card_registry().card(5)) == 5
+
+def test_encode():
+    cards = get_pokemon_cards()
+    registry = generate_card_registry(cards)
+    hand = [cards['Charmander 0'], cards['Bulbasaur 0'], cards['Charmander 0']]
+    ids = registry.encode(hand)
+    assert ids == (registry.id_of(cards['Charmander 0']), 0, registry.id_of(cards['Charmander 0']))
+    assert registry.decode(ids) == hand
+    counts = registry.counts(hand)
+    assert len(counts) == len(registry)
+    assert counts[0] == 1 and counts[ids[0]] == 2 and sum(counts) == 3
+
+    deck = Deck('deck', tuple(hand * 4), (EnergyType.FIRE,))
+    setup = DeckSetup(deck, 5, 1, rng=random.Random(0))
+    setup.play_basic(0)
+    hand_ids, deck_ids, discard_ids, active_ids = setup.encode(registry)
+    assert registry.decode(hand_ids) == setup.hand
+    assert registry.decode(deck_ids) == list(setup.deck)
+    assert discard_ids == ()
+    assert registry.decode(active_ids[0]) == setup.active[0].get_cards()
+# END OF TESTING FOR CardRegistry
@@ -0,0 +1,82 @@
+from pokemon.pokemon_battle import Deck, Rules, battle_factory, standard_actions, standard_effects, standard_damage_effects
+from pokemon.pokemon_simulation import NoLegalMovesError, SimulationResult, random_policy, simulate, play_game, team1_moving
+from pokemon.pokemon_types import EnergyType
+from pokemon.pokemon_collections import generate_attacks, generate_pokemon, generate_pokemon_cards, generate_trainers, generate_abilities
+
+import pytest
+import random
+
+def get_decks() -> tuple[Deck,Deck,Rules]:
+    pokemon_cards = generate_pokemon_cards(generate_pokemon(), generate_attacks(), generate_abilities())
+    trainers = generate_trainers()
+    grass = [pokemon_cards[name] for name in ['Bulbasaur 0', 'Ivysaur 0', 'Venusaur 0']] * 2 + [trainers['Potion']] * 2
+    fire = [pokemon_cards[name] for name in ['Charmander 0', 'Charmeleon 0', 'Charizard 0']] * 2 + [trainers['Potion']] * 2
+    rules = Rules(standard_actions(), standard_effects(), standard_damage_effects(), DECK_SIZE=len(grass))
+    return Deck('grass', grass, (EnergyType.GRASS,)), Deck('fire', fire, (EnergyType.FIRE,)), rules
+
+# TESTING FOR SimulationResult
+def test_simulation_result():
+    result = SimulationResult()
+    result.add_game(1, 10, (3,1))
+    result.add_game(None, 20, (1,1))
+    other = SimulationResult()
+    other.add_game(2, 30, (0,3))
+    result.merge(other)
+    assert (result.games, result.wins, result.losses, result.draws) == (3, 1, 1, 1)
+    assert result.average_turns() == 20
+    assert result.points == {(3,1):1, (1,1):1, (0,3):1}
+# END OF TESTING FOR SimulationResult
+
+# TESTING FOR simulate
+def test_play_game():
+    grass, fire, rules = get_decks()
+    winner, turns, points = play_game(grass, fire, random_policy, random_policy, rules, 3, 100, 200)
+    assert winner in [1, 2, None]
+    assert turns <= 100
+    assert play_game(grass, fire, random_policy, random_policy, rules, 3, 100, 200) == (winner, turns, points)
+
+    winner, turns, _ = play_game(grass, fire, random_policy, random_policy, rules, 3, 4, 200)
+    assert winner is None and turns == 4
+
+def test_simulate():
+    grass, fire, rules = get_decks()
+    result = simulate(grass, fire, random_policy, 20, seed=5, workers=1, rules=rules)
+    assert result.games == 20
+    assert result.wins + result.losses + result.draws == 20
+    assert sum(result.points.values()) == 20
+    assert result.average_turns() > 0
+
+    parallel = simulate(grass, fire, random_policy, 20, seed=5, workers=2, rules=rules)
+    assert parallel == result
+# END OF TESTING FOR simulate
+
+
+# TESTING FOR policies
+def test_random_policy_no_moves():
+    grass, fire, rules = get_decks()
+    battle = battle_factory(grass, fire, rules, headless=True, seed=0)
+    rng = random.Random(0)
+    while not battle.is_over():
+        battle.action(*random_policy(battle, rng))
+    with pytest.raises(NoLegalMovesError):
+        random_policy(battle, rng)
+
+def test_team1_moving_selects():
+    grass, fire, rules = get_decks()
+    sabrina = generate_trainers()['Sabrina']
+    grass = Deck('grass', grass.cards[:-2] + [sabrina] * 2, grass.energies)
+    fire = Deck('fire', fire.cards[:-2] + [sabrina] * 2, fire.energies)
+    opponent_selects = 0
+    for seed in range(20):
+        battle = battle_factory(grass, fire, rules, headless=True, seed=seed)
+        rng = random.Random(seed)
+        while not battle.is_over() and battle.state.turn_number < 60:
+            state = battle.state
+            if state.next_action() == 'select':
+                user_input = battle.get_partial_inputs()[0]
+                # Sabrina and replacing a knocked out pokemon ask the team whose turn it isn't
+                assert team1_moving(state) == (state.team1_turn() == user_input.current_user)
+                opponent_selects += not user_input.current_user
+            battle.action(*random_policy(battle, rng))
+    assert opponent_selects > 0
+# END OF TESTING FOR policies
@@ -1,6 +1,7 @@
-from pokemon.pokemon_types import EnergyContainer, EnergyType
+from pokemon.pokemon_types import EnergyContainer, EnergyType, MutableEnergyContainer, PokemonType, TYPE_MODIFIERS, energy_type, weakness, resistance
 
 from frozendict import frozendict
+import pickle
 import pytest
 
 def test_empty_container():
@@ -105,4 +106,46 @@ def test_at_least_as_big():
     assert not container2.at_least_as_big(container3)
     assert container3.at_least_as_big(container2)
     assert not container1.at_least_as_big(container3, False)
-    assert not container3.at_least_as_big(container1, False)
\ No newline at end of file
+    assert not container3.at_least_as_big(container1, False)
+
+def test_container_equality():
+    container = EnergyContainer(frozendict({EnergyType.FIRE: 1}))
+    assert container.remove_energy(EnergyType.FIRE) == EnergyContainer()
+    assert hash(container.add_energy(EnergyType.FIRE)) == hash(EnergyContainer(frozendict({EnergyType.FIRE: 2})))
+    assert container.energies == frozendict({EnergyType.FIRE: 1})
+    assert pickle.loads(pickle.dumps(container)) == container
+    with pytest.raises(Exception):
+        container.total = 5
+
+def test_mutable_container():
+    container = MutableEnergyContainer()
+    container.add_energy_in_place(EnergyType.GRASS)
+    container.add_energy_in_place(EnergyType.GRASS)
+    container.add_energies_in_place(EnergyContainer(frozendict({EnergyType.FIRE: 2})))
+    assert container.size() == 4
+    assert container.size_of(EnergyType.GRASS) == 2
+    assert container.at_least_as_big(EnergyContainer(frozendict({EnergyType.GRASS: 1, EnergyType.COLORLESS: 3})))
+
+    with pytest.raises(ValueError):
+        container.remove_energies_in_place(EnergyContainer(frozendict({EnergyType.FIRE: 1, EnergyType.WATER: 1})))
+    assert container.size() == 4
+
+    frozen = container.freeze()
+    container.remove_energy_in_place(EnergyType.FIRE)
+    assert frozen.size_of(EnergyType.FIRE) == 2
+    assert container.size_of(EnergyType.FIRE) == 1
+    assert container == EnergyContainer(frozendict({EnergyType.GRASS: 2, EnergyType.FIRE: 1}))
+
+def test_type_tables():
+    assert energy_type(PokemonType.ICE) == EnergyType.WATER
+    assert energy_type(PokemonType.FIRE) == EnergyType.FIRE
+    assert weakness(PokemonType.GRASS) == EnergyType.FIRE
+    assert weakness(PokemonType.DRAGON) is None
+    assert resistance(PokemonType.NORMAL) is None
+    assert TYPE_MODIFIERS.shape == (len(PokemonType), len(EnergyType))
+    for pokemon_type in PokemonType:
+        for energy in EnergyType:
+            expected = (20 if weakness(pokemon_type) == energy else 0) - (20 if resistance(pokemon_type) == energy else 0)
+            assert TYPE_MODIFIERS[pokemon_type.value, energy.value] == expected
+    with pytest.raises(ValueError):
+        TYPE_MODIFIERS[0, 0] = 1
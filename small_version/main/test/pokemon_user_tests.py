@@ -1,4 +1,4 @@
-from pokemon.user import User
+from pokemon.user import User, CardCollection
 from pokemon.pokemon_control import BattleController
 from pokemon.pokemon_collections import generate_attacks, generate_pokemon, generate_pokemon_cards, generate_abilities
 from pokemon.pokemon_card import PokemonCard
@@ -47,6 +47,7 @@ def twenty_cards() -> tuple[User, dict[str, PokemonCard], list[PokemonCard]]:
     user = User("name", tuple_to_counts(initial_cards))
     return user, cards, initial_cards
 
+# TESTING FOR User
 def test_default():
     user = User("hello")
     assert user.username == "hello"
@@ -110,4 +111,42 @@ def test_add_deck():
     initial.append(cards['Blastoise 0'])
     deck = Deck("name3", tuple(initial), (EnergyType.FIRE, EnergyType.GRASS))
     assert not user.add_deck(deck)
-    assert user.number_of_decks() == 2
\ No newline at end of file
+    assert user.number_of_decks() == 2
+# END OF TESTING FOR User
+
+
+# TESTING FOR CardCollection
+def test_card_collection():
+    user, cards, initial = twenty_cards()
+    collection = CardCollection(cards=tuple_to_counts(initial))
+    assert collection.copies(cards['Bulbasaur 0']) == 2
+    assert collection.copies(cards['Blastoise 0']) == 0
+    assert collection.total() == 20
+    for _ in range(20):
+        collection.add(cards['Metapod 0'])
+    assert collection.copies(cards['Metapod 0']) == 20
+
+def test_buildable_decks():
+    user, cards, initial = twenty_cards()
+    decks = [
+        Deck("all", tuple(initial), (EnergyType.FIRE,)),
+        Deck("three", tuple(initial[:2] + initial[:1]), (EnergyType.FIRE,)),
+        Deck("blastoise", (cards['Blastoise 0'],), (EnergyType.WATER,)),
+        Deck("empty", tuple(), (EnergyType.WATER,)),
+    ]
+    assert user.buildable_decks(decks).tolist() == [True, False, False, True]
+    assert user.add_collection_deck(decks[0])
+    assert not user.add_collection_deck(decks[2])
+    user.add_card(cards['Blastoise 0'])
+    assert user.add_collection_deck(decks[2])
+    assert user.buildable_decks(decks).tolist() == [all(card_count <= user.number_of_copies(card) for card, card_count in tuple_to_counts(deck.cards).items()) for deck in decks]
+
+def test_committed_copies():
+    user, cards, initial = twenty_cards()
+    assert user.committed_copies() == {}
+    user.add_collection_deck(Deck("all", tuple(initial), (EnergyType.FIRE,)))
+    user.add_collection_deck(Deck("bulbasaur", (cards['Bulbasaur 0'],), (EnergyType.GRASS,)))
+    committed = tuple_to_counts(initial)
+    committed[cards['Bulbasaur 0']] += 1
+    assert user.committed_copies() == committed
+# END OF TESTING FOR CardCollection
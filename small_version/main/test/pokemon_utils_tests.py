@@ -1,5 +1,8 @@
 from pokemon.utils import tuple_to_counts
-from pokemon.utils import PriorityQueue
+from pokemon.utils import PriorityQueue, BucketQueue, IndexedPile
+
+import pytest
+import random
 
 def test_empty():
     tup = tuple()
@@ -27,6 +30,8 @@ def test_pq():
     pq.push(10, 'z')
     pq.push(1, 'z')
     assert pq.size() == 5
+    assert pq.prioritized() == [(1, 'z'), (3, 'c'), (3, 'b'), (5, 'a'), (10, 'z')]
+    assert pq.top_priority() == 1
     assert pq.pop() == 'z'
     assert pq.pop() == 'c'
     assert pq.size() == 3
@@ -34,4 +39,89 @@ def test_pq():
     assert pq.size() == 3
     assert pq.pop() == 'b'
     assert pq.pop() == 'a'
-    assert pq.pop() == 'z'
\ No newline at end of file
+    assert pq.pop() == 'z'
+
+
+def test_bucket_queue():
+    bq = BucketQueue[str](-1, 5)
+    bq.push(3, 'a')
+    bq.push(0, 'c')
+    bq.push(0, 'b')
+    bq.push(5, 'z')
+    bq.push(-1, 'y')
+    assert bq.size() == 5
+    assert bq.prioritized() == [(-1, 'y'), (0, 'c'), (0, 'b'), (3, 'a'), (5, 'z')]
+    assert bq.top_priority() == -1
+    assert bq.top() == 'y'
+    assert bq.pop() == 'y'
+    assert bq.pop() == 'c'
+    assert bq.size() == 3
+    assert bq.top() == 'b'
+    assert bq.size() == 3
+    bq.push_all(0, ['d', 'e'])
+    assert bq.pop() == 'b'
+    assert bq.pop() == 'd'
+    assert bq.pop() == 'e'
+    assert bq.pop() == 'a'
+    assert bq.pop() == 'z'
+    assert bq.size() == 0
+    with pytest.raises(IndexError):
+        bq.top()
+    with pytest.raises(IndexError):
+        bq.top_priority()
+    bq.push(4, 'x')
+    bq.clear()
+    assert bq.size() == 0
+    with pytest.raises(ValueError):
+        bq.push(-2, 'low')
+    with pytest.raises(ValueError):
+        bq.push(6, 'high')
+    with pytest.raises(ValueError):
+        bq.push_all(6, ['high'])
+    assert bq.size() == 0
+
+def test_indexed_pile():
+    pile = IndexedPile[int](range(10), lambda x: x % 3)
+    assert len(pile) == 10
+    assert pile.draw() == 0
+    assert sorted(pile.positions(0)) == [3, 6, 9]
+    assert pile.take([9, 1, 3]) == [9, 1, 3]
+    assert sorted(pile) == [2, 4, 5, 6, 7, 8]
+    assert 3 not in pile and 6 in pile
+    for key in pile.keys():
+        assert sorted(pile.entries[position][0] for position in pile.positions(key)) == sorted(x for x in pile if x % 3 == key)
+    copy = pile.copy()
+    copy.remove(6)
+    assert 6 in pile and 6 not in copy
+    assert list(copy) == [x for x in pile if x != 6]
+    assert [pile.entries[position][0] for position in pile.positions(0)] == [6]
+    with pytest.raises(ValueError):
+        copy.remove(6)
+    while len(copy) > 0:
+        copy.draw()
+    assert copy.keys() == []
+    with pytest.raises(IndexError):
+        copy.draw()
+
+def test_indexed_pile_shuffle():
+    rng = random.Random(0)
+    pile = IndexedPile[int](range(10), lambda x: x % 3)
+    assert not pile.random_order
+    pile.draw()
+    pile.positions(0)
+    pile.shuffle(rng)
+    assert pile.random_order and pile.head == 0
+    assert sorted(pile) == list(range(1, 10))
+    order = list(pile)
+    pile.randomize(rng)
+    assert list(pile) == order
+    pile.take(pile.find(lambda key: key == 0))
+    assert pile.random_order
+    assert sorted(pile) == [1, 2, 4, 5, 7, 8]
+    pile.extend([0, 3])
+    assert not pile.random_order
+    assert list(pile)[-2:] == [0, 3]
+    assert sorted(pile.entries[position][0] for position in pile.find(lambda key: key == 0)) == [0, 3]
+    pile.randomize(rng)
+    assert pile.random_order
+    assert sorted(pile) == [0, 1, 2, 3, 4, 5, 7, 8]
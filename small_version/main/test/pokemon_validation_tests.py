@@ -0,0 +1,60 @@
+from pokemon.pokemon_battle import Deck, Rules, standard_actions, standard_effects, standard_damage_effects
+from pokemon.pokemon_collections import generate_card_registry, generate_pokemon_cards, generate_trainers
+from pokemon.pokemon_registry import CardRegistry
+from pokemon.pokemon_validation import DeckValidator, DeckViolation, NO_CARD, encode_decks
+from pokemon.pokemon_types import EnergyType
+
+import numpy as np
+import pytest
+import random
+
+def get_rules(**kwargs) -> Rules:
+    return Rules(standard_actions(), standard_effects(), standard_damage_effects(), **kwargs)
+
+# TESTING FOR DeckValidator
+def test_validate():
+    registry = generate_card_registry()
+    rules = get_rules(DECK_SIZE=4)
+    validator = DeckValidator(rules, registry)
+    bulbasaur, ivysaur, potion = registry.id_of(registry.cards[0]), 1, len(registry) - 1
+    decks = [
+        [bulbasaur, ivysaur, potion, potion],
+        [bulbasaur, ivysaur, potion],
+        [bulbasaur, potion, potion, potion],
+        [ivysaur, ivysaur, potion, potion],
+    ]
+    valid, violations = validator.validate(decks)
+    assert valid.tolist() == [True, False, False, False]
+    assert validator.violations(decks) == [DeckViolation.NONE, DeckViolation.DECK_SIZE, DeckViolation.DUPLICATE_LIMIT, DeckViolation.BASIC_REQUIRED]
+    assert violations.tolist() == [0, 1, 2, 3]
+    assert validator.validate(np.zeros((0, 4), dtype=np.int64))[0].shape == (0,)
+
+def test_validate_matches_rules():
+    rng = random.Random(0)
+    registry = generate_card_registry()
+    for rules in [get_rules(DECK_SIZE=6), get_rules(DECK_SIZE=6, DUPLICATE_LIMIT=1), get_rules(DECK_SIZE=5, DUPLICATE_LIMIT=3, BASIC_REQUIRED=False), get_rules(DECK_SIZE=1, DUPLICATE_LIMIT=0)]:
+        validator = DeckValidator(rules, registry)
+        decks = [Deck(str(i), tuple(rng.choices(registry.cards, k=rng.randint(rules.DECK_SIZE - 1, rules.DECK_SIZE))), (EnergyType.GRASS,)) for i in range(300)]
+        card_ids = encode_decks(registry, decks)
+        assert (card_ids[[i for i, deck in enumerate(decks) if len(deck.cards) < card_ids.shape[1]], -1] == NO_CARD).all()
+        valid, _ = validator.validate(card_ids)
+        assert valid.tolist() == [rules.is_valid_deck(deck) for deck in decks]
+        assert validator.validate(decks)[0].tolist() == valid.tolist()
+
+def test_validate_new_cards():
+    cards = generate_pokemon_cards()
+    registry = CardRegistry([cards['Ivysaur 0'], generate_trainers()['Potion']])
+    validator = DeckValidator(get_rules(DECK_SIZE=4), registry)
+    ivysaur, potion = 0, 1
+    bulbasaur = registry.intern(cards['Bulbasaur 0'])
+    decks = [
+        [bulbasaur, ivysaur, potion, potion],
+        [bulbasaur, bulbasaur, bulbasaur, bulbasaur],
+        [ivysaur, ivysaur, potion, potion],
+    ]
+    assert validator.violations(decks) == [DeckViolation.NONE, DeckViolation.DUPLICATE_LIMIT, DeckViolation.BASIC_REQUIRED]
+    with pytest.raises(ValueError):
+        validator.validate(np.array([[bulbasaur, ivysaur, potion, bulbasaur + 1]]))
+    with pytest.raises(ValueError):
+        validator.validate(np.array([[bulbasaur, ivysaur, potion, -2]]))
+# END OF TESTING FOR DeckValidator
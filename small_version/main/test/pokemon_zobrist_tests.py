@@ -0,0 +1,105 @@
+from pokemon.pokemon_battle import ActionPriority, ActivePokemon, UserInput
+from pokemon.pokemon_simulation import random_policy
+from pokemon.pokemon_collections import generate_pokemon_cards
+from pokemon.pokemon_types import EnergyType
+import pokemon.pokemon_zobrist as zobrist
+from test.battle_helpers import get_battle
+
+from hashlib import blake2b
+import pytest
+import random
+
+@pytest.fixture
+def debug():
+    zobrist.set_debug(True)
+    yield
+    zobrist.set_debug(False)
+
+# TESTING FOR zobrist_key
+def test_zobrist_key():
+    assert zobrist.zobrist_key('hand', 'Bulbasaur 0') == int.from_bytes(blake2b(repr(('hand', 'Bulbasaur 0')).encode(), digest_size=8).digest(), 'little')
+    assert zobrist.zobrist_key('hand', 'Bulbasaur 0') != zobrist.zobrist_key('deck', 'Bulbasaur 0')
+
+def test_caches_bounded(monkeypatch):
+    monkeypatch.setattr(zobrist, 'CACHE_LIMIT', 8)
+    first = zobrist.zobrist_key('bounded', 0)
+    for i in range(100):
+        zobrist.zobrist_key('bounded', i)
+        zobrist.energy_hash('bounded', (i,))
+    for card in generate_pokemon_cards().values():
+        zobrist.card_keys(card)
+    assert len(zobrist.keys) <= 8 and len(zobrist.energy_hashes) <= 8 and len(zobrist.card_key_cache) <= 8
+    assert zobrist.zobrist_key('bounded', 0) == first
+# END OF TESTING FOR zobrist_key
+
+# TESTING FOR BattleState.zobrist_hash
+def test_zobrist_hash_games(debug):
+    for seed in range(10):
+        battle = get_battle(seed)
+        rng = random.Random(seed)
+        hashes = [battle.state.zobrist_hash()]
+        while not battle.is_over():
+            battle.action(*random_policy(battle, rng))
+            # debug mode checks every hash against a full recomputation
+            hashes.append(battle.state.zobrist_hash())
+            assert battle.fork(copy_on_write=True).state.zobrist_hash() == hashes[-1]
+        assert len(set(hashes)) > len(hashes) // 2
+
+def test_zobrist_hash_replay():
+    hashes = []
+    for _ in range(2):
+        battle = get_battle(3)
+        rng = random.Random(4)
+        game = []
+        while not battle.is_over():
+            battle.action(*random_policy(battle, rng))
+            game.append(battle.state.zobrist_hash())
+        hashes.append(game)
+    assert hashes[0] == hashes[1]
+
+def test_zobrist_hash_changes(debug):
+    card = generate_pokemon_cards()['Bulbasaur 0']
+    active = ActivePokemon([card])
+    start = active.hash
+    active.attach_energy(EnergyType.GRASS)
+    attached = active.hash
+    active.take_damage(20, EnergyType.FIRE, False)
+    active.heal(20)
+    assert active.hash == attached != start and active.hash == active.full_hash()
+
+def test_zobrist_hash_untracked(debug):
+    battle = get_battle(5)
+    battle.state.deck1.hand.append(battle.state.deck1.hand[0])
+    with pytest.raises(AssertionError):
+        battle.state.zobrist_hash()
+    battle.state.deck1.rehash_zones()
+    battle.state.zobrist_hash()
+
+def test_zobrist_hash_queue(debug):
+    battle = get_battle(6)
+    rng = random.Random(6)
+    while not battle.state.battle_going() or battle.state.queued_actions() > 0:
+        battle.action(*random_policy(battle, rng))
+    empty = battle.state.zobrist_hash()
+    first, second = battle.fork().state, battle.fork().state
+    first.push_action(('heal', (UserInput('Select a card to heal.'), 20)), ActionPriority.ATTACK_EFFECT.value)
+    first.push_actions([('draw', (1,)), ('draw', (2,))], ActionPriority.LATE_EFFECT.value)
+    second.push_action(('draw', (1,)), ActionPriority.LATE_EFFECT.value)
+    second.push_action(('end_turn', tuple()), ActionPriority.NOW.value)
+    second.end_current_action()
+    second.push_action(('heal', (UserInput('Select a card to heal.'), 20)), ActionPriority.ATTACK_EFFECT.value)
+    second.push_action(('draw', (2,)), ActionPriority.LATE_EFFECT.value)
+    # debug mode checks the queue against a full recomputation
+    assert first.zobrist_hash() == second.zobrist_hash() != empty
+    first.end_current_action()
+    second.push_action(('draw', (1,)), ActionPriority.LATE_EFFECT.value)
+    second.end_current_action()
+    second.end_current_action()
+    # the order of the actions with the same priority counts
+    assert first.zobrist_hash() != second.zobrist_hash()
+    second.end_current_action()
+    first.end_current_action()
+    first.end_current_action()
+    assert first.zobrist_hash() == empty
+    assert second.zobrist_hash() != empty
+# END OF TESTING FOR BattleState.zobrist_hash